@@ -32,6 +32,25 @@ class Settings(BaseSettings):
     redis_port: int = 6379
     redis_db: int = 0
 
+    #Rate limit nastavení
+    rate_limit_lease_ratio: float = 0.1  # Část limitu, kterou si worker pronajme z Redisu najednou
+    rate_limit_workers: int = 1  # Počet workerů - při výpadku Redisu se limit dělí mezi ně
+    rate_limit_redis_timeout: float = 0.2  # Timeout spojení/operace s Redisem v sekundách
+    rate_limit_breaker_threshold: int = 3  # Počet chyb Redisu v řadě, po kterých se přejde na lokální limity
+    rate_limit_breaker_reset: float = 10.0  # Po kolika sekundách se znovu zkusí Redis
+    adaptive_concurrency_enabled: bool = True  # Ochrana proti přetížení (503 při plné kapacitě)
+
+    #Index štítků a custom fields
+    # Custom fields, podle kterých jde filtrovat (?cf_<pole>=hodnota), podle tabulky entity
+    # např. {"deals": ["region", "segment"], "leads": ["region"]}
+    indexed_custom_fields: dict[str, list[str]] = {}
+
+    #Stránkování
+    total_count_estimate_threshold: int = 100000  # Od kolika řádků se total u nefiltrovaných seznamů odhaduje
+
+    #Číselné řady
+    deal_number_block_size: int = 10  # Kolik čísel objednávek si worker rezervuje najednou (1 = bez rezervace)
+
     #Email nastavení
     smtp_host: str = "smtp.gmail.com"
     smtp_port: int = 587
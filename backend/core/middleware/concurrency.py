@@ -0,0 +1,284 @@
+# backend/core/middleware/concurrency.py
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from typing import Optional
+
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Adaptivní limit souběžných requestů pro jednu třídu rout (AIMD).
+
+    Rozhoduje klouzavý průměr latence (EWMA), ne jednotlivý request -
+    ojediněle pomalý request limit nesníží, trvale pomalé ano.
+
+    - Pokud průměrná latence drží pod cílem a limit je využitý, limit pomalu
+      roste (additive increase, cca +1 za každých `limit` requestů).
+    - Pokud průměrná latence překročí cíl, limit se sníží násobkem `backoff`
+      (multiplicative decrease, maximálně jednou za `target_latency`).
+
+    Requesty nad limit čekají v krátké frontě, při plné frontě nebo
+    po vypršení `queue_timeout` dostanou okamžitě 503.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        methods: Optional[set[str]] = None,
+        path_prefix: Optional[str] = None,
+        path_pattern: Optional[str] = None,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        target_latency: float = 0.5,
+        backoff: float = 0.9,
+        smoothing: float = 0.1,
+        queue_size: int = 10,
+        queue_timeout: float = 0.1
+    ):
+        """
+        Args:
+            name: Název třídy rout (pro logy a 503 odpověď)
+            methods: HTTP metody, které do třídy patří (None = všechny)
+            path_prefix: Prefix cesty, která do třídy patří (None = všechny)
+            path_pattern: Regulární výraz cesty, která do třídy patří (None = všechny)
+            initial_limit: Počáteční počet souběžných requestů
+            min_limit: Minimální limit
+            max_limit: Maximální limit
+            target_latency: Cílová latence v sekundách (do prvního bytu odpovědi)
+            backoff: Koeficient snížení limitu při překročení latence
+            smoothing: Váha nového vzorku v průměru latence (EWMA)
+            queue_size: Maximální počet čekajících requestů
+            queue_timeout: Jak dlouho smí request čekat ve frontě (s)
+        """
+        self.name = name
+        self.methods = methods
+        self.path_prefix = path_prefix
+        self.path_pattern = re.compile(path_pattern) if path_pattern is not None else None
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.latency_ewma = 0.0
+        self.rejected = 0
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        if self.path_prefix is not None and not path.startswith(self.path_prefix):
+            return False
+        if self.path_pattern is not None and not self.path_pattern.match(path):
+            return False
+        return True
+
+    async def acquire(self) -> bool:
+        """
+        Získá slot pro request.
+
+        Returns:
+            True pokud request může pokračovat, False pokud se má odmítnout
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # Slot předá release() - in_flight už je započítaný.
+            # asyncio.wait (na rozdíl od wait_for) propustí zrušení vždy
+            # a na timeout waiter neruší, takže předání slotu nelze přehlédnout.
+            await asyncio.wait((waiter,), timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # Klient se odpojil ve frontě - middleware se k release() nedostane
+            self._return_handed_slot(waiter)
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+        if waiter.done():
+            return True
+        waiter.cancel()
+        self.rejected += 1
+        return False
+
+    def _return_handed_slot(self, waiter: asyncio.Future) -> None:
+        """Vrátí slot, který release() předal requestu, jenž už nepokračuje."""
+        if waiter.done():
+            self.release(None)
+        else:
+            waiter.cancel()
+
+    def release(self, latency: Optional[float]) -> None:
+        """Uvolní slot a upraví limit podle naměřené latence."""
+        if latency is not None:
+            self._update_limit(latency)
+
+        self.in_flight -= 1
+
+        # Předej uvolněné sloty čekajícím requestům
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                self.in_flight += 1
+
+    def _update_limit(self, latency: float) -> None:
+        if not self.latency_ewma:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.smoothing * (latency - self.latency_ewma)
+        now = time.monotonic()
+
+        if self.latency_ewma > self.target_latency:
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif self.in_flight >= self.limit / 2:
+            # Zvyšuj jen když je limit skutečně využitý
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def snapshot(self) -> dict:
+        """Aktuální stav limitu (pro monitoring)."""
+        return {
+            "name": self.name,
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 2),
+            "rejected": self.rejected,
+        }
+
+
+# Třídy rout - vyhodnocují se postupně, první shoda vyhrává.
+# Poslední třída bez podmínek slouží jako výchozí.
+def default_route_classes() -> list[AdaptiveConcurrencyLimit]:
+    return [
+        # Dokumenty - závislé na MinIO
+        AdaptiveConcurrencyLimit(
+            "documents",
+            path_prefix="/api/v1/documents",
+            initial_limit=8, max_limit=32,
+            target_latency=1.0, queue_size=4, queue_timeout=0.2
+        ),
+        # Hromadné operace - jeden request zpracuje stovky řádků a trvá sekundy,
+        # s cílem běžných zápisů by stáhly limit všech zápisů na minimum
+        AdaptiveConcurrencyLimit(
+            "bulk",
+            methods={"POST", "PATCH", "DELETE"},
+            path_pattern=r"^/api/v1/[^/]+/bulk(/|$)",
+            initial_limit=2, min_limit=1, max_limit=8,
+            target_latency=5.0, queue_size=4, queue_timeout=0.5
+        ),
+        # Zápisy - SQLite serializuje zápisy, velká souběžnost jen prodlužuje frontu na zámek
+        AdaptiveConcurrencyLimit(
+            "write",
+            methods={"POST", "PUT", "PATCH", "DELETE"},
+            initial_limit=8, max_limit=32,
+            target_latency=0.3, queue_size=8
+        ),
+        # Čtení
+        AdaptiveConcurrencyLimit(
+            "read",
+            initial_limit=32, max_limit=256,
+            target_latency=0.3, queue_size=16
+        ),
+    ]
+
+
+class AdaptiveConcurrencyMiddleware:
+    """
+    ASGI middleware pro ochranu backendu při přetížení.
+
+    Na rozdíl od rate limitu (per klient) omezuje počet souběžně
+    zpracovávaných requestů na celém workeru, odděleně pro každou třídu rout.
+    Latence se měří do odeslání hlaviček odpovědi, takže dlouhé streamy
+    (exporty) nesnižují limit, ale slot drží až do konce.
+    """
+
+    def __init__(
+        self,
+        app,
+        route_classes: Optional[list[AdaptiveConcurrencyLimit]] = None,
+        exempt_paths: Optional[list[str]] = None
+    ):
+        """
+        Args:
+            app: ASGI aplikace
+            route_classes: Třídy rout s vlastními limity (default: default_route_classes())
+            exempt_paths: Cesty vyjmuté z limitu (prefix match)
+        """
+        self.app = app
+        self.route_classes = route_classes if route_classes is not None else default_route_classes()
+        self.exempt_paths = tuple(exempt_paths if exempt_paths is not None else [
+            "/docs",
+            "/redoc",
+            "/openapi.json",
+            "/health",
+            "/metrics",
+        ])
+
+    def _classify(self, method: str, path: str) -> Optional[AdaptiveConcurrencyLimit]:
+        for route_class in self.route_classes:
+            if route_class.matches(method, path):
+                return route_class
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self._classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await route_class.acquire():
+            logger.debug(
+                f"Load shedding on '{route_class.name}': "
+                f"{route_class.in_flight}/{int(route_class.limit)} in flight"
+            )
+            response = JSONResponse(
+                status_code=503,
+                content={
+                    "detail": "Server is overloaded, try again later",
+                    "route_class": route_class.name
+                },
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        latency = None
+
+        async def send_wrapper(message):
+            nonlocal latency
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route_class.release(latency if latency is not None else time.perf_counter() - start)
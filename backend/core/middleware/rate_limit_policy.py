@@ -0,0 +1,209 @@
+# backend/core/middleware/rate_limit_policy.py
+import logging
+from typing import Optional
+
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import compile_path
+
+from backend.core.middleware.rate_limiter import (
+    RateLimiter,
+    default_limiter,
+    strict_limiter,
+    auth_limiter,
+    login_limiter,
+)
+from backend.core.services.auth import verify_token
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitPolicy:
+    """
+    Pravidlo rate limitu pro jednu routu.
+
+    Policy se stejným limiterem sdílejí jeden rozpočet requestů.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[RateLimiter],
+        key: str = "user",
+        cost: int = 1
+    ):
+        """
+        Args:
+            limiter: RateLimiter instance (None = routa je vyjmuta z limitu)
+            key: "user" (user_id z tokenu, fallback na IP) nebo "ip"
+            cost: Váha requestu - kolik tokenů spotřebuje
+        """
+        self.limiter = limiter
+        self.key = key
+        self.cost = cost
+
+    @property
+    def exempt(self) -> bool:
+        return self.limiter is None
+
+
+EXEMPT = RateLimitPolicy(None)
+
+# Výchozí pravidlo pro routy, které nejsou v tabulce
+DEFAULT_POLICY = RateLimitPolicy(default_limiter, key="user")
+
+# Tabulka pravidel - klíč je (HTTP metoda, šablona routy bez API prefixu).
+# Metoda "*" platí pro všechny metody.
+RATE_LIMIT_POLICIES: dict[tuple[str, str], RateLimitPolicy] = {
+    # Autentizace - podle IP, přihlášení má vlastní přísný rozpočet
+    ("POST", "/auth/login"): RateLimitPolicy(login_limiter, key="ip"),
+    ("POST", "/auth/{client_id}/reset-password"): RateLimitPolicy(login_limiter, key="ip", cost=5),
+    ("POST", "/email/forgot-password"): RateLimitPolicy(login_limiter, key="ip", cost=5),
+    ("*", "/auth/me"): RateLimitPolicy(auth_limiter, key="user"),
+
+    # Drahé agregace a procházení úložiště
+    ("GET", "/deals/stats"): RateLimitPolicy(strict_limiter, cost=10),
+    ("GET", "/leads/stats/overview"): RateLimitPolicy(strict_limiter, cost=10),
+    ("GET", "/documents/storage/tree"): RateLimitPolicy(strict_limiter, cost=25),
+    ("GET", "/documents/storage/list"): RateLimitPolicy(strict_limiter, cost=10),
+    ("GET", "/analytics/{report:path}"): RateLimitPolicy(strict_limiter, cost=10),
+
+    # Streamované exporty celých tabulek
+    ("GET", "/deals/export"): RateLimitPolicy(strict_limiter, cost=25),
+    ("GET", "/invoices/export"): RateLimitPolicy(strict_limiter, cost=25),
+    ("GET", "/leads/export"): RateLimitPolicy(strict_limiter, cost=25),
+    ("GET", "/companies/export"): RateLimitPolicy(strict_limiter, cost=25),
+
+    # Zápisy s vedlejšími efekty (číselné řady, e-maily, upload do MinIO)
+    ("POST", "/deals/{deal_id}/create-invoice"): RateLimitPolicy(strict_limiter, cost=5),
+    ("POST", "/documents/{entity_type}/{entity_id}"): RateLimitPolicy(strict_limiter, cost=5),
+    ("POST", "/email/send"): RateLimitPolicy(strict_limiter, cost=5),
+    ("POST", "/email/send-advanced"): RateLimitPolicy(strict_limiter, cost=5),
+    ("POST", "/email/send-html"): RateLimitPolicy(strict_limiter, cost=5),
+
+    # Hromadné operace
+    ("POST", "/deals/bulk"): RateLimitPolicy(strict_limiter, cost=25),
+    ("PATCH", "/deals/bulk"): RateLimitPolicy(strict_limiter, cost=25),
+    ("POST", "/deals/bulk/transition"): RateLimitPolicy(strict_limiter, cost=10),
+    ("POST", "/deals/bulk/create-invoices"): RateLimitPolicy(strict_limiter, cost=25),
+    ("DELETE", "/deals/bulk"): RateLimitPolicy(strict_limiter, cost=10),
+    ("POST", "/invoices/bulk"): RateLimitPolicy(strict_limiter, cost=10),
+    ("POST", "/leads/bulk"): RateLimitPolicy(strict_limiter, cost=10),
+    ("POST", "/products/bulk/deactivate"): RateLimitPolicy(strict_limiter, cost=10),
+    ("POST", "/products/bulk/activate"): RateLimitPolicy(strict_limiter, cost=10),
+    ("POST", "/products/bulk/delete"): RateLimitPolicy(strict_limiter, cost=10),
+
+    # Správa Redisu - bez limitu (jinak by šlo vymazat limity jen s limitem)
+    ("*", "/redis/{path:path}"): EXEMPT,
+}
+
+# Cesty, které se nelimitují vůbec (prefix match)
+RATE_LIMIT_EXEMPT_PATHS = [
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/health",
+    "/metrics",
+    "/favicon.ico",
+    "/admin/statics",
+]
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware, který aplikuje rate limity podle tabulky pravidel.
+
+    Běží před routováním i před logováním do DB, takže odmítnutý request
+    nestojí žádný dotaz do databáze. Šablony rout se kompilují jednou při startu,
+    routy bez parametrů se hledají přímo ve slovníku.
+    """
+
+    def __init__(
+        self,
+        app,
+        prefix: str = "/api/v1",
+        policies: Optional[dict[tuple[str, str], RateLimitPolicy]] = None,
+        default_policy: RateLimitPolicy = DEFAULT_POLICY,
+        exempt_paths: Optional[list[str]] = None
+    ):
+        """
+        Args:
+            app: ASGI aplikace
+            prefix: API prefix, který se přidá před šablony rout
+            policies: Tabulka pravidel (default: RATE_LIMIT_POLICIES)
+            default_policy: Pravidlo pro routy mimo tabulku
+            exempt_paths: Cesty vyjmuté z limitů (prefix match)
+        """
+        self.app = app
+        self.default_policy = default_policy
+        self.exempt_paths = tuple(exempt_paths if exempt_paths is not None else RATE_LIMIT_EXEMPT_PATHS)
+
+        self._static: dict[tuple[str, str], RateLimitPolicy] = {}
+        self._dynamic: list[tuple[str, object, RateLimitPolicy]] = []
+
+        for (method, template), policy in (policies if policies is not None else RATE_LIMIT_POLICIES).items():
+            path = f"{prefix}{template}"
+            if "{" not in path:
+                self._static[(method, path)] = policy
+            else:
+                regex, _, _ = compile_path(path)
+                self._dynamic.append((method, regex, policy))
+
+    def _resolve_policy(self, method: str, path: str) -> RateLimitPolicy:
+        """Najde pravidlo pro request (statické šablony mají přednost)."""
+        policy = self._static.get((method, path)) or self._static.get(("*", path))
+        if policy:
+            return policy
+
+        for policy_method, regex, policy in self._dynamic:
+            if policy_method in (method, "*") and regex.match(path):
+                return policy
+
+        return self.default_policy
+
+    def _get_user_id(self, request: Request) -> Optional[str]:
+        """Získá user_id (sub) z Bearer tokenu nebo session cookie."""
+        token = None
+
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            token = auth_header[7:]
+        elif "session" in request.scope:
+            token = request.scope["session"].get("access_token")
+
+        if not token:
+            return None
+
+        payload = verify_token(token)
+        return payload.get("sub") if payload else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path.startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        policy = self._resolve_policy(scope["method"], path)
+        if policy.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        user_id = self._get_user_id(request) if policy.key == "user" else None
+
+        try:
+            await policy.limiter.check_rate_limit(request, user_id, cost=policy.cost)
+        except HTTPException as exc:
+            response = JSONResponse(
+                status_code=exc.status_code,
+                content={"detail": exc.detail},
+                headers={"Retry-After": str(policy.limiter.window)}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -5,6 +5,7 @@ from datetime import datetime
 import logging
 
 from backend.core.config import get_settings
+from backend.core.services.limiter import QuotaLeaser, CircuitBreaker, LocalWindowLimiter
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -14,30 +15,60 @@ redis_client = redis.Redis(
     host=settings.redis_host,
     port=settings.redis_port,
     db=settings.redis_db,
-    decode_responses=True
+    decode_responses=True,
+    # Krátké timeouty - nedostupný Redis nesmí zdržovat každý request
+    socket_connect_timeout=settings.rate_limit_redis_timeout,
+    socket_timeout=settings.rate_limit_redis_timeout
+)
+
+# Sdílený breaker pro všechny limitery (jeden Redis)
+redis_breaker = CircuitBreaker(
+    failure_threshold=settings.rate_limit_breaker_threshold,
+    reset_timeout=settings.rate_limit_breaker_reset
 )
 
 class RateLimiter:
     """
     Rate limiter založený na Redis.
     Používá fixed window algoritmus.
+
+    S nastaveným lease_ratio si každý worker pronajímá kvótu z Redisu
+    po dávkách (viz QuotaLeaser) a většinu requestů odbaví bez Redisu.
+
+    Při výpadku Redisu (otevřený circuit breaker) se přepne na lokální
+    limiter v paměti s limitem vyděleným počtem workerů.
     """
 
     def __init__(
         self,
         requests: int = 250,
         window: int = 60,
-        prefix: str = "rate_limit"
+        prefix: str = "rate_limit",
+        lease_ratio: Optional[float] = settings.rate_limit_lease_ratio
     ):
         """
         Args:
             requests: Maximální počet requestů
             window: Časové okno v sekundách
             prefix: Prefix pro Redis klíče
+            lease_ratio: Část limitu pronajímaná najednou (None = INCR na každý request)
         """
         self.requests = requests
         self.window = window
         self.prefix = prefix
+        self.leaser = QuotaLeaser(
+            redis_client,
+            limit=requests,
+            window=window,
+            prefix=prefix,
+            lease_ratio=lease_ratio,
+            breaker=redis_breaker
+        ) if lease_ratio else None
+        self.fallback = LocalWindowLimiter(
+            limit=requests,
+            window=window,
+            workers=settings.rate_limit_workers
+        )
 
     def _get_identifier(self, request: Request, user_id: Optional[str] = None) -> str:
         """
@@ -63,11 +94,15 @@ class RateLimiter:
     async def check_rate_limit(
         self,
         request: Request,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        cost: int = 1
     ) -> bool:
         """
         Zkontroluje rate limit.
 
+        Args:
+            cost: Váha requestu (drahé endpointy spotřebují víc tokenů)
+
         Returns:
             True pokud je request povolen
 
@@ -75,44 +110,63 @@ class RateLimiter:
             HTTPException: Pokud je překročen limit
         """
         identifier = self._get_identifier(request, user_id)
+
+        if redis_breaker.allow():
+            try:
+                if self.leaser:
+                    # Výsledek hlásí breakeru leaser - jen při skutečném pronájmu z Redisu
+                    allowed = await self.leaser.acquire(identifier, cost)
+                else:
+                    allowed = self._check_exact(identifier, cost)
+                    redis_breaker.record_success()
+            except redis.RedisError as e:
+                logger.error(f"Redis error in rate limiter: {e}")
+                if not self.leaser:
+                    redis_breaker.record_failure()
+                allowed = self.fallback.acquire(identifier, cost)
+            finally:
+                # Request obsloužený z lokální zásoby zkušební volání neprovedl
+                redis_breaker.release_trial()
+        else:
+            # Degradovaný režim - Redis se nevolá, limituje se v paměti workeru
+            allowed = self.fallback.acquire(identifier, cost)
+
+        if not allowed:
+            logger.warning(
+                f"Rate limit exceeded for {identifier}: "
+                f"limit {self.requests} in {self.window}s"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={
+                    "error": "Rate limit exceeded",
+                    "limit": self.requests,
+                    "window": self.window,
+                    "retry_after": self.window
+                }
+            )
+
+        return True
+
+    def _check_exact(self, identifier: str, cost: int = 1) -> bool:
+        """Přesná kontrola - jeden INCR v Redisu na každý request."""
         key = self._get_redis_key(identifier)
 
-        try:
-            # Inkrementuj počítadlo
-            current = redis_client.incr(key)
-
-            # Nastav expiraci při prvním requestu v okně
-            if current == 1:
-                redis_client.expire(key, self.window)
-
-            # Zkontroluj limit
-            if current > self.requests:
-                logger.warning(
-                    f"Rate limit exceeded for {identifier}: "
-                    f"{current}/{self.requests} in {self.window}s"
-                )
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail={
-                        "error": "Rate limit exceeded",
-                        "limit": self.requests,
-                        "window": self.window,
-                        "retry_after": self.window
-                    }
-                )
-
-            return True
-
-        except redis.RedisError as e:
-            logger.error(f"Redis error in rate limiter: {e}")
-            # Při chybě Redis povolit request (fail open)
-            return True
+        # Inkrementuj počítadlo
+        current = redis_client.incrby(key, cost)
+
+        # Nastav expiraci při prvním requestu v okně
+        if current == cost:
+            redis_client.expire(key, self.window)
+
+        return current <= self.requests
 
 
 # Globální instance pro různé use cases
 default_limiter = RateLimiter(requests=500, window=60)
-strict_limiter = RateLimiter(requests=150, window=60)
-auth_limiter = RateLimiter(requests=500, window=60)
+strict_limiter = RateLimiter(requests=150, window=60, prefix="rate_limit_strict")
+auth_limiter = RateLimiter(requests=500, window=60, prefix="rate_limit_auth")
+login_limiter = RateLimiter(requests=20, window=60, prefix="rate_limit_login")
 
 
 # Dependency pro FastAPI
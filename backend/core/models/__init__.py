@@ -9,4 +9,7 @@ import backend.core.models.deal
 import backend.core.models.lead
 import backend.core.models.company
 import backend.core.models.product
+import backend.core.models.entity_index
+import backend.core.models.stats
+import backend.core.models.document_item
 import backend.apps.doc.model
@@ -103,6 +103,29 @@ class Company(Base):
         Index('idx_company_name', 'name'),
     )
 
+    # Jak se dají sloupce filtrovat přes query parametry (viz backend/core/utils/search.py)
+    # exact / prefix / contains / range / none - nedeklarované sloupce se filtrují podle typu
+    __filter_capabilities__ = {
+        "ico": "prefix",
+        "dic": "prefix",
+        "vat_id": "prefix",
+        "email": "prefix",
+        "name": "contains",
+        "legal_name": "contains",
+        "address_city": "contains",
+        "default_currency": "exact",
+        "internal_notes": "none",
+    }
+
+    # Sloupce fulltextového indexu (viz backend/core/utils/fulltext.py)
+    __fulltext__ = ("name", "legal_name", "ico", "dic", "email", "address_city")
+
+    # Sloupce trigramového (fuzzy) vyhledávání pro typeahead (viz backend/core/utils/trigram.py)
+    __trigram__ = ("name", "legal_name", "ico", "email")
+
+    # Indexovat štítky a custom fields (viz backend/core/utils/entity_index.py)
+    __entity_index__ = True
+
     # Relationships
     invoices_as_supplier = relationship(
         "Invoice",
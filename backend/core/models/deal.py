@@ -7,6 +7,8 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 
+from backend.core.services.pricing import DEAL, calculate_batch, recalculate_document
+
 from .base import Base
 from .utils import PaymentMethod
 
@@ -131,6 +133,10 @@ class Deal(Base):
     # Zaokrouhlení
     rounding = Column(Float, default=0.0)
 
+    # Průběžné součty po sazbách DPH pro úpravy jednotlivých položek
+    # (backend/core/services/pricing.py - RunningTotals)
+    pricing_state = Column(JSON)
+
     # =====================================================
     # PLATBY (agregováno z faktur)
     # =====================================================
@@ -172,8 +178,47 @@ class Deal(Base):
         Index('idx_deal_company', 'company_id'),
         Index('idx_deal_payment_status', 'payment_status'),
         Index('idx_deal_dates', 'deal_date', 'delivery_date'),
+        Index('idx_deal_user_active_created', 'user_id', 'is_active', 'created_at', 'id'),  # Keyset stránkování
+        # Pokrývající index pro statistiky (GET /deals/stats) - bez čtení tabulky
+        Index('idx_deal_stats', 'user_id', 'is_active', 'deal_date', 'status', 'currency',
+              'assigned_to', 'total', 'paid_amount', 'created_at'),
     )
 
+    # Jak se dají sloupce filtrovat přes query parametry (viz backend/core/utils/search.py)
+    # exact / prefix / contains / range / none - nedeklarované sloupce se filtrují podle typu
+    __filter_capabilities__ = {
+        "deal_number": "prefix",
+        "user_id": "exact",
+        "assigned_to": "exact",
+        "created_by": "exact",
+        "currency": "exact",
+        "title": "contains",
+        "company_name": "contains",
+        "total": "range",
+        "paid_amount": "range",
+        "deal_date": "range",
+        "delivery_date": "range",
+        "created_at": "range",
+        "internal_notes": "none",
+        "pricing_state": "none",
+    }
+
+    # Sloupce fulltextového indexu (viz backend/core/utils/fulltext.py)
+    __fulltext__ = ("deal_number", "title", "company_name", "contact_person", "email", "description")
+
+    # Indexovat štítky a custom fields (viz backend/core/utils/entity_index.py)
+    __entity_index__ = True
+
+    # Výpočet součtů (viz backend/core/services/pricing.py)
+    __pricing__ = DEAL
+
+    # Řádkový index položek pro analytiku (viz backend/core/utils/document_items.py)
+    __document_items__ = {
+        "document_date": "deal_date",
+        "owner_id": "user_id",
+        "company_id": "company_id",
+    }
+
     # =====================================================
     # RELATIONSHIPS
     # =====================================================
@@ -226,51 +271,27 @@ class Deal(Base):
         """Počet položek"""
         return len(self.items or [])
 
+    def pricing_input(self) -> dict:
+        """Vstup pro výpočet součtů (backend/core/services/pricing.py)"""
+        return {
+            'items': self.items,
+            'discount': self.discount,
+            'discount_percent': self.discount_type == DiscountType.PERCENT,
+            'rounding': self.rounding,
+        }
+
     def recalculate_totals(self):
         """Přepočítá všechny součty z položek"""
-        subtotal = 0.0
-        vat_breakdown = {}
-
-        for item in (self.items or []):
-            quantity = float(item.get('quantity', 0) or 0)
-            unit_price = float(item.get('unit_price', 0) or 0)
-            discount_percent = float(item.get('discount_percent', 0) or 0)
-            vat_rate = float(item.get('vat_rate', 0) or 0)
-
-            item_subtotal = quantity * unit_price
-            item_discount = item_subtotal * (discount_percent / 100)
-            item_after_discount = item_subtotal - item_discount
-
-            subtotal += item_after_discount
-
-            # DPH rozpad
-            item_vat = item_after_discount * (vat_rate / 100)
-            rate_key = str(int(vat_rate))
-            if rate_key not in vat_breakdown:
-                vat_breakdown[rate_key] = {'base': 0.0, 'vat': 0.0}
-            vat_breakdown[rate_key]['base'] += item_after_discount
-            vat_breakdown[rate_key]['vat'] += item_vat
-
-        self.subtotal = round(subtotal, 2)
-
-        # Aplikace slevy na celou objednávku
-        if self.discount_type == DiscountType.PERCENT:
-            self.discount_amount = round(subtotal * ((self.discount or 0) / 100), 2)
-        else:
-            self.discount_amount = round(self.discount or 0, 2)
-
-        self.subtotal_after_discount = round(subtotal - self.discount_amount, 2)
-
-        # Přepočet DPH po slevě (proporcionálně)
-        if subtotal > 0:
-            discount_ratio = self.subtotal_after_discount / subtotal
-            for rate_key in vat_breakdown:
-                vat_breakdown[rate_key]['base'] = round(vat_breakdown[rate_key]['base'] * discount_ratio, 2)
-                vat_breakdown[rate_key]['vat'] = round(vat_breakdown[rate_key]['vat'] * discount_ratio, 2)
-
-        self.vat_breakdown = vat_breakdown
-        self.total_vat = round(sum(v['vat'] for v in vat_breakdown.values()), 2)
-        self.total = round(self.subtotal_after_discount + self.total_vat + (self.rounding or 0), 2)
+        recalculate_document(self)
+
+    @classmethod
+    def recalculate_totals_many(cls, deals: list["Deal"]):
+        """Přepočítá součty mnoha objednávek najednou (importy, přecenění)"""
+        totals = calculate_batch([deal.pricing_input() for deal in deals], DEAL)
+        for deal, deal_totals in zip(deals, totals):
+            for field, value in deal_totals.items():
+                setattr(deal, field, value)
+            deal.pricing_state = None  # Průběžné součty se dopočítají při úpravě položky
 
     def recalculate_payment_status(self):
         """Přepočítá stav platby z faktur"""
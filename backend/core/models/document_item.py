@@ -0,0 +1,57 @@
+# backend/core/models/document_item.py
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, Index
+
+from .base import Base
+
+
+# =====================================================
+# DOCUMENT ITEM - Řádkový index položek dokladů
+# =====================================================
+class DocumentItem(Base):
+    """
+    Normalizované položky objednávek a faktur pro analytiku.
+
+    Zdrojem pravdy zůstává JSON sloupec `items` na dokladu, tabulka se
+    udržuje při zápisu (viz backend/core/utils/document_items.py).
+    Hlavičkové údaje dokladu (datum, zákazník, stav, ...) jsou zkopírované
+    do každého řádku, reporty jsou pak jeden GROUP BY bez joinu na doklady.
+    """
+    __tablename__ = "document_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Polymorfní vztah - název tabulky dokladu + ID záznamu
+    document_type = Column(String(50), nullable=False)
+    document_id = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False, default=0)  # Pořadí v items
+
+    # Hlavička dokladu
+    document_subtype = Column(String(20))  # Typ faktury (invoice, proforma, ...), u dealů NULL
+    status = Column(String(20))
+    owner_id = Column(String(100))  # Deal.user_id / Invoice.created_by
+    company_id = Column(Integer)    # Deal.company_id / Invoice.customer_id
+    document_date = Column(Date)    # Deal.deal_date (jinak datum vytvoření) / Invoice.issue_date
+    currency = Column(String(3))
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    # Položka
+    product_id = Column(Integer)
+    code = Column(String(100))      # Kód produktu (deal) / SKU (faktura)
+    name = Column(String(255))
+    quantity = Column(Float, default=0.0)
+    unit = Column(String(20))
+    unit_price = Column(Float, default=0.0)
+    net_amount = Column(Float, default=0.0)  # Základ po slevě položky (u dealu i po poměrné slevě dokladu)
+    vat_rate = Column(Float, default=0.0)
+    vat_amount = Column(Float, default=0.0)  # Faktury bez DPH mají 0
+
+    __table_args__ = (
+        Index('idx_document_items_document', 'document_type', 'document_id'),
+        Index('idx_document_items_owner_date', 'owner_id', 'document_type', 'document_date'),
+        Index('idx_document_items_product', 'product_id', 'document_date'),
+        Index('idx_document_items_code', 'code', 'document_date'),
+        Index('idx_document_items_company', 'company_id', 'document_date'),
+    )
+
+    def __repr__(self):
+        return f"<DocumentItem({self.document_type}:{self.document_id}#{self.position} '{self.name}')>"
@@ -0,0 +1,56 @@
+# backend/core/models/entity_index.py
+from sqlalchemy import Column, Integer, String, Index
+
+from .base import Base
+
+
+# =====================================================
+# ENTITY TAG - Index štítků (JSON sloupec `tags`)
+# =====================================================
+class EntityTag(Base):
+    """
+    Normalizovaný index štítků.
+
+    Zdrojem pravdy zůstává JSON sloupec `tags` na entitě, tabulka se
+    udržuje při zápisu (viz backend/core/utils/entity_index.py) a slouží
+    jen pro rychlé filtrování `?tag=...`.
+    """
+    __tablename__ = "entity_tags"
+
+    # Polymorfní vztah - název tabulky entity + ID záznamu
+    entity_type = Column(String(50), primary_key=True)
+    entity_id = Column(Integer, primary_key=True)
+    tag = Column(String(100), primary_key=True)  # Normalizováno (lowercase, bez mezer na okrajích)
+
+    __table_args__ = (
+        Index('idx_entity_tag_lookup', 'entity_type', 'tag', 'entity_id'),
+    )
+
+    def __repr__(self):
+        return f"<EntityTag({self.entity_type}:{self.entity_id} '{self.tag}')>"
+
+
+# =====================================================
+# ENTITY FIELD VALUE - Index deklarovaných custom fields
+# =====================================================
+class EntityFieldValue(Base):
+    """
+    Index hodnot vybraných custom fields (settings.indexed_custom_fields).
+
+    Hodnota se ukládá jako text, list hodnot se rozloží na více řádků.
+    """
+    __tablename__ = "entity_field_values"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    field = Column(String(100), nullable=False)
+    value = Column(String(255))
+
+    __table_args__ = (
+        Index('idx_entity_field_lookup', 'entity_type', 'field', 'value', 'entity_id'),
+        Index('idx_entity_field_entity', 'entity_type', 'entity_id'),
+    )
+
+    def __repr__(self):
+        return f"<EntityFieldValue({self.entity_type}:{self.entity_id} {self.field}='{self.value}')>"
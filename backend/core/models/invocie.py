@@ -7,6 +7,8 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 
+from backend.core.services.pricing import INVOICE, calculate_batch, recalculate_document
+
 from .base import Base
 from .utils import PaymentMethod, VatMode
 
@@ -167,6 +169,10 @@ class Invoice(Base):
     # Zaokrouhlení
     rounding = Column(Float, default=0.0)
 
+    # Průběžné součty po sazbách DPH pro úpravy jednotlivých položek
+    # (backend/core/services/pricing.py - RunningTotals)
+    pricing_state = Column(JSON)
+
     # =====================================================
     # TEXTY NA FAKTUŘE
     # =====================================================
@@ -205,8 +211,40 @@ class Invoice(Base):
         Index('idx_invoice_dates', 'issue_date', 'due_date'),
         Index('idx_invoice_status_due', 'status', 'due_date'),
         Index('idx_invoice_deal', 'deal_id'),  # NOVÝ INDEX
+        Index('idx_invoice_created', 'created_at', 'id'),  # Keyset stránkování
+        Index('idx_invoice_owner_created', 'created_by', 'created_at', 'id'),  # Seznam faktur uživatele
     )
 
+    # Jak se dají sloupce filtrovat přes query parametry (viz backend/core/utils/search.py)
+    # exact / prefix / contains / range / none - nedeklarované sloupce se filtrují podle typu
+    __filter_capabilities__ = {
+        "invoice_number": "prefix",
+        "variable_symbol": "prefix",
+        "created_by": "exact",
+        "currency": "exact",
+        "customer_name": "contains",
+        "supplier_name": "contains",
+        "total": "range",
+        "issue_date": "range",
+        "due_date": "range",
+        "paid_date": "range",
+        "created_at": "range",
+        "internal_notes": "none",
+        "pricing_state": "none",
+    }
+
+    # Výpočet součtů (viz backend/core/services/pricing.py)
+    __pricing__ = INVOICE
+
+    # Řádkový index položek pro analytiku (viz backend/core/utils/document_items.py)
+    __document_items__ = {
+        "document_date": "issue_date",
+        "owner_id": "created_by",
+        "company_id": "customer_id",
+        "document_subtype": "invoice_type",
+        "vat_mode": "vat_mode",
+    }
+
     # =====================================================
     # RELATIONSHIPS
     # =====================================================
@@ -249,42 +287,26 @@ class Invoice(Base):
         """Zbývající částka k zaplacení"""
         return max(0, self.total - (self.paid_amount or 0))
 
+    def pricing_input(self) -> dict:
+        """Vstup pro výpočet součtů (backend/core/services/pricing.py)"""
+        return {
+            'items': self.items,
+            'with_vat': self.vat_mode == VatMode.WITH_VAT,
+            'rounding': self.rounding,
+        }
+
     def recalculate_totals(self):
         """Přepočítá všechny součty z položek"""
-        subtotal = 0.0
-        discount_total = 0.0
-        vat_breakdown = {}
-
-        for item in (self.items or []):
-            quantity = float(item.get('quantity', 0) or 0)
-            unit_price = float(item.get('unit_price', 0) or 0)
-            discount_percent = float(item.get('discount_percent', 0) or 0)
-            vat_rate = float(item.get('vat_rate', 0) or 0)
-
-            item_subtotal = quantity * unit_price
-            item_discount = item_subtotal * (discount_percent / 100)
-            item_after_discount = item_subtotal - item_discount
-
-            subtotal += item_subtotal
-            discount_total += item_discount
-
-            # DPH pouze pokud je faktura s DPH
-            if self.vat_mode == VatMode.WITH_VAT:
-                item_vat = item_after_discount * (vat_rate / 100)
-
-                # Rozpad DPH podle sazeb
-                rate_key = str(int(vat_rate))
-                if rate_key not in vat_breakdown:
-                    vat_breakdown[rate_key] = {'base': 0.0, 'vat': 0.0}
-                vat_breakdown[rate_key]['base'] += item_after_discount
-                vat_breakdown[rate_key]['vat'] += item_vat
-
-        self.subtotal = round(subtotal, 2)
-        self.discount_amount = round(discount_total, 2)
-        self.subtotal_after_discount = round(subtotal - discount_total, 2)
-        self.vat_breakdown = {k: {'base': round(v['base'], 2), 'vat': round(v['vat'], 2)} for k, v in vat_breakdown.items()}
-        self.total_vat = round(sum(v['vat'] for v in vat_breakdown.values()), 2)
-        self.total = round(self.subtotal_after_discount + self.total_vat + (self.rounding or 0), 2)
+        recalculate_document(self)
+
+    @classmethod
+    def recalculate_totals_many(cls, invoices: list["Invoice"]):
+        """Přepočítá součty mnoha faktur najednou (importy, přecenění)"""
+        totals = calculate_batch([invoice.pricing_input() for invoice in invoices], INVOICE)
+        for invoice, invoice_totals in zip(invoices, totals):
+            for field, value in invoice_totals.items():
+                setattr(invoice, field, value)
+            invoice.pricing_state = None  # Průběžné součty se dopočítají při úpravě položky
 
     # =====================================================
     # NOVÉ METODY PRO PRÁCI S DEAL
@@ -364,13 +386,6 @@ class Invoice(Base):
         invoice = cls(**invoice_data)
         invoice.recalculate_totals()
         return invoice
-        def sync_payment_to_deal(self):
-            """
-            Synchronizuje stav platby zpět do dealu.
-            Volat po změně paid_amount nebo status.
-            """
-            if self.deal:
-                self.deal.recalculate_payment_status()
 
 
 # =====================================================
@@ -141,8 +141,37 @@ class Lead(Base):
         Index('idx_lead_company', 'company_id'),
         Index('idx_lead_assigned', 'assigned_to', 'status'),
         Index('idx_lead_close_date', 'expected_close_date'),
+        Index('idx_lead_created', 'created_at', 'id'),  # Keyset stránkování
+        # Pokrývající index pro statistiky (GET /leads/stats/overview) - bez čtení tabulky
+        Index('idx_lead_stats', 'is_active', 'status', 'currency', 'assigned_to',
+              'value', 'probability', 'created_at'),
     )
 
+    # Jak se dají sloupce filtrovat přes query parametry (viz backend/core/utils/search.py)
+    # exact / prefix / contains / range / none - nedeklarované sloupce se filtrují podle typu
+    __filter_capabilities__ = {
+        "user_id": "exact",
+        "assigned_to": "exact",
+        "created_by": "exact",
+        "currency": "exact",
+        "email": "prefix",
+        "title": "contains",
+        "company_name": "contains",
+        "contact_person": "contains",
+        "value": "range",
+        "expected_close_date": "range",
+        "created_at": "range",
+    }
+
+    # Sloupce fulltextového indexu (viz backend/core/utils/fulltext.py)
+    __fulltext__ = ("title", "company_name", "contact_person", "email", "description")
+
+    # Sloupce trigramového (fuzzy) vyhledávání pro typeahead (viz backend/core/utils/trigram.py)
+    __trigram__ = ("contact_person", "email")
+
+    # Indexovat štítky a custom fields (viz backend/core/utils/entity_index.py)
+    __entity_index__ = True
+
     # =====================================================
     # RELATIONSHIPS
     # =====================================================
@@ -52,7 +52,7 @@ class Product(Base):
     # STAV
     # =====================================================
     is_active = Column(Boolean, default=True, nullable=False, index=True)  # Je v nabídce?
-    is_featured = Column(Boolean, default=False)  # Oblíbený/doporučený
+    is_featured = Column(Boolean, default=False, nullable=False)  # Oblíbený/doporučený
 
     # =====================================================
     # METADATA
@@ -67,6 +67,30 @@ class Product(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     created_by = Column(String(100), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
 
+    __table_args__ = (
+        # Keyset stránkování - stejné směry jako PRODUCT_LIST_ORDER (is_featured DESC, name, id)
+        Index('idx_product_listing_featured', 'is_active', is_featured.desc(), 'name', 'id'),
+    )
+
+    # Jak se dají sloupce filtrovat přes query parametry (viz backend/core/utils/search.py)
+    # exact / prefix / contains / range / none - nedeklarované sloupce se filtrují podle typu
+    __filter_capabilities__ = {
+        "code": "prefix",
+        "ean": "exact",
+        "category": "exact",
+        "currency": "exact",
+        "unit": "exact",
+        "created_by": "exact",
+        "name": "contains",
+        "price": "range",
+        "cost": "range",
+    }
+
+    # Sloupce fulltextového indexu (viz backend/core/utils/fulltext.py)
+    __fulltext__ = ("name", "code", "ean", "category", "description")
+
+    # Indexovat štítky a custom fields (viz backend/core/utils/entity_index.py)
+    __entity_index__ = True
 
     # =====================================================
     # RELATIONSHIPS
@@ -0,0 +1,55 @@
+# backend/core/models/stats.py
+from sqlalchemy import Column, Integer, String, Float, Enum
+
+from .base import Base
+from .deal import DealStatus
+from .lead import LeadStatus
+
+
+# =====================================================
+# DEAL STATS - Souhrn dealů po (uživatel, stav, měna)
+# =====================================================
+class DealStatsSummary(Base):
+    """
+    Průběžně udržovaný souhrn aktivních dealů.
+
+    Aktualizuje se ve stejné transakci jako samotné dealy (viz
+    backend/core/services/stats.py), statistiky se pak čtou z pár řádků
+    místo agregace celé tabulky.
+    """
+    __tablename__ = "deal_stats"
+
+    user_id = Column(String(100), primary_key=True)
+    status = Column(Enum(DealStatus), primary_key=True)
+    currency = Column(String(3), primary_key=True)
+
+    count = Column(Integer, default=0, nullable=False)
+    total_value = Column(Float, default=0.0, nullable=False)
+    paid_value = Column(Float, default=0.0, nullable=False)
+
+    def __repr__(self):
+        return f"<DealStatsSummary({self.user_id} {self.status} {self.currency}: {self.count})>"
+
+
+# =====================================================
+# LEAD STATS - Souhrn leadů po (uživatel, stav, měna)
+# =====================================================
+class LeadStatsSummary(Base):
+    """
+    Průběžně udržovaný souhrn aktivních leadů.
+
+    Leady bez měny mají currency = "" (sloupec je součástí primárního klíče).
+    """
+    __tablename__ = "lead_stats"
+
+    user_id = Column(String(100), primary_key=True)
+    status = Column(Enum(LeadStatus), primary_key=True)
+    currency = Column(String(3), primary_key=True)
+
+    count = Column(Integer, default=0, nullable=False)
+    total_value = Column(Float, default=0.0, nullable=False)
+    weighted_value = Column(Float, default=0.0, nullable=False)  # Součet value * probability / 100
+    probability_sum = Column(Float, default=0.0, nullable=False)
+
+    def __repr__(self):
+        return f"<LeadStatsSummary({self.user_id} {self.status} {self.currency}: {self.count})>"
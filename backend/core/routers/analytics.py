@@ -0,0 +1,88 @@
+# backend/core/routers/analytics.py
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from backend.core.services.auth import get_current_user, require_permissions
+from backend.core.db import get_db
+from backend.core.models.auth import User, PermissionType
+from backend.core.schemas.analytics import ProductSales, CustomerSales, VatSummary
+from backend.core.schemas.utils import DocumentType
+from backend.core.services.analytics import product_sales, customer_sales, vat_summary
+
+router = APIRouter()
+
+
+# =====================================================
+# PRODEJNÍ ANALYTIKA (tabulka document_items)
+# =====================================================
+@router.get(
+    "/products",
+    response_model=List[ProductSales],
+    dependencies=[Depends(require_permissions("analytics", PermissionType.READ))]
+)
+async def get_product_sales(
+    document_type: DocumentType = DocumentType.INVOICES,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    currency: Optional[str] = None,
+    product_id: Optional[int] = None,
+    code: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Prodeje po produktech za období.
+
+    - **document_type**: invoices (vyfakturováno) nebo deals (objednáno)
+    - **product_id / code**: jen jeden produkt
+    """
+    return product_sales(
+        db, current_user.id, document_type,
+        date_from=date_from, date_to=date_to, currency=currency,
+        product_id=product_id, code=code, limit=limit
+    )
+
+
+@router.get(
+    "/customers",
+    response_model=List[CustomerSales],
+    dependencies=[Depends(require_permissions("analytics", PermissionType.READ))]
+)
+async def get_customer_sales(
+    document_type: DocumentType = DocumentType.INVOICES,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    currency: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Nejvýznamnější zákazníci podle obratu za období."""
+    return customer_sales(
+        db, current_user.id, document_type,
+        date_from=date_from, date_to=date_to, currency=currency, limit=limit
+    )
+
+
+@router.get(
+    "/vat",
+    response_model=List[VatSummary],
+    dependencies=[Depends(require_permissions("analytics", PermissionType.READ))]
+)
+async def get_vat_summary(
+    document_type: DocumentType = DocumentType.INVOICES,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    currency: Optional[str] = None,
+    by_month: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Základ a DPH po sazbách (by_month=true rozpadne i po měsících)."""
+    return vat_summary(
+        db, current_user.id, document_type,
+        date_from=date_from, date_to=date_to, currency=currency, by_month=by_month
+    )
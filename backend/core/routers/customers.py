@@ -1,17 +1,46 @@
 # backend/routers/companies.py
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from backend.core.services.auth import get_current_user, require_permissions
 from backend.core.db import get_db
 from backend.core.models.auth import User, PermissionType
 from backend.core.models.company import Company, CompanyType
-from backend.core.schemas.company import CompanyCreate, CompanyUpdate, CompanyPublic, CompanySimple
-from backend.core.utils.search import apply_dynamic_filters, get_filter_params
+from backend.core.schemas.utils import ExportFormat
+from backend.core.schemas.company import CompanyCreate, CompanyUpdate, CompanyPublic, CompanySimple, CompanyLookup
+from backend.core.utils.search import apply_dynamic_filters, get_filter_params, has_dynamic_filters
+from backend.core.utils.pagination import paginate
+from backend.core.utils.export import EXPORT_PARAMS, default_columns, export_response, resolve_columns
+from backend.core.utils.fulltext import apply_fulltext_search
+from backend.core.utils.trigram import trigram_lookup
 
 router = APIRouter()
 
+# Řadicí klíč seznamu (keyset stránkování)
+COMPANY_LIST_ORDER = [(Company.id, False)]
+
+
+def filter_companies(
+    query,
+    company_type: Optional[CompanyType] = None,
+    search: Optional[str] = None,
+    filters: Optional[dict] = None,
+    ranked: bool = False
+):
+    """Filtry seznamu společností (společné pro list a export)."""
+    if search:
+        query = apply_fulltext_search(query, Company, search, rank=ranked)
+
+    # Filtr podle typu
+    if company_type:
+        query = query.filter(
+            (Company.company_type == company_type) |
+            (Company.company_type == CompanyType.BOTH)
+        )
+
+    return apply_dynamic_filters(query, Company, filters or {})
+
 
 @router.get(
     "/",
@@ -19,25 +48,86 @@ router = APIRouter()
     dependencies=[Depends(require_permissions("companies", PermissionType.READ))]
 )
 async def list_companies(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     company_type: Optional[CompanyType] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     filters: dict = Depends(get_filter_params()),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Vrátí seznam společností s možností filtrování."""
-    query = db.query(Company)
+    """
+    Vrátí seznam společností s možností filtrování.
+
+    - **search**: Fulltextové hledání (název, IČO, DIČ, e-mail, město), řazeno podle relevance
+    - **cursor**: Kurzor další stránky z hlavičky X-Next-Cursor (místo skip)
+    - **include_total**: Vrátit celkový počet v hlavičce X-Total-Count (X-Total-Exact = false u odhadu)
+    """
+    ranked = bool(search) and not cursor
+    query = filter_companies(db.query(Company), company_type, search, filters, ranked)
+    return paginate(
+        query, COMPANY_LIST_ORDER, limit, skip, cursor, response,
+        ranked=ranked, include_total=include_total,
+        unfiltered=not (company_type or search or has_dynamic_filters(Company, filters))
+    )
 
-    # Filtr podle typu
+
+@router.get(
+    "/export",
+    dependencies=[Depends(require_permissions("companies", PermissionType.READ))]
+)
+async def export_companies(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    columns: Optional[str] = Query(None, description="Čárkami oddělené sloupce (výchozí všechny)"),
+    company_type: Optional[CompanyType] = None,
+    search: Optional[str] = None,
+    filters: dict = Depends(get_filter_params(EXPORT_PARAMS)),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Streamovaný export společností (CSV nebo NDJSON) se stejnými filtry jako seznam."""
+    query = filter_companies(db.query(Company), company_type, search, filters)
+    return export_response(
+        db, query, Company, resolve_columns(default_columns(Company), columns),
+        export_format, "companies", COMPANY_LIST_ORDER
+    )
+
+
+@router.get(
+    "/lookup",
+    response_model=List[CompanyLookup],
+    dependencies=[Depends(require_permissions("companies", PermissionType.READ))]
+)
+async def lookup_companies(
+    q: str = Query(..., min_length=2, max_length=100),
+    company_type: Optional[CompanyType] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Typeahead hledání společností (název, právní název, IČO, e-mail).
+
+    Toleruje překlepy a části slov, výsledky jsou seřazené podle skóre shody.
+    """
+    query = db.query(Company).filter(Company.is_active == True)
     if company_type:
         query = query.filter(
             (Company.company_type == company_type) |
             (Company.company_type == CompanyType.BOTH)
         )
 
-    query = apply_dynamic_filters(query, Company, filters)
-    return query.offset(skip).limit(limit).all()
+    return [
+        CompanyLookup(
+            **CompanySimple.model_validate(company).model_dump(),
+            score=round(score, 3),
+            matched_field=field
+        )
+        for company, score, field in trigram_lookup(db, Company, q, limit=limit, query=query)
+    ]
 
 
 
@@ -1,127 +1,88 @@
 # backend/routers/deals.py
 from datetime import datetime, date
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload, defer
 
 from backend.core.services.auth import get_current_user, require_permissions
 from backend.core.db import get_db
 from backend.core.models.auth import User, PermissionType
 from backend.core.models.lead import Lead, LeadStatus
-from backend.core.models.deal import Deal, DealStatus, PaymentStatus, DealSequence
-from backend.core.models.invocie import Invoice, InvoiceType, InvoiceSequence
+from backend.core.models.deal import Deal, DealStatus, PaymentStatus
+from backend.core.models.invocie import Invoice, InvoiceType
 from backend.core.models.company import Company
 from backend.core.schemas.deal import (
     DealCreate, DealUpdate, DealPublic, DealSimple, 
-    DealListItem, DealStats, LeadToDealConvert
+    DealListItem, DealStats, LeadToDealConvert,
+    DealItem, DealItemUpdate, DealBulkUpdateItem, DealBulkTransition
 )
-from backend.core.schemas.invoice import InvoiceFromDealCreate, InvoiceFromDealResponse
+from backend.core.schemas.invoice import (
+    InvoiceFromDealCreate, InvoiceFromDealResponse, InvoiceBatchFromDeals, InvoiceBatchResult
+)
+from backend.core.schemas.utils import ExportFormat, StatsGroupBy, ItemsReorder, BulkResult, BulkTransitionResult, BulkDeleteResult
+from backend.core.services.stats import deal_stats
+from backend.core.services.payments import refresh_deal_payments
+from backend.core.services.sequences import next_deal_number, next_invoice_number, variable_symbol_for
+from backend.core.services.bulk import (
+    create_deals, update_deals, transition_deals, delete_deals, invoice_deals, DEFAULT_CHUNK_SIZE
+)
+from backend.core.services.line_items import add_item, replace_item, remove_item, reorder_items
 from backend.core.utils.search import apply_dynamic_filters, get_filter_params
+from backend.core.utils.pagination import paginate
+from backend.core.utils.fulltext import apply_fulltext_search
+from backend.core.utils.export import EXPORT_PARAMS, default_columns, export_response, resolve_columns
 
 router = APIRouter()
 
+# Řadicí klíč seznamu (keyset stránkování)
+DEAL_LIST_ORDER = [(Deal.created_at, True), (Deal.id, True)]
+
+# Sloupce dealu, které se vrací v response (DealPublic)
+DEAL_RESPONSE_COLUMNS = (
+    "id", "deal_number", "title", "description", "status", "user_id", "lead_id",
+    "company_id", "contact_person", "email", "phone", "items", "currency",
+    "subtotal", "discount", "discount_type", "discount_amount", "subtotal_after_discount",
+    "vat_breakdown", "total_vat", "total", "rounding", "payment_status", "paid_amount",
+    "remaining_amount", "payment_method", "deal_date", "delivery_date", "completed_at",
+    "assigned_to", "tags", "custom_fields", "notes", "internal_notes", "is_active",
+    "created_at", "updated_at", "created_by",
+)
 
-# =====================================================
-# HELPERS
-# =====================================================
-def get_next_deal_number(db: Session, user_id: str) -> str:
-    """Vygeneruje další číslo objednávky."""
-    current_year = datetime.utcnow().year
-
-    sequence = db.query(DealSequence).filter(
-        DealSequence.user_id == user_id,
-        DealSequence.year == current_year
-    ).first()
-
-    if not sequence:
-        sequence = DealSequence(
-            user_id=user_id,
-            year=current_year,
-            prefix="OBJ",
-            last_number=0,
-            format_pattern="{prefix}{year}-{number:04d}"
-        )
-        db.add(sequence)
-
-    deal_number = sequence.get_next_number()
-    db.flush()
-    return deal_number
-
-
-def get_next_invoice_number(db: Session, invoice_type: InvoiceType) -> str:
-    """Vygeneruje další číslo faktury."""
-    current_year = datetime.utcnow().year
-
-    sequence = db.query(InvoiceSequence).filter(
-        InvoiceSequence.invoice_type == invoice_type,
-        InvoiceSequence.year == current_year
-    ).first()
+# JSON sloupce, které místo None vrací prázdnou kolekci
+DEAL_EMPTY_DEFAULTS = {"items": list, "vat_breakdown": dict, "tags": list, "custom_fields": dict}
 
-    if not sequence:
-        prefix_map = {
-            InvoiceType.INVOICE: "FV",
-            InvoiceType.PROFORMA: "PF",
-            InvoiceType.CREDIT_NOTE: "D",
-            InvoiceType.DEBIT_NOTE: "V",
-            InvoiceType.RECEIPT: "P",
-        }
-        sequence = InvoiceSequence(
-            invoice_type=invoice_type,
-            year=current_year,
-            prefix=prefix_map.get(invoice_type, "FV"),
-            last_number=0,
-            format_pattern="{prefix}{year}{number:04d}"
-        )
-        db.add(sequence)
+# Sloupce, které kompaktní seznam (compact=true) nenačítá ani nevrací
+DEAL_COMPACT_DEFERRED = ("internal_notes",)
 
-    invoice_number = sequence.get_next_number()
-    db.flush()
-    return invoice_number
 
+# =====================================================
+# HELPERS
+# =====================================================
+def serialize_deal(
+    deal: Deal,
+    invoice_summary: Optional[tuple[int, float]] = None,
+    exclude: tuple[str, ...] = ()
+) -> dict:
+    """
+    Sestaví deal response z vybraných sloupců (bez seznamu faktur).
 
-def enrich_deal_response(deal: Deal, db: Session) -> dict:
-    """Obohatí deal response o related data."""
-    deal_dict = {
-        "id": deal.id,
-        "deal_number": deal.deal_number,
-        "title": deal.title,
-        "description": deal.description,
-        "status": deal.status,
-        "user_id": deal.user_id,
-        "lead_id": deal.lead_id,
-        "company_id": deal.company_id,
-        "company_name": deal.company_name or (deal.company.name if deal.company else None),
-        "contact_person": deal.contact_person,
-        "email": deal.email,
-        "phone": deal.phone,
-        "items": deal.items or [],  # DŮLEŽITÉ: Vrátí prázdné pole místo None
-        "currency": deal.currency,
-        "subtotal": deal.subtotal,
-        "discount": deal.discount,
-        "discount_type": deal.discount_type,
-        "discount_amount": deal.discount_amount,
-        "subtotal_after_discount": deal.subtotal_after_discount,
-        "vat_breakdown": deal.vat_breakdown or {},
-        "total_vat": deal.total_vat,
-        "total": deal.total,
-        "rounding": deal.rounding,
-        "payment_status": deal.payment_status,
-        "paid_amount": deal.paid_amount,
-        "remaining_amount": deal.remaining_amount,
-        "payment_method": deal.payment_method,
-        "deal_date": deal.deal_date,
-        "delivery_date": deal.delivery_date,
-        "completed_at": deal.completed_at,
-        "assigned_to": deal.assigned_to,
-        "tags": deal.tags or [],
-        "custom_fields": deal.custom_fields or {},
-        "notes": deal.notes,
-        "internal_notes": deal.internal_notes,
-        "is_active": deal.is_active,
-        "created_at": deal.created_at,
-        "updated_at": deal.updated_at,
-        "created_by": deal.created_by,
-    }
+    Args:
+        deal: Deal s načteným lead/company (selectinload/joinedload)
+        invoice_summary: (počet aktivních faktur, fakturovaná částka)
+        exclude: Sloupce, které se nevrací (kompaktní seznam)
+    """
+    deal_dict = {}
+    for column in DEAL_RESPONSE_COLUMNS:
+        if column in exclude:
+            continue
+        value = getattr(deal, column)
+        # DŮLEŽITÉ: JSON sloupce vrací prázdnou kolekci místo None
+        if not value and column in DEAL_EMPTY_DEFAULTS:
+            value = DEAL_EMPTY_DEFAULTS[column]()
+        deal_dict[column] = value
+
+    deal_dict["company_name"] = deal.company_name or (deal.company.name if deal.company else None)
 
     # Lead data
     if deal.lead:
@@ -142,6 +103,42 @@ def enrich_deal_response(deal: Deal, db: Session) -> dict:
         }
 
     # Invoices summary
+    if invoice_summary:
+        deal_dict["invoices_count"], deal_dict["invoiced_amount"] = invoice_summary
+
+    return deal_dict
+
+
+def get_invoice_summaries(db: Session, deal_ids: list[int]) -> dict[int, tuple[int, float]]:
+    """
+    Počet aktivních faktur a fakturovaná částka pro dealy - jeden GROUP BY dotaz.
+
+    Returns:
+        {deal_id: (počet faktur, fakturovaná částka)}, dealy bez faktur chybí
+    """
+    if not deal_ids:
+        return {}
+
+    rows = db.query(
+        Invoice.deal_id,
+        func.count(Invoice.id),
+        func.coalesce(func.sum(Invoice.total), 0.0)
+    ).filter(
+        Invoice.deal_id.in_(deal_ids),
+        Invoice.is_active == True
+    ).group_by(Invoice.deal_id)
+
+    return {deal_id: (count, float(amount)) for deal_id, count, amount in rows}
+
+
+def enrich_deal_response(deal: Deal, db: Session) -> dict:
+    """Obohatí deal response o related data (detail - včetně seznamu faktur)."""
+    active_invoices = [inv for inv in deal.invoices if inv.is_active]
+    deal_dict = serialize_deal(
+        deal,
+        (len(active_invoices), sum(inv.total for inv in active_invoices)) if deal.invoices else None
+    )
+
     if deal.invoices:
         deal_dict["invoices_summary"] = [
             {
@@ -152,13 +149,47 @@ def enrich_deal_response(deal: Deal, db: Session) -> dict:
                 "total": inv.total,
                 "paid_amount": inv.paid_amount,
             }
-            for inv in deal.invoices if inv.is_active
+            for inv in active_invoices
         ]
-        deal_dict["invoiced_amount"] = sum(inv.total for inv in deal.invoices if inv.is_active)
 
     return deal_dict
 
 
+def filter_deals(
+    query,
+    user_id: str,
+    payment_status: Optional[PaymentStatus] = None,
+    company_id: Optional[int] = None,
+    search: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    filters: Optional[dict] = None,
+    ranked: bool = False
+):
+    """Filtry seznamu dealů (společné pro list a export)."""
+    query = query.filter(
+        Deal.user_id == user_id,
+        Deal.is_active == True
+    )
+
+    if payment_status:
+        query = query.filter(Deal.payment_status == payment_status)
+
+    if company_id:
+        query = query.filter(Deal.company_id == company_id)
+
+    if search:
+        query = apply_fulltext_search(query, Deal, search, rank=ranked)
+
+    if date_from:
+        query = query.filter(Deal.deal_date >= date_from)
+
+    if date_to:
+        query = query.filter(Deal.deal_date <= date_to)
+
+    return apply_dynamic_filters(query, Deal, filters or {})
+
+
 # =====================================================
 # LIST & SEARCH
 # =====================================================
@@ -168,6 +199,7 @@ def enrich_deal_response(deal: Deal, db: Session) -> dict:
     dependencies=[Depends(require_permissions("deals", PermissionType.READ))]
 )
 async def list_deals(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     payment_status: Optional[PaymentStatus] = None,
@@ -175,6 +207,9 @@ async def list_deals(
     search: Optional[str] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    compact: bool = False,
     filters: dict = Depends(get_filter_params()),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -185,45 +220,35 @@ async def list_deals(
     - **status**: Filtr podle stavu (draft, confirmed, in_progress, completed, cancelled)
     - **payment_status**: Filtr podle stavu platby
     - **company_id**: Filtr podle firmy
-    - **search**: Hledání v čísle a názvu
+    - **search**: Fulltextové hledání (číslo, název, firma, kontakt, popis), řazeno podle relevance
     - **date_from/date_to**: Filtr podle data uzavření
+    - **cursor**: Kurzor další stránky z hlavičky X-Next-Cursor (místo skip)
+    - **include_total**: Vrátit celkový počet v hlavičce X-Total-Count (X-Total-Exact = false u odhadu)
+    - **compact**: Nenačítat a nevracet interní poznámky (internal_notes)
+
+    Seznam faktur se nevrací - jen `invoices_count` a `invoiced_amount`
+    (jeden GROUP BY dotaz pro celou stránku), detail faktur je v GET /{deal_id}.
     """
+    ranked = bool(search) and not cursor
+    exclude = DEAL_COMPACT_DEFERRED if compact else ()
+
+    # selectinload - lead/company se načtou jedním IN dotazem pro celou stránku
+    # (joinedload s LIMIT obaluje dotaz subquery a násobí řádky)
     query = db.query(Deal).options(
-        joinedload(Deal.lead),
-        joinedload(Deal.company),
-        joinedload(Deal.invoices)
-    ).filter(
-        Deal.user_id == current_user.id,
-        Deal.is_active == True
+        selectinload(Deal.lead),
+        selectinload(Deal.company),
+        *[defer(getattr(Deal, column)) for column in exclude]
+    )
+    query = filter_deals(
+        query, current_user.id, payment_status, company_id, search, date_from, date_to, filters, ranked
+    )
+    deals = paginate(
+        query, DEAL_LIST_ORDER, limit, skip, cursor, response,
+        ranked=ranked, include_total=include_total
     )
-
-    if payment_status:
-        query = query.filter(Deal.payment_status == payment_status)
-
-    if company_id:
-        query = query.filter(Deal.company_id == company_id)
-
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Deal.deal_number.ilike(search_term)) |
-            (Deal.title.ilike(search_term)) |
-            (Deal.company_name.ilike(search_term))
-        )
-
-    if date_from:
-        query = query.filter(Deal.deal_date >= date_from)
-
-    if date_to:
-        query = query.filter(Deal.deal_date <= date_to)
-
-    query = apply_dynamic_filters(query, Deal, filters)
-    query = query.order_by(Deal.created_at.desc())
-
-    deals = query.offset(skip).limit(limit).all()
     
-    # Obohať všechny dealy o related data
-    return [enrich_deal_response(deal, db) for deal in deals]
+    summaries = get_invoice_summaries(db, [deal.id for deal in deals])
+    return [serialize_deal(deal, summaries.get(deal.id), exclude) for deal in deals]
 
 
 @router.get(
@@ -259,47 +284,54 @@ async def list_deals_simple(
 
 
 @router.get(
-    "/stats",
-    response_model=DealStats,
+    "/export",
     dependencies=[Depends(require_permissions("deals", PermissionType.READ))]
 )
-async def get_deal_stats(
+async def export_deals(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    columns: Optional[str] = Query(None, description="Čárkami oddělené sloupce (výchozí všechny)"),
+    payment_status: Optional[PaymentStatus] = None,
+    company_id: Optional[int] = None,
+    search: Optional[str] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
+    filters: dict = Depends(get_filter_params(EXPORT_PARAMS)),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Vrátí statistiky dealů."""
-    query = db.query(Deal).filter(
-        Deal.user_id == current_user.id,
-        Deal.is_active == True
-    )
-
-    if date_from:
-        query = query.filter(Deal.deal_date >= date_from)
-    if date_to:
-        query = query.filter(Deal.deal_date <= date_to)
+    """
+    Streamovaný export dealů (CSV nebo NDJSON) se stejnými filtry jako seznam.
 
-    deals = query.all()
+    Data se čtou po dávkách a hned odesílají - bez stránkování a bez
+    ohledu na počet řádků.
+    """
+    query = filter_deals(
+        db.query(Deal), current_user.id, payment_status, company_id, search, date_from, date_to, filters
+    )
+    return export_response(
+        db, query, Deal, resolve_columns(default_columns(Deal), columns), export_format, "deals", DEAL_LIST_ORDER
+    )
 
-    by_status = {}
-    total_value = 0
-    paid_value = 0
 
-    for deal in deals:
-        status_key = deal.status.value if deal.status else "unknown"
-        by_status[status_key] = by_status.get(status_key, 0) + 1
-        total_value += deal.total or 0
-        paid_value += deal.paid_amount or 0
+@router.get(
+    "/stats",
+    response_model=DealStats,
+    dependencies=[Depends(require_permissions("deals", PermissionType.READ))]
+)
+async def get_deal_stats(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    group_by: Optional[StatsGroupBy] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Vrátí statistiky dealů.
 
-    return {
-        "total_count": len(deals),
-        "by_status": by_status,
-        "total_value": round(total_value, 2),
-        "paid_value": round(paid_value, 2),
-        "unpaid_value": round(total_value - paid_value, 2),
-        "avg_deal_value": round(total_value / len(deals), 2) if deals else 0,
-    }
+    - **date_from/date_to**: Filtr podle data uzavření
+    - **group_by**: Seskupení do `groups` - month (měsíc uzavření), currency, assignee
+    """
+    return deal_stats(db, current_user.id, date_from, date_to, group_by)
 
 
 # =====================================================
@@ -327,7 +359,7 @@ async def create_deal(
     data = deal_data.model_dump()
     data['user_id'] = current_user.id
     data['created_by'] = current_user.id
-    data['deal_number'] = get_next_deal_number(db, current_user.id)
+    data['deal_number'] = next_deal_number(db, current_user.id)
 
     deal = Deal(**data)
     deal.recalculate_totals()
@@ -339,6 +371,138 @@ async def create_deal(
     return enrich_deal_response(deal, db)
 
 
+# =====================================================
+# HROMADNÉ ZALOŽENÍ / ÚPRAVY
+# =====================================================
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    dependencies=[Depends(require_permissions("deals", PermissionType.WRITE))]
+)
+async def bulk_create_deals(
+    deals: List[DealCreate],
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=5000, description="Počet dealů v jedné transakci"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Hromadně vytvoří dealy (importy objednávek).
+
+    Čísla dealů se přidělí po blocích, součty se spočítají dávkově a každá
+    dávka (chunk_size) se vloží jedním INSERT v jedné transakci.
+    Vrací výsledek pro každou položku požadavku (index, id, číslo, chyba).
+    """
+    return create_deals(db, current_user.id, deals, chunk_size)
+
+
+@router.patch(
+    "/bulk",
+    response_model=BulkResult,
+    dependencies=[Depends(require_permissions("deals", PermissionType.WRITE))]
+)
+async def bulk_update_deals(
+    updates: List[DealBulkUpdateItem],
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=5000, description="Počet dealů v jedné transakci"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Hromadně aktualizuje dealy - každá položka je id + měněná pole.
+
+    Neexistující a cizí dealy se vrátí jako chybné položky, ostatní se uloží.
+    """
+    return update_deals(db, current_user.id, updates, chunk_size)
+
+
+@router.post(
+    "/bulk/transition",
+    response_model=BulkTransitionResult,
+    dependencies=[Depends(require_permissions("deals", PermissionType.WRITE))]
+)
+async def bulk_transition_deals(
+    transition: DealBulkTransition,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Hromadně změní stav dealů (např. měsíční uzávěrka).
+
+    Povolené přechody:
+    - confirmed: z draft
+    - in_progress: z draft, confirmed
+    - completed, cancelled: z draft, confirmed, in_progress
+
+    Vrací převedené dealy a odmítnuté s důvodem.
+    """
+    try:
+        result = transition_deals(
+            db, current_user.id, transition.deal_ids, transition.status, transition.reason
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    db.commit()
+    return result
+
+
+@router.delete(
+    "/bulk",
+    response_model=BulkDeleteResult,
+    dependencies=[Depends(require_permissions("deals", PermissionType.WRITE))]
+)
+async def bulk_delete_deals(
+    deal_ids: List[int],
+    permanent: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Hromadné smazání dealů.
+
+    - **permanent=False**: Soft delete
+    - **permanent=True**: Trvalé smazání - dealy s aktivními fakturami se přeskočí
+
+    Vrací počet smazaných dealů a přeskočené s důvodem.
+    """
+    result = delete_deals(db, current_user.id, deal_ids, permanent)
+    db.commit()
+    return result
+
+
+@router.post(
+    "/bulk/create-invoices",
+    response_model=InvoiceBatchResult,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_permissions("invoices", PermissionType.WRITE))]
+)
+async def bulk_create_invoices_from_deals(
+    batch: InvoiceBatchFromDeals,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Vyfakturuje více dealů jedním požadavkem se společnými parametry.
+
+    Dealy se načtou jedním dotazem, čísla faktur se přidělí jako souvislý
+    blok a faktury se uloží po dávkách v jedné transakci. Vrací výsledek
+    pro každý deal (dealy, které nelze vyfakturovat, se přeskočí s důvodem).
+    """
+    supplier = db.query(Company).filter(Company.id == batch.supplier_id).first()
+    if not supplier:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dodavatel nenalezen"
+        )
+
+    invoice_type = InvoiceType(batch.invoice_type) if batch.invoice_type else InvoiceType.INVOICE
+    result = invoice_deals(
+        db, current_user.id, batch.deal_ids, supplier, invoice_type,
+        invoice_kwargs(batch, current_user.id)
+    )
+    db.commit()
+    return result
+
+
 @router.get(
     "/{deal_id}",
     response_model=DealPublic,
@@ -445,6 +609,118 @@ async def delete_deal(
     return None
 
 
+# =====================================================
+# POLOŽKY - úpravy jednotlivých řádků
+# =====================================================
+def get_deal_for_items(db: Session, deal_id: int, user_id: str) -> Deal:
+    """Načte deal pro úpravu položek (zamčený řádek - souběžné úpravy items se řadí)."""
+    deal = db.query(Deal).filter(
+        Deal.id == deal_id,
+        Deal.user_id == user_id
+    ).with_for_update().first()
+
+    if not deal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deal nenalezen"
+        )
+    return deal
+
+
+@router.post(
+    "/{deal_id}/items",
+    response_model=DealPublic,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_permissions("deals", PermissionType.WRITE))]
+)
+async def add_deal_item(
+    deal_id: int,
+    item: DealItem,
+    position: Optional[int] = Query(None, ge=0, description="Index nové položky (výchozí na konec)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Přidá položku, součty se dopočítají průběžně (bez přepočtu všech řádků)."""
+    deal = get_deal_for_items(db, deal_id, current_user.id)
+    add_item(deal, item.model_dump(), position)
+
+    db.commit()
+    db.refresh(deal)
+    return enrich_deal_response(deal, db)
+
+
+@router.post(
+    "/{deal_id}/items/reorder",
+    response_model=DealPublic,
+    dependencies=[Depends(require_permissions("deals", PermissionType.WRITE))]
+)
+async def reorder_deal_items(
+    deal_id: int,
+    reorder: ItemsReorder,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Přeřadí položky (order = původní indexy v novém pořadí)."""
+    deal = get_deal_for_items(db, deal_id, current_user.id)
+    try:
+        reorder_items(deal, reorder.order)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    db.commit()
+    db.refresh(deal)
+    return enrich_deal_response(deal, db)
+
+
+@router.patch(
+    "/{deal_id}/items/{index}",
+    response_model=DealPublic,
+    dependencies=[Depends(require_permissions("deals", PermissionType.WRITE))]
+)
+async def update_deal_item(
+    deal_id: int,
+    index: int,
+    item_data: DealItemUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Upraví jednu položku."""
+    deal = get_deal_for_items(db, deal_id, current_user.id)
+    items = deal.items or []
+    if not 0 <= index < len(items):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Položka nenalezena")
+
+    item = DealItem.model_validate({**items[index], **item_data.model_dump(exclude_unset=True)})
+    replace_item(deal, index, item.model_dump())
+
+    db.commit()
+    db.refresh(deal)
+    return enrich_deal_response(deal, db)
+
+
+@router.delete(
+    "/{deal_id}/items/{index}",
+    response_model=DealPublic,
+    dependencies=[Depends(require_permissions("deals", PermissionType.WRITE))]
+)
+async def delete_deal_item(
+    deal_id: int,
+    index: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Odebere jednu položku."""
+    deal = get_deal_for_items(db, deal_id, current_user.id)
+    try:
+        remove_item(deal, index)
+    except IndexError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Položka nenalezena")
+
+    db.commit()
+    db.refresh(deal)
+    return enrich_deal_response(deal, db)
+
+
 # =====================================================
 # WORKFLOW - Konverze Lead → Deal
 # =====================================================
@@ -484,7 +760,7 @@ async def create_deal_from_lead(
 
     # Připrav data pro deal
     deal_data = lead.convert_to_deal(deal_title=convert_data.title)
-    deal_data['deal_number'] = get_next_deal_number(db, current_user.id)
+    deal_data['deal_number'] = next_deal_number(db, current_user.id)
     deal_data['created_by'] = current_user.id
     deal_data['deal_date'] = convert_data.deal_date or date.today()
     deal_data['items'] = [item.model_dump() for item in convert_data.items] if convert_data.items else []
@@ -510,6 +786,24 @@ async def create_deal_from_lead(
 # =====================================================
 # WORKFLOW - Vytvoření faktury z dealu
 # =====================================================
+def invoice_kwargs(invoice_data, user_id: str) -> dict:
+    """Parametry pro Invoice.create_from_deal z požadavku (jen zadané hodnoty)."""
+    create_kwargs = {
+        'issue_date': invoice_data.issue_date,
+        'due_date': invoice_data.due_date,
+        'tax_date': invoice_data.tax_date or invoice_data.issue_date,
+        'created_by': user_id,
+    }
+
+    # Přidej optional fieldy pouze pokud jsou zadané
+    for field in ('variable_symbol', 'header_text', 'footer_text', 'notes',
+                  'payment_instructions', 'vat_mode', 'currency'):
+        value = getattr(invoice_data, field, None)
+        if value:
+            create_kwargs[field] = value
+    return create_kwargs
+
+
 @router.post(
     "/{deal_id}/create-invoice",
     response_model=InvoiceFromDealResponse,
@@ -563,44 +857,20 @@ async def create_invoice_from_deal(
     # Typ faktury
     invoice_type = InvoiceType(invoice_data.invoice_type) if invoice_data.invoice_type else InvoiceType.INVOICE
 
-    # Připrav kwargs pro create_from_deal
-    create_kwargs = {
-        'issue_date': invoice_data.issue_date,
-        'due_date': invoice_data.due_date,
-        'tax_date': invoice_data.tax_date or invoice_data.issue_date,
-        'created_by': current_user.id,
-    }
-    
-    # Přidej optional fieldy pouze pokud jsou zadané
-    if invoice_data.variable_symbol:
-        create_kwargs['variable_symbol'] = invoice_data.variable_symbol
-    if invoice_data.header_text:
-        create_kwargs['header_text'] = invoice_data.header_text
-    if invoice_data.footer_text:
-        create_kwargs['footer_text'] = invoice_data.footer_text
-    if invoice_data.notes:
-        create_kwargs['notes'] = invoice_data.notes
-    if invoice_data.payment_instructions:
-        create_kwargs['payment_instructions'] = invoice_data.payment_instructions
-    if invoice_data.vat_mode:
-        create_kwargs['vat_mode'] = invoice_data.vat_mode
-    if invoice_data.currency:
-        create_kwargs['currency'] = invoice_data.currency
-
     # Vytvoř fakturu
     invoice = Invoice.create_from_deal(
         deal=deal,
         supplier=supplier,
         invoice_type=invoice_type,
-        **create_kwargs
+        **invoice_kwargs(invoice_data, current_user.id)
     )
 
     # Generuj číslo faktury
-    invoice.invoice_number = get_next_invoice_number(db, invoice_type)
+    invoice.invoice_number = next_invoice_number(db, invoice_type)
 
     # Variabilní symbol = číslo faktury bez prefixu (nebo custom)
     if not invoice.variable_symbol:
-        invoice.variable_symbol = invoice.invoice_number.replace("-", "").replace("/", "")[-10:]
+        invoice.variable_symbol = variable_symbol_for(invoice.invoice_number)
 
     db.add(invoice)
     db.commit()
@@ -751,10 +1021,13 @@ async def recalculate_deal_payments(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Přepočítá stav plateb z faktur."""
-    deal = db.query(Deal).options(
-        joinedload(Deal.invoices)
-    ).filter(
+    """
+    Přepočítá stav plateb z faktur.
+
+    Stav se přepočítává automaticky při změně faktury - endpoint slouží
+    k ruční opravě (všechny dealy: python -m backend.core.services.payments).
+    """
+    deal = db.query(Deal).filter(
         Deal.id == deal_id,
         Deal.user_id == current_user.id
     ).first()
@@ -762,43 +1035,8 @@ async def recalculate_deal_payments(
     if not deal:
         raise HTTPException(status_code=404, detail="Deal nenalezen")
 
-    deal.recalculate_payment_status()
+    refresh_deal_payments(db.connection(), [deal.id])
 
     db.commit()
     db.refresh(deal)
     return enrich_deal_response(deal, db)
-
-
-# =====================================================
-# BULK OPERATIONS
-# =====================================================
-@router.delete(
-    "/bulk",
-    status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permissions("deals", PermissionType.WRITE))]
-)
-async def bulk_delete_deals(
-    deal_ids: List[int],
-    permanent: bool = False,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Hromadné smazání dealů."""
-    deals = db.query(Deal).filter(
-        Deal.id.in_(deal_ids),
-        Deal.user_id == current_user.id
-    ).all()
-
-    if not deals:
-        raise HTTPException(status_code=404, detail="Žádné dealy nenalezeny")
-
-    for deal in deals:
-        if permanent:
-            if deal.invoices and any(inv.is_active for inv in deal.invoices):
-                continue  # Skip deals with invoices
-            db.delete(deal)
-        else:
-            deal.is_active = False
-
-    db.commit()
-    return None
\ No newline at end of file
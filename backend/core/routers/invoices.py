@@ -1,61 +1,40 @@
 # backend/routers/invoices.py
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from datetime import datetime, date
 
 from backend.core.services.auth import get_current_user, require_permissions
 from backend.core.db import get_db
 from backend.core.models.auth import User, PermissionType
-from backend.core.models.invocie import Invoice, InvoiceSequence, InvoiceType, InvoiceStatus, VatMode
+from backend.core.models.invocie import Invoice, InvoiceType, InvoiceStatus, VatMode
 from backend.core.models.company import  Company
+from backend.core.models.deal import Deal
 from backend.core.schemas.invoice import (
-    InvoiceCreate, InvoiceUpdate, InvoicePublic, InvoiceListItem
+    InvoiceCreate, InvoiceUpdate, InvoicePublic, InvoiceListItem,
+    InvoiceItem, InvoiceItemUpdate
 )
-from backend.core.utils.search import apply_dynamic_filters, get_filter_params
+from backend.core.schemas.utils import ItemsReorder, BulkDeleteResult, ExportFormat
+from backend.core.utils.search import apply_dynamic_filters, get_filter_params, has_dynamic_filters
+from backend.core.utils.pagination import paginate
+from backend.core.utils.export import EXPORT_PARAMS, default_columns, export_response, resolve_columns
+from backend.core.services.bulk import delete_invoices
+from backend.core.services.sequences import next_invoice_number, preview_invoice_number
+from backend.core.services.pricing import calculate_invoice_totals
+from backend.core.services.line_items import add_item, replace_item, remove_item, reorder_items
 
 router = APIRouter()
 
+# Řadicí klíč seznamu (keyset stránkování)
+INVOICE_LIST_ORDER = [(Invoice.created_at, True), (Invoice.id, True)]
+
+# Sloupce kompaktního seznamu (InvoiceListItem) - deal_number se doplní z dealu
+INVOICE_LIST_ITEM_COLUMNS = tuple(name for name in InvoiceListItem.model_fields if name != "deal_number")
+
 
 # =====================================================
 # HELPER FUNCTIONS
 # =====================================================
-def get_or_create_sequence(db: Session, invoice_type: InvoiceType, year: int) -> InvoiceSequence:
-    """Získá nebo vytvoří číselnou řadu pro daný typ a rok"""
-    sequence = db.query(InvoiceSequence).filter(
-        InvoiceSequence.invoice_type == invoice_type,
-        InvoiceSequence.year == year
-    ).first()
-
-    if not sequence:
-        # Definice prefixů podle typu
-        prefixes = {
-            InvoiceType.INVOICE: "FV",
-            InvoiceType.PROFORMA: "PF",
-            InvoiceType.CREDIT_NOTE: "D",
-            InvoiceType.DEBIT_NOTE: "V",
-            InvoiceType.RECEIPT: "P",
-        }
-
-        sequence = InvoiceSequence(
-            invoice_type=invoice_type,
-            year=year,
-            prefix=prefixes.get(invoice_type, "X"),
-            last_number=0
-        )
-        db.add(sequence)
-        db.flush()
-
-    return sequence
-
-
-def generate_invoice_number(db: Session, invoice_type: InvoiceType) -> str:
-    """Vygeneruje nové číslo faktury"""
-    year = datetime.utcnow().year
-    sequence = get_or_create_sequence(db, invoice_type, year)
-    return sequence.get_next_number()
-
-
 def copy_company_to_invoice(company: Company, prefix: str) -> dict:
     """Zkopíruje údaje společnosti do dict pro fakturu"""
     return {
@@ -74,45 +53,18 @@ def copy_company_to_invoice(company: Company, prefix: str) -> dict:
     }
 
 
-def calculate_invoice_totals(items: list, vat_mode: VatMode) -> dict:
-    """Vypočítá součty z položek faktury"""
-    subtotal = 0.0
-    discount_total = 0.0
-    vat_breakdown = {}
-
-    for item in (items or []):
-        quantity = float(item.get('quantity', 0) or 0)
-        unit_price = float(item.get('unit_price', 0) or 0)
-        discount_percent = float(item.get('discount_percent', 0) or 0)
-        vat_rate = float(item.get('vat_rate', 0) or 0)
-
-        item_subtotal = quantity * unit_price
-        item_discount = item_subtotal * (discount_percent / 100)
-        item_after_discount = item_subtotal - item_discount
-
-        subtotal += item_subtotal
-        discount_total += item_discount
-
-        # DPH pouze pokud je faktura s DPH
-        if vat_mode == VatMode.WITH_VAT:
-            item_vat = item_after_discount * (vat_rate / 100)
-
-            rate_key = str(int(vat_rate))
-            if rate_key not in vat_breakdown:
-                vat_breakdown[rate_key] = {'base': 0.0, 'vat': 0.0}
-            vat_breakdown[rate_key]['base'] += item_after_discount
-            vat_breakdown[rate_key]['vat'] += item_vat
-
-    total_vat = sum(v['vat'] for v in vat_breakdown.values())
-
-    return {
-        'subtotal': round(subtotal, 2),
-        'discount_amount': round(discount_total, 2),
-        'subtotal_after_discount': round(subtotal - discount_total, 2),
-        'vat_breakdown': {k: {'base': round(v['base'], 2), 'vat': round(v['vat'], 2)} for k, v in vat_breakdown.items()},
-        'total_vat': round(total_vat, 2),
-        'total': round(subtotal - discount_total + total_vat, 2)
-    }
+def filter_invoices(
+    query,
+    invoice_type: Optional[InvoiceType] = None,
+    invoice_status: Optional[InvoiceStatus] = None,
+    filters: Optional[dict] = None
+):
+    """Filtry seznamu faktur (společné pro list a export)."""
+    if invoice_type:
+        query = query.filter(Invoice.invoice_type == invoice_type)
+    if invoice_status:
+        query = query.filter(Invoice.status == invoice_status)
+    return apply_dynamic_filters(query, Invoice, filters or {})
 
 
 # =====================================================
@@ -124,24 +76,86 @@ def calculate_invoice_totals(items: list, vat_mode: VatMode) -> dict:
     dependencies=[Depends(require_permissions("invoices", PermissionType.READ))]
 )
 async def list_invoices(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     invoice_type: Optional[InvoiceType] = None,
     status: Optional[InvoiceStatus] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     filters: dict = Depends(get_filter_params()),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Vrátí seznam faktur s možností filtrování."""
-    query = db.query(Invoice)
+    """
+    Vrátí seznam faktur s možností filtrování.
+
+    - **cursor**: Kurzor další stránky z hlavičky X-Next-Cursor (místo skip)
+    - **include_total**: Vrátit celkový počet v hlavičce X-Total-Count (X-Total-Exact = false u odhadu)
+    """
+    query = filter_invoices(db.query(Invoice), invoice_type, status, filters)
+    return paginate(
+        query, INVOICE_LIST_ORDER, limit, skip, cursor, response,
+        include_total=include_total,
+        unfiltered=not (invoice_type or status or has_dynamic_filters(Invoice, filters))
+    )
 
-    if invoice_type:
-        query = query.filter(Invoice.invoice_type == invoice_type)
-    if status:
-        query = query.filter(Invoice.status == status)
 
-    query = apply_dynamic_filters(query, Invoice, filters)
-    return query.order_by(Invoice.created_at.desc()).offset(skip).limit(limit).all()
+@router.get(
+    "/list",
+    response_model=List[InvoiceListItem],
+    dependencies=[Depends(require_permissions("invoices", PermissionType.READ))]
+)
+async def list_invoices_compact(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    invoice_type: Optional[InvoiceType] = None,
+    status: Optional[InvoiceStatus] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    filters: dict = Depends(get_filter_params()),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Kompaktní seznam faktur přihlášeného uživatele pro přehledy.
+
+    Načítá jen sloupce InvoiceListItem (projekce bez ORM objektů a bez JSON
+    položek, rozpadu DPH a kopií adres) a číslo dealu jedním LEFT JOIN.
+    Řazení a stránkování jako GET / (kurzor X-Next-Cursor, X-Total-Count),
+    index idx_invoice_owner_created.
+    """
+    query = db.query(
+        *(getattr(Invoice, column) for column in INVOICE_LIST_ITEM_COLUMNS),
+        Deal.deal_number
+    ).outerjoin(Deal, Deal.id == Invoice.deal_id).filter(Invoice.created_by == current_user.id)
+    query = filter_invoices(query, invoice_type, status, filters)
+    return paginate(
+        query, INVOICE_LIST_ORDER, limit, skip, cursor, response,
+        include_total=include_total
+    )
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(require_permissions("invoices", PermissionType.READ))]
+)
+async def export_invoices(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    columns: Optional[str] = Query(None, description="Čárkami oddělené sloupce (výchozí všechny)"),
+    invoice_type: Optional[InvoiceType] = None,
+    status: Optional[InvoiceStatus] = None,
+    filters: dict = Depends(get_filter_params(EXPORT_PARAMS)),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Streamovaný export faktur (CSV nebo NDJSON) se stejnými filtry jako seznam."""
+    query = filter_invoices(db.query(Invoice), invoice_type, status, filters)
+    return export_response(
+        db, query, Invoice, resolve_columns(default_columns(Invoice), columns),
+        export_format, "invoices", INVOICE_LIST_ORDER
+    )
 
 
 @router.post(
@@ -172,7 +186,7 @@ async def create_invoice(
 
     # Vygeneruj číslo faktury
     if not invoice_dict.get('invoice_number'):
-        invoice_dict['invoice_number'] = generate_invoice_number(db, invoice_data.invoice_type)
+        invoice_dict['invoice_number'] = next_invoice_number(db, invoice_data.invoice_type)
 
     # Variabilní symbol = číslo faktury (bez písmen)
     if not invoice_dict.get('variable_symbol'):
@@ -199,12 +213,11 @@ async def create_invoice(
     ]
 
     # Vypočítej součty
-    totals = calculate_invoice_totals(invoice_dict['items'], invoice_data.vat_mode)
-
-    # Přidej zaokrouhlení
-    if invoice_dict.get('rounding'):
-        totals['total'] = round(totals['total'] + invoice_dict['rounding'], 2)
-
+    totals = calculate_invoice_totals(
+        invoice_dict['items'],
+        with_vat=invoice_data.vat_mode == VatMode.WITH_VAT,
+        rounding=invoice_dict.get('rounding')
+    )
     invoice_dict.update(totals)
 
     # Nastav DUZP pokud není zadáno
@@ -234,18 +247,7 @@ async def get_next_invoice_number(
     current_user: User = Depends(get_current_user)
 ):
     """Vrátí další číslo faktury (preview, neukládá)."""
-    year = datetime.utcnow().year
-    sequence = get_or_create_sequence(db, invoice_type, year)
-
-    # Preview - neukládáme, jen zobrazíme
-    next_num = sequence.last_number + 1
-    preview_number = sequence.format_pattern.format(
-        prefix=sequence.prefix,
-        year=sequence.year,
-        number=next_num
-    )
-
-    return {"invoice_number": preview_number, "type": invoice_type}
+    return {"invoice_number": preview_invoice_number(db, invoice_type), "type": invoice_type}
 
 
 @router.get(
@@ -309,12 +311,13 @@ async def update_invoice(
             for item in (update_data.get('items') or [])
         ]
         vat_mode = update_data.get('vat_mode', invoice.vat_mode)
-        totals = calculate_invoice_totals(update_data['items'], vat_mode)
-
-        rounding = update_data.get('rounding', invoice.rounding) or 0
-        totals['total'] = round(totals['total'] + rounding, 2)
-
+        totals = calculate_invoice_totals(
+            update_data['items'],
+            with_vat=vat_mode == VatMode.WITH_VAT,
+            rounding=update_data.get('rounding', invoice.rounding)
+        )
         update_data.update(totals)
+        update_data['pricing_state'] = None  # Průběžné součty se dopočítají při úpravě položky
 
     # Status changes
     if update_data.get('status') == InvoiceStatus.PAID and not invoice.paid_date:
@@ -354,18 +357,129 @@ async def delete_invoice(
 
 @router.post(
     "/bulk",
-    status_code=status.HTTP_204_NO_CONTENT,
+    response_model=BulkDeleteResult,
     dependencies=[Depends(require_permissions("invoices", PermissionType.WRITE))]
 )
 async def bulk_delete_invoices(
     ids: List[int],
+    permanent: bool = True,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Hromadné mazání faktur."""
-    db.query(Invoice).filter(Invoice.id.in_(ids)).delete(synchronize_session=False)
+    """
+    Hromadné mazání faktur.
+
+    - **permanent=True**: Trvalé smazání
+    - **permanent=False**: Soft delete (is_active=False)
+    """
+    result = delete_invoices(db, ids, permanent)
     db.commit()
-    return None
+    return result
+
+
+# =====================================================
+# POLOŽKY - úpravy jednotlivých řádků
+# =====================================================
+def get_invoice_for_items(db: Session, invoice_id: int) -> Invoice:
+    """Načte fakturu pro úpravu položek (zamčený řádek - souběžné úpravy items se řadí)."""
+    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).with_for_update().first()
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    return invoice
+
+
+@router.post(
+    "/{invoice_id}/items",
+    response_model=InvoicePublic,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_permissions("invoices", PermissionType.WRITE))]
+)
+async def add_invoice_item(
+    invoice_id: int,
+    item: InvoiceItem,
+    position: Optional[int] = Query(None, ge=0, description="Index nové položky (výchozí na konec)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Přidá položku, součty se dopočítají průběžně (bez přepočtu všech řádků)."""
+    invoice = get_invoice_for_items(db, invoice_id)
+    add_item(invoice, item.model_dump(), position)
+
+    db.commit()
+    db.refresh(invoice)
+    return invoice
+
+
+@router.post(
+    "/{invoice_id}/items/reorder",
+    response_model=InvoicePublic,
+    dependencies=[Depends(require_permissions("invoices", PermissionType.WRITE))]
+)
+async def reorder_invoice_items(
+    invoice_id: int,
+    reorder: ItemsReorder,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Přeřadí položky (order = původní indexy v novém pořadí)."""
+    invoice = get_invoice_for_items(db, invoice_id)
+    try:
+        reorder_items(invoice, reorder.order)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    db.commit()
+    db.refresh(invoice)
+    return invoice
+
+
+@router.patch(
+    "/{invoice_id}/items/{index}",
+    response_model=InvoicePublic,
+    dependencies=[Depends(require_permissions("invoices", PermissionType.WRITE))]
+)
+async def update_invoice_item(
+    invoice_id: int,
+    index: int,
+    item_data: InvoiceItemUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Upraví jednu položku."""
+    invoice = get_invoice_for_items(db, invoice_id)
+    items = invoice.items or []
+    if not 0 <= index < len(items):
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    item = InvoiceItem.model_validate({**items[index], **item_data.model_dump(exclude_unset=True)})
+    replace_item(invoice, index, item.model_dump())
+
+    db.commit()
+    db.refresh(invoice)
+    return invoice
+
+
+@router.delete(
+    "/{invoice_id}/items/{index}",
+    response_model=InvoicePublic,
+    dependencies=[Depends(require_permissions("invoices", PermissionType.WRITE))]
+)
+async def delete_invoice_item(
+    invoice_id: int,
+    index: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Odebere jednu položku."""
+    invoice = get_invoice_for_items(db, invoice_id)
+    try:
+        remove_item(invoice, index)
+    except IndexError:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    db.commit()
+    db.refresh(invoice)
+    return invoice
 
 
 @router.post(
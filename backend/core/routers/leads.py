@@ -1,6 +1,6 @@
 # backend/routers/leads.py
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -9,11 +9,21 @@ from backend.core.db import get_db
 from backend.core.models.auth import User, PermissionType
 from backend.core.models.lead import Lead, LeadStatus
 from backend.core.models.company import Company  # Import Company
-from backend.core.schemas.lead import LeadCreate, LeadUpdate, LeadPublic, LeadStats
-from backend.core.utils.search import apply_dynamic_filters, get_filter_params
+from backend.core.schemas.lead import LeadCreate, LeadUpdate, LeadPublic, LeadStats, LeadSimple, LeadLookup
+from backend.core.utils.search import apply_dynamic_filters, get_filter_params, has_dynamic_filters
+from backend.core.utils.pagination import paginate
+from backend.core.utils.export import EXPORT_PARAMS, default_columns, export_response, resolve_columns
+from backend.core.utils.fulltext import apply_fulltext_search
+from backend.core.utils.trigram import trigram_lookup
+from backend.core.schemas.utils import StatsGroupBy, BulkDeleteResult, ExportFormat
+from backend.core.services.stats import lead_stats
+from backend.core.services.bulk import delete_leads
 
 router = APIRouter()
 
+# Řadicí klíč seznamu (keyset stránkování)
+LEAD_LIST_ORDER = [(Lead.created_at, True), (Lead.id, True)]
+
 
 # =====================================================
 # HELPER FUNCTIONS
@@ -80,6 +90,13 @@ def enrich_lead_with_company(lead: Lead, db: Session) -> dict:
     return lead_dict
 
 
+def filter_leads(query, search: Optional[str] = None, filters: Optional[dict] = None, ranked: bool = False):
+    """Filtry seznamu leadů (společné pro list a export)."""
+    if search:
+        query = apply_fulltext_search(query, Lead, search, rank=ranked)
+    return apply_dynamic_filters(query, Lead, filters or {})
+
+
 # =====================================================
 # ENDPOINTS
 # =====================================================
@@ -89,8 +106,12 @@ def enrich_lead_with_company(lead: Lead, db: Session) -> dict:
     dependencies=[Depends(require_permissions("leads", PermissionType.READ))]
 )
 async def list_leads(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     filters: dict = Depends(get_filter_params()),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -104,15 +125,72 @@ async def list_leads(
     - assigned_to: ID přiřazeného uživatele
     - value_from, value_to: rozsah hodnoty
     - title: ILIKE hledání v názvu
+    - search: Fulltextové hledání (název, firma, kontakt, e-mail, popis), řazeno podle relevance
+    - cursor: Kurzor další stránky z hlavičky X-Next-Cursor (místo skip)
+    - include_total: Vrátit celkový počet v hlavičce X-Total-Count (X-Total-Exact = false u odhadu)
     """
-    query = db.query(Lead)
-    query = apply_dynamic_filters(query, Lead, filters)
-    leads = query.order_by(Lead.created_at.desc()).offset(skip).limit(limit).all()
+    ranked = bool(search) and not cursor
+    query = filter_leads(db.query(Lead), search, filters, ranked)
+    leads = paginate(
+        query, LEAD_LIST_ORDER, limit, skip, cursor, response,
+        ranked=ranked, include_total=include_total,
+        unfiltered=not (search or has_dynamic_filters(Lead, filters))
+    )
     
     # Enrich s company daty
     return [enrich_lead_with_company(lead, db) for lead in leads]
 
 
+@router.get(
+    "/export",
+    dependencies=[Depends(require_permissions("leads", PermissionType.READ))]
+)
+async def export_leads(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    columns: Optional[str] = Query(None, description="Čárkami oddělené sloupce (výchozí všechny)"),
+    search: Optional[str] = None,
+    filters: dict = Depends(get_filter_params(EXPORT_PARAMS)),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Streamovaný export leadů (CSV nebo NDJSON) se stejnými filtry jako seznam."""
+    query = filter_leads(db.query(Lead), search, filters)
+    return export_response(
+        db, query, Lead, resolve_columns(default_columns(Lead), columns),
+        export_format, "leads", LEAD_LIST_ORDER
+    )
+
+
+@router.get(
+    "/lookup",
+    response_model=List[LeadLookup],
+    dependencies=[Depends(require_permissions("leads", PermissionType.READ))]
+)
+async def lookup_leads(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Typeahead hledání kontaktů v leadech (kontaktní osoba, e-mail).
+
+    Toleruje překlepy a části slov, výsledky jsou seřazené podle skóre shody.
+    """
+    query = db.query(Lead).filter(Lead.is_active == True)
+
+    return [
+        LeadLookup(
+            **LeadSimple.model_validate(lead).model_dump(),
+            contact_person=lead.contact_person,
+            email=lead.email,
+            score=round(score, 3),
+            matched_field=field
+        )
+        for lead, score, field in trigram_lookup(db, Lead, q, limit=limit, query=query)
+    ]
+
+
 @router.post(
     "/",
     response_model=LeadPublic,
@@ -250,18 +328,24 @@ async def delete_lead(
 
 @router.post(
     "/bulk",
-    status_code=status.HTTP_204_NO_CONTENT,
+    response_model=BulkDeleteResult,
     dependencies=[Depends(require_permissions("leads", PermissionType.WRITE))]
 )
 async def bulk_delete_leads(
     ids: List[int],
+    permanent: bool = True,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Hromadné mazání leadů."""
-    db.query(Lead).filter(Lead.id.in_(ids)).delete(synchronize_session=False)
+    """
+    Hromadné mazání leadů.
+
+    - **permanent=True**: Trvalé smazání
+    - **permanent=False**: Soft delete (is_active=False)
+    """
+    result = delete_leads(db, ids, permanent)
     db.commit()
-    return None
+    return result
 
 
 @router.get(
@@ -270,40 +354,16 @@ async def bulk_delete_leads(
     dependencies=[Depends(require_permissions("leads", PermissionType.READ))]
 )
 async def get_lead_stats(
+    group_by: Optional[StatsGroupBy] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Vrátí statistiky leadů."""
-    leads = db.query(Lead).filter(Lead.is_active == True).all()
-    
-    total = len(leads)
-    by_status = {}
-    total_value = 0
-    weighted_value = 0
-    total_prob = 0
-    won_count = 0
-    
-    for lead in leads:
-        # Count by status
-        status_str = lead.status.value if hasattr(lead.status, 'value') else str(lead.status)
-        by_status[status_str] = by_status.get(status_str, 0) + 1
-        
-        # Values
-        total_value += lead.value or 0
-        weighted_value += (lead.value or 0) * ((lead.probability or 0) / 100)
-        total_prob += lead.probability or 0
-        
-        if lead.status == LeadStatus.WON:
-            won_count += 1
-    
-    return {
-        "total": total,
-        "by_status": by_status,
-        "total_value": round(total_value, 2),
-        "weighted_value": round(weighted_value, 2),
-        "avg_probability": round(total_prob / total, 2) if total > 0 else 0,
-        "conversion_rate": round((won_count / total) * 100, 2) if total > 0 else 0
-    }
+    """
+    Vrátí statistiky leadů.
+
+    - **group_by**: Seskupení do `groups` - month (měsíc vytvoření), currency, assignee
+    """
+    return lead_stats(db, group_by)
 
 
 @router.post(
@@ -1,6 +1,6 @@
 # backend/routers/products.py
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from backend.core.services.auth import get_current_user, require_permissions
@@ -11,10 +11,17 @@ from backend.core.schemas.product import (
     ProductCreate, ProductUpdate, ProductPublic, 
     ProductSimple, ProductListItem
 )
-from backend.core.utils.search import apply_dynamic_filters, get_filter_params
+from backend.core.schemas.utils import BulkDeleteResult
+from backend.core.services.bulk import delete_products
+from backend.core.utils.search import apply_dynamic_filters, get_filter_params, has_dynamic_filters
+from backend.core.utils.pagination import paginate
+from backend.core.utils.fulltext import apply_fulltext_search
 
 router = APIRouter()
 
+# Řadicí klíč seznamu - oblíbené nahoře, pak podle názvu (keyset stránkování)
+PRODUCT_LIST_ORDER = [(Product.is_featured, True), (Product.name, False), (Product.id, False)]
+
 
 # =====================================================
 # LIST & SEARCH
@@ -25,12 +32,15 @@ router = APIRouter()
     dependencies=[Depends(require_permissions("products", PermissionType.READ))]
 )
 async def list_products(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     is_active: Optional[bool] = True,
     category: Optional[str] = None,
     is_featured: Optional[bool] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     filters: dict = Depends(get_filter_params()),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -38,11 +48,14 @@ async def list_products(
     """
     Vrátí seznam produktů s možností filtrování.
     
-    - **search**: Hledání v názvu a kódu
+    - **search**: Fulltextové hledání (název, kód, EAN, kategorie, popis), řazeno podle relevance
     - **category**: Filtr podle kategorie
     - **is_active**: Pouze aktivní produkty (default: True)
     - **is_featured**: Pouze oblíbené/doporučené
+    - **cursor**: Kurzor další stránky z hlavičky X-Next-Cursor (místo skip)
+    - **include_total**: Vrátit celkový počet v hlavičce X-Total-Count (X-Total-Exact = false u odhadu)
     """
+    ranked = bool(search) and not cursor
     query = db.query(Product)
 
     # Filtr podle aktivnosti
@@ -59,20 +72,19 @@ async def list_products(
 
     # Fulltext search
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Product.name.ilike(search_term)) |
-            (Product.code.ilike(search_term)) |
-            (Product.description.ilike(search_term))
-        )
+        query = apply_fulltext_search(query, Product, search, rank=ranked)
 
     # Dynamické filtry
     query = apply_dynamic_filters(query, Product, filters)
 
-    # Řazení - oblíbené nahoře, pak podle názvu
-    query = query.order_by(Product.is_featured.desc(), Product.name.asc())
-
-    return query.offset(skip).limit(limit).all()
+    return paginate(
+        query, PRODUCT_LIST_ORDER, limit, skip, cursor, response,
+        ranked=ranked, include_total=include_total,
+        unfiltered=not (
+            is_active is not None or category or is_featured is not None
+            or search or has_dynamic_filters(Product, filters)
+        )
+    )
 
 
 @router.get(
@@ -287,6 +299,28 @@ async def bulk_activate_products(
     return {"activated": updated}
 
 
+@router.post(
+    "/bulk/delete",
+    response_model=BulkDeleteResult,
+    dependencies=[Depends(require_permissions("products", PermissionType.WRITE))]
+)
+async def bulk_delete_products(
+    product_ids: List[int],
+    permanent: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Hromadně smaže produkty.
+
+    - **permanent=False**: Soft delete (nastaví is_active=False)
+    - **permanent=True**: Trvalé smazání
+    """
+    result = delete_products(db, product_ids, permanent)
+    db.commit()
+    return result
+
+
 # =====================================================
 # HELPER - Převod produktu na položku
 # =====================================================
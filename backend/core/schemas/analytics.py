@@ -0,0 +1,38 @@
+# backend/core/schemas/analytics.py
+from typing import Optional
+from pydantic import BaseModel
+
+
+# =====================================================
+# ANALYTICS SCHEMAS
+# =====================================================
+class ProductSales(BaseModel):
+    """Prodeje jednoho produktu v jedné měně"""
+    product_id: Optional[int] = None
+    code: Optional[str] = None
+    name: Optional[str] = None
+    currency: Optional[str] = None
+    quantity: float = 0.0
+    net_amount: float = 0.0
+    vat_amount: float = 0.0
+    documents_count: int = 0
+
+
+class CustomerSales(BaseModel):
+    """Obrat jednoho zákazníka v jedné měně"""
+    company_id: Optional[int] = None
+    company_name: Optional[str] = None
+    currency: Optional[str] = None
+    net_amount: float = 0.0
+    vat_amount: float = 0.0
+    documents_count: int = 0
+
+
+class VatSummary(BaseModel):
+    """Základ a DPH jedné sazby (volitelně za měsíc)"""
+    vat_rate: float
+    currency: Optional[str] = None
+    month: Optional[str] = None  # "YYYY-MM"
+    base: float = 0.0
+    vat: float = 0.0
+    lines_count: int = 0
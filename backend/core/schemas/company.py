@@ -152,4 +152,10 @@ class CompanySimple(BaseModel):
     phone: Optional[str] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class CompanyLookup(CompanySimple):
+    """Výsledek typeahead hledání - se skóre shody"""
+    score: float
+    matched_field: str
\ No newline at end of file
@@ -113,6 +113,20 @@ class DealItem(DealItemBase):
         return round(base + vat, 2)
 
 
+class DealItemUpdate(BaseModel):
+    """Částečná úprava položky (PATCH /deals/{id}/items/{index})"""
+    product_id: Optional[int] = None
+    name: Optional[str] = Field(None, min_length=1, max_length=255)
+    description: Optional[str] = None
+    code: Optional[str] = Field(None, max_length=50)
+    quantity: Optional[float] = Field(None, ge=0)
+    unit: Optional[str] = Field(None, max_length=20)
+    unit_price: Optional[float] = Field(None, ge=0)
+    discount_percent: Optional[float] = Field(None, ge=0, le=100)
+    vat_rate: Optional[float] = Field(None, ge=0, le=100)
+    sort_order: Optional[int] = None
+
+
 # =====================================================
 # DEAL SCHEMAS
 # =====================================================
@@ -232,6 +246,18 @@ class DealUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
+class DealBulkUpdateItem(DealUpdate):
+    """Položka hromadné aktualizace - id dealu + měněná pole"""
+    id: int
+
+
+class DealBulkTransition(BaseModel):
+    """Hromadná změna stavu dealů"""
+    deal_ids: List[int] = Field(..., min_length=1)
+    status: DealStatus = Field(..., description="Cílový stav")
+    reason: Optional[str] = Field(None, description="Důvod zrušení (jen pro cancelled)")
+
+
 class DealPublic(DealBase):
     """Schema pro response - obsahuje computed fields"""
     id: int
@@ -250,6 +276,7 @@ class DealPublic(DealBase):
     paid_amount: float = 0.0
     remaining_amount: Optional[float] = None
     invoiced_amount: Optional[float] = None
+    invoices_count: int = 0
 
     # Datumy
     completed_at: Optional[datetime] = None
@@ -302,6 +329,17 @@ class DealListItem(BaseModel):
         from_attributes = True
 
 
+class DealStatsGroup(BaseModel):
+    """Statistiky jedné skupiny dealů (měsíc / měna / přiřazený uživatel)"""
+    key: Optional[str] = None
+    total_count: int
+    by_status: Dict[str, int]
+    total_value: float
+    paid_value: float
+    unpaid_value: float
+    avg_deal_value: float
+
+
 class DealStats(BaseModel):
     """Statistiky dealů"""
     total_count: int
@@ -310,6 +348,7 @@ class DealStats(BaseModel):
     paid_value: float
     unpaid_value: float
     avg_deal_value: float
+    groups: Optional[List[DealStatsGroup]] = None
 
 
 # =====================================================
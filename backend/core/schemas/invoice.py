@@ -109,6 +109,19 @@ class InvoiceItem(InvoiceItemBase):
         return round(base + vat, 2)
 
 
+class InvoiceItemUpdate(BaseModel):
+    """Částečná úprava položky (PATCH /invoices/{id}/items/{index})"""
+    name: Optional[str] = Field(None, min_length=1, max_length=255)
+    description: Optional[str] = None
+    quantity: Optional[float] = Field(None, ge=0)
+    unit: Optional[str] = Field(None, max_length=20)
+    unit_price: Optional[float] = Field(None, ge=0)
+    discount_percent: Optional[float] = Field(None, ge=0, le=100)
+    vat_rate: Optional[float] = Field(None, ge=0, le=100)
+    sku: Optional[str] = None
+    ean: Optional[str] = None
+
+
 # =====================================================
 # INVOICE SCHEMAS
 # =====================================================
@@ -373,6 +386,46 @@ class InvoiceFromDealResponse(BaseModel):
     message: str = "Faktura úspěšně vytvořena z dealu"
 
 
+
+class InvoiceBatchFromDeals(BaseModel):
+    """
+    Hromadná fakturace dealů (např. měsíční uzávěrka).
+
+    Společné parametry platí pro všechny faktury, položky, odběratel a
+    měna se berou z každého dealu. Variabilní symbol = číslo faktury.
+    """
+    deal_ids: List[int] = Field(..., min_length=1, description="ID dealů k fakturaci")
+    supplier_id: int = Field(..., description="ID dodavatele (vaše firma)")
+    issue_date: date = Field(..., description="Datum vystavení")
+    due_date: date = Field(..., description="Datum splatnosti")
+    invoice_type: Optional[InvoiceType] = Field(InvoiceType.INVOICE, description="Typ faktury")
+    tax_date: Optional[date] = None
+    header_text: Optional[str] = None
+    footer_text: Optional[str] = None
+    notes: Optional[str] = None  # Default: z dealu
+    payment_instructions: Optional[str] = None
+    vat_mode: Optional[VatMode] = None
+    currency: Optional[str] = None
+
+
+class InvoiceBatchItem(BaseModel):
+    """Výsledek fakturace jednoho dealu"""
+    deal_id: int
+    deal_number: Optional[str] = None
+    success: bool
+    invoice_id: Optional[int] = None
+    invoice_number: Optional[str] = None
+    total: Optional[float] = None
+    currency: Optional[str] = None
+    error: Optional[str] = None
+
+
+class InvoiceBatchResult(BaseModel):
+    """Souhrn hromadné fakturace"""
+    created: int
+    failed: int
+    results: List[InvoiceBatchItem]
+
 # =====================================================
 # INVOICE STATS
 # =====================================================
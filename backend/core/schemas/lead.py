@@ -185,6 +185,25 @@ class LeadSimple(BaseModel):
         from_attributes = True
 
 
+class LeadLookup(LeadSimple):
+    """Výsledek typeahead hledání kontaktů - se skóre shody"""
+    contact_person: Optional[str] = None
+    email: Optional[str] = None
+    score: float
+    matched_field: str
+
+
+class LeadStatsGroup(BaseModel):
+    """Statistiky jedné skupiny leadů (měsíc / měna / přiřazený uživatel)"""
+    key: Optional[str] = None
+    total: int
+    by_status: Dict[str, int]
+    total_value: float
+    weighted_value: float
+    avg_probability: float
+    conversion_rate: float
+
+
 class LeadStats(BaseModel):
     """Statistiky leadů"""
     total: int
@@ -193,6 +212,7 @@ class LeadStats(BaseModel):
     weighted_value: float
     avg_probability: float
     conversion_rate: float
+    groups: Optional[List[LeadStatsGroup]] = None
 
 
 # =====================================================
@@ -38,7 +38,7 @@ class ProductBase(BaseModel):
 
     # OPTIONAL - Stav
     is_active: Optional[bool] = Field(True, description="Je v nabídce?")
-    is_featured: Optional[bool] = Field(False, description="Oblíbený/doporučený")
+    is_featured: bool = Field(False, description="Oblíbený/doporučený")
 
     # OPTIONAL - Metadata
     custom_fields: Optional[Dict[str, Any]] = Field(default_factory=dict)
@@ -81,7 +81,7 @@ class ProductUpdate(BaseModel):
     category: Optional[str] = Field(None, max_length=100)
     tags: Optional[List[str]] = None
     is_active: Optional[bool] = None
-    is_featured: Optional[bool] = None
+    is_featured: bool = None
     custom_fields: Optional[Dict[str, Any]] = None
     notes: Optional[str] = None
 
@@ -1,5 +1,9 @@
 from enum import Enum
 
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
 class VatMode(str, Enum):
     WITH_VAT = "with_vat"
     WITHOUT_VAT = "without_vat"
@@ -20,3 +24,55 @@ class PaymentMethod(str, Enum):
     CRYPTO = "crypto"
     OTHER = "other"
 
+class StatsGroupBy(str, Enum):
+    MONTH = "month"
+    CURRENCY = "currency"
+    ASSIGNEE = "assignee"
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+class DocumentType(str, Enum):
+    DEALS = "deals"
+    INVOICES = "invoices"
+
+
+class ItemsReorder(BaseModel):
+    """Nové pořadí položek dokladu - původní indexy v novém pořadí"""
+    order: list[int] = Field(..., description="Permutace indexů 0..n-1")
+
+
+class BulkItemResult(BaseModel):
+    """Výsledek jedné položky hromadné operace"""
+    index: int = Field(..., description="Pořadí položky v požadavku")
+    id: Optional[int] = None
+    number: Optional[str] = Field(None, description="Číslo dokladu")
+    success: bool
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    """Souhrn hromadné operace"""
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class BulkSkipped(BaseModel):
+    """Položka, kterou hromadná operace přeskočila"""
+    id: int
+    reason: str
+
+
+class BulkTransitionResult(BaseModel):
+    """Výsledek hromadné změny stavu"""
+    updated: List[int]
+    rejected: List[BulkSkipped]
+
+
+class BulkDeleteResult(BaseModel):
+    """Výsledek hromadného mazání"""
+    affected: int = Field(..., description="Počet smazaných / deaktivovaných záznamů")
+    ids: List[int]
+    skipped: List[BulkSkipped]
@@ -0,0 +1,176 @@
+# backend/core/services/analytics.py
+"""
+Prodejní analytika nad řádkovým indexem položek (`document_items`).
+
+Každý report je jeden GROUP BY nad indexem idx_document_items_owner_date
+(vlastník, typ dokladu, datum). Částky se sčítají zvlášť po měnách.
+
+Do reportů se nepočítají neaktivní a stornované doklady a proformy
+(zálohové faktury - plnění se fakturuje znovu běžnou fakturou).
+Dobropisy jsou v indexu se zápornými částkami a množstvím, takže se
+od prodejů odečtou (viz document_items.NEGATIVE_SUBTYPES).
+"""
+import logging
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from backend.core.models.company import Company
+from backend.core.models.document_item import DocumentItem
+from backend.core.schemas.utils import DocumentType
+from backend.core.services.stats import month_key
+
+logger = logging.getLogger(__name__)
+
+EXCLUDED_STATUSES = ("cancelled",)
+EXCLUDED_SUBTYPES = ("proforma",)
+
+
+def _filtered(
+    query,
+    owner_id: str,
+    document_type: DocumentType,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    currency: Optional[str] = None
+):
+    query = query.filter(
+        DocumentItem.owner_id == owner_id,
+        DocumentItem.document_type == document_type.value,
+        DocumentItem.is_active == True,
+        DocumentItem.status.notin_(EXCLUDED_STATUSES),
+        or_(DocumentItem.document_subtype.is_(None), DocumentItem.document_subtype.notin_(EXCLUDED_SUBTYPES))
+    )
+    if date_from:
+        query = query.filter(DocumentItem.document_date >= date_from)
+    if date_to:
+        query = query.filter(DocumentItem.document_date <= date_to)
+    if currency:
+        query = query.filter(DocumentItem.currency == currency)
+    return query
+
+
+def product_sales(
+    db: Session,
+    owner_id: str,
+    document_type: DocumentType = DocumentType.INVOICES,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    currency: Optional[str] = None,
+    product_id: Optional[int] = None,
+    code: Optional[str] = None,
+    limit: int = 20
+) -> list[dict]:
+    """
+    Prodeje po produktech (product_id + kód), seřazené podle obratu.
+
+    Položky bez produktu i kódu tvoří jednu skupinu (ruční položky).
+    """
+    net_amount = func.sum(DocumentItem.net_amount)
+    query = _filtered(
+        db.query(
+            DocumentItem.product_id,
+            DocumentItem.code,
+            DocumentItem.currency,
+            func.max(DocumentItem.name),
+            func.sum(DocumentItem.quantity),
+            net_amount,
+            func.sum(DocumentItem.vat_amount),
+            func.count(func.distinct(DocumentItem.document_id)),
+        ),
+        owner_id, document_type, date_from, date_to, currency
+    )
+    if product_id is not None:
+        query = query.filter(DocumentItem.product_id == product_id)
+    if code:
+        query = query.filter(DocumentItem.code == code)
+
+    rows = (
+        query.group_by(DocumentItem.product_id, DocumentItem.code, DocumentItem.currency)
+        .order_by(net_amount.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "product_id": product, "code": product_code, "currency": row_currency, "name": name,
+            "quantity": round(quantity or 0, 3), "net_amount": round(net or 0, 2),
+            "vat_amount": round(vat or 0, 2), "documents_count": documents,
+        }
+        for product, product_code, row_currency, name, quantity, net, vat, documents in rows
+    ]
+
+
+def customer_sales(
+    db: Session,
+    owner_id: str,
+    document_type: DocumentType = DocumentType.INVOICES,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    currency: Optional[str] = None,
+    limit: int = 20
+) -> list[dict]:
+    """Nejvýznamnější zákazníci podle obratu."""
+    net_amount = func.sum(DocumentItem.net_amount)
+    top = _filtered(
+        db.query(
+            DocumentItem.company_id,
+            DocumentItem.currency,
+            net_amount.label("net_amount"),
+            func.sum(DocumentItem.vat_amount).label("vat_amount"),
+            func.count(func.distinct(DocumentItem.document_id)).label("documents_count"),
+        ),
+        owner_id, document_type, date_from, date_to, currency
+    ).group_by(DocumentItem.company_id, DocumentItem.currency).order_by(net_amount.desc()).limit(limit).subquery()
+
+    # Název firmy až pro vybrané řádky
+    rows = (
+        db.query(top, Company.name)
+        .outerjoin(Company, Company.id == top.c.company_id)
+        .order_by(top.c.net_amount.desc())
+        .all()
+    )
+    return [
+        {
+            "company_id": row.company_id, "company_name": row.name, "currency": row.currency,
+            "net_amount": round(row.net_amount or 0, 2), "vat_amount": round(row.vat_amount or 0, 2),
+            "documents_count": row.documents_count,
+        }
+        for row in rows
+    ]
+
+
+def vat_summary(
+    db: Session,
+    owner_id: str,
+    document_type: DocumentType = DocumentType.INVOICES,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    currency: Optional[str] = None,
+    by_month: bool = False
+) -> list[dict]:
+    """Základ a DPH po sazbách (volitelně i po měsících)."""
+    month = month_key(db, DocumentItem.document_date) if by_month else None
+    group = [DocumentItem.vat_rate, DocumentItem.currency] + ([month] if by_month else [])
+
+    rows = _filtered(
+        db.query(
+            *group,
+            func.sum(DocumentItem.net_amount),
+            func.sum(DocumentItem.vat_amount),
+            func.count(DocumentItem.id),
+        ),
+        owner_id, document_type, date_from, date_to, currency
+    ).group_by(*group).order_by(*reversed(group)).all()
+
+    result = []
+    for row in rows:
+        vat_rate, row_currency = row[0], row[1]
+        base, vat, lines = row[-3:]
+        result.append({
+            "vat_rate": vat_rate, "currency": row_currency, "month": row[2] if by_month else None,
+            "base": round(base or 0, 2), "vat": round(vat or 0, 2), "lines_count": lines,
+        })
+    return result
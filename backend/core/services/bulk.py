@@ -0,0 +1,518 @@
+# backend/core/services/bulk.py
+"""
+Hromadné operace: zakládání, úpravy, změny stavu a fakturace objednávek
+(importy z e-shopu, měsíční uzávěrky) a mazání dealů, faktur, leadů a produktů.
+
+Založení po jednom (POST /deals/) znamená pro každou objednávku číslo z
+řady, výpočet součtů, commit a refresh. Hromadně se zpracovává po dávkách:
+- čísla objednávek se přidělí jedním posunem řady pro celou dávku,
+- součty se spočítají najednou (pricing.calculate_batch),
+- dávka se vloží jedním INSERT ... RETURNING (executemany) a commitne.
+
+INSERT přes Core obchází ORM eventy, proto se fulltext, index štítků,
+index položek a souhrn statistik doplní explicitně pro celou dávku.
+Úpravy stejně: aktuální řádky dávky se načtou jedním SELECT, součty se
+přepočítají dávkově a zapíše se jeden executemany UPDATE podle id.
+
+Změna stavu je jeden UPDATE s povolenými výchozími stavy ve WHERE,
+mazání jeden UPDATE (soft delete) / DELETE s podmínkami (NOT EXISTS) ve WHERE.
+
+Když dávka selže, zopakuje se po jednotlivých objednávkách - výsledek
+pak přesně říká, která položka požadavku je vadná.
+"""
+import logging
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import case, delete, exists, func, insert, select, update
+from sqlalchemy.sql.dml import Delete
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
+
+from backend.core.models.deal import Deal, DealStatus, DiscountType
+from backend.core.models.invocie import Invoice, InvoiceType
+from backend.core.models.lead import Lead
+from backend.core.models.product import Product
+from backend.core.services.payments import refresh_deal_payments
+from backend.core.services.pricing import DEAL, calculate_batch
+from backend.core.services.sequences import next_deal_numbers, next_invoice_numbers, variable_symbol_for
+from backend.core.services.stats import refresh_deal_stats, refresh_lead_stats
+from backend.core.utils import document_items, entity_index, fulltext, trigram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Změna těchto polí vyžaduje přepočet součtů
+DEAL_TOTALS_FIELDS = {"items", "discount", "discount_type", "rounding"}
+
+
+def _chunks(items: list, size: int) -> Iterable[tuple[int, list]]:
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def _result(index: int, deal_id: Optional[int] = None, number: Optional[str] = None, error: Optional[str] = None) -> dict:
+    return {"index": index, "id": deal_id, "number": number, "success": error is None, "error": error}
+
+
+def _summary(results: list[dict]) -> dict:
+    failed = sum(1 for result in results if not result["success"])
+    return {"succeeded": len(results) - failed, "failed": failed, "results": results}
+
+
+def _returning_ids(conn, statement, table, where) -> set[int]:
+    """
+    Provede UPDATE/DELETE a vrátí id zasažených řádků.
+
+    Databáze bez RETURNING: id se nejdřív vyberou se zámkem (FOR UPDATE).
+    """
+    supported = conn.dialect.delete_returning if isinstance(statement, Delete) else conn.dialect.update_returning
+    if supported:
+        return set(conn.execute(statement.returning(table.c.id)).scalars())
+    ids = set(conn.execute(select(table.c.id).where(*where).with_for_update()).scalars())
+    conn.execute(statement)
+    return ids
+
+
+def _run_chunks(db: Session, items: list, chunk_size: int, process, base: int = 0) -> dict:
+    """
+    Zpracuje položky po dávkách, každou dávku v samostatné transakci.
+
+    Args:
+        process: fn(db, start, chunk) -> výsledky dávky; při chybě se dávka
+            odroluje a zopakuje po jednotlivých položkách
+        base: Index první položky v požadavku (při opakování dávky)
+    """
+    results = []
+    for offset, chunk in _chunks(items, chunk_size):
+        start = base + offset
+        try:
+            chunk_results = process(db, start, chunk)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            if len(chunk) == 1:
+                logger.warning(f"Bulk item {start} failed: {e}")
+                results.append(_result(start, error=str(getattr(e, "orig", None) or e)))
+                continue
+            logger.warning(f"Bulk chunk {start}..{start + len(chunk) - 1} failed, retrying one by one: {e}")
+            results.extend(_run_chunks(db, chunk, 1, process, base=start)["results"])
+            continue
+        results.extend(chunk_results)
+    return _summary(results)
+
+
+# =====================================================
+# ZALOŽENÍ
+# =====================================================
+def _index_columns() -> list[str]:
+    """Sloupce potřebné pro indexy (fulltext, štítky, položky) a výsledek."""
+    names = ["id", "deal_number", "user_id", "tags", "custom_fields", *Deal.__fulltext__, *document_items.source_columns(Deal)]
+    return list(dict.fromkeys(names))
+
+
+def _pricing_input(row: dict) -> dict:
+    return {
+        "items": row["items"],
+        "discount": row["discount"],
+        "discount_percent": row["discount_type"] == DiscountType.PERCENT,
+        "rounding": row["rounding"],
+    }
+
+
+def _sync_indexes(db: Session, rows: list[dict], user_ids: Iterable[str], replace: bool) -> None:
+    """Promítne zapsané řádky do indexů a souhrnu (Core zápis obchází ORM eventy)."""
+    conn = db.connection()
+    fulltext.reindex_rows(conn, Deal, rows)
+    entity_index.sync_rows(conn, Deal, rows, replace=replace)
+    document_items.sync_rows(conn, Deal, rows, replace=replace)
+    refresh_deal_stats(conn, user_ids)
+
+
+def _insert_deals(db: Session, user_id: str, start: int, deals: list) -> list[dict]:
+    rows = []
+    for deal in deals:
+        data = deal.model_dump()
+        data["user_id"] = user_id
+        data["created_by"] = user_id
+        rows.append(data)
+
+    totals = calculate_batch([_pricing_input(row) for row in rows], DEAL)
+    numbers = next_deal_numbers(db, user_id, len(rows))
+    for row, row_totals, number in zip(rows, totals, numbers):
+        row.update(row_totals)
+        row["deal_number"] = number
+
+    table = Deal.__table__
+    inserted = [
+        dict(row) for row in db.execute(
+            insert(table).returning(*(table.c[c] for c in _index_columns()), sort_by_parameter_order=True),
+            rows
+        ).mappings()
+    ]
+    _sync_indexes(db, inserted, [user_id], replace=False)
+
+    return [_result(start + i, row["id"], row["deal_number"]) for i, row in enumerate(inserted)]
+
+
+def create_deals(db: Session, user_id: str, deals: list, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    Založí objednávky uživatele po dávkách.
+
+    Args:
+        deals: DealCreate (user_id a deal_number se doplní stejně jako u POST /deals/)
+        chunk_size: Počet objednávek v jedné transakci
+
+    Returns:
+        {"succeeded", "failed", "results": [{"index", "id", "number", "success", "error"}]}
+    """
+    return _run_chunks(
+        db, deals, chunk_size,
+        lambda db, start, chunk: _insert_deals(db, user_id, start, chunk)
+    )
+
+
+# =====================================================
+# ÚPRAVY
+# =====================================================
+def _update_deals(db: Session, user_id: str, start: int, updates: list) -> list[dict]:
+    table = Deal.__table__
+    columns = list(dict.fromkeys(_index_columns() + ["discount", "discount_type", "rounding"]))
+    current = {
+        row["id"]: dict(row) for row in db.execute(
+            select(*(table.c[c] for c in columns))
+            .where(table.c.id.in_({item.id for item in updates}), table.c.user_id == user_id)
+        ).mappings()
+    }
+
+    results, changes, recalculate = [], {}, set()
+    for i, item in enumerate(updates):
+        row = current.get(item.id)
+        if row is None:
+            results.append(_result(start + i, item.id, error="Deal nenalezen"))
+            continue
+
+        data = item.model_dump(exclude_unset=True, exclude={"id"})
+        row.update(data)
+        changes.setdefault(item.id, {"id": item.id}).update(data)
+        if DEAL_TOTALS_FIELDS & data.keys():
+            recalculate.add(item.id)
+        results.append(_result(start + i, item.id, row["deal_number"]))
+
+    if recalculate:
+        ids = sorted(recalculate)
+        totals = calculate_batch([_pricing_input(current[deal_id]) for deal_id in ids], DEAL)
+        for deal_id, deal_totals in zip(ids, totals):
+            current[deal_id].update(deal_totals)
+            # Průběžné součty se dopočítají při úpravě položky
+            changes[deal_id].update(deal_totals, pricing_state=None)
+
+    if changes:
+        # ORM bulk UPDATE podle primárního klíče - executemany po skupinách se stejnými sloupci
+        db.execute(update(Deal), list(changes.values()))
+        _sync_indexes(db, [current[deal_id] for deal_id in changes], [user_id], replace=True)
+        # Nová celková částka mění stav platby (zaplaceno / částečně / přeplaceno)
+        refresh_deal_payments(db.connection(), recalculate)
+    return results
+
+
+def update_deals(db: Session, user_id: str, updates: list, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    Upraví objednávky uživatele po dávkách.
+
+    Args:
+        updates: DealBulkUpdateItem - id + měněná pole (jako PATCH /deals/{id})
+        chunk_size: Počet objednávek v jedné transakci
+
+    Returns:
+        Stejný tvar jako create_deals; cizí a neexistující id jsou chyby položek
+    """
+    return _run_chunks(
+        db, updates, chunk_size,
+        lambda db, start, chunk: _update_deals(db, user_id, start, chunk)
+    )
+
+
+# =====================================================
+# ZMĚNY STAVU
+# =====================================================
+# Povolené přechody: cílový stav -> stavy, ze kterých do něj lze přejít
+DEAL_TRANSITIONS = {
+    DealStatus.CONFIRMED: (DealStatus.DRAFT,),
+    DealStatus.IN_PROGRESS: (DealStatus.DRAFT, DealStatus.CONFIRMED),
+    DealStatus.COMPLETED: (DealStatus.DRAFT, DealStatus.CONFIRMED, DealStatus.IN_PROGRESS),
+    DealStatus.CANCELLED: (DealStatus.DRAFT, DealStatus.CONFIRMED, DealStatus.IN_PROGRESS),
+}
+
+
+def _transition_values(table, target: DealStatus, reason: Optional[str]) -> dict:
+    """Hodnoty UPDATE pro přechod - stejné vedlejší efekty jako /confirm, /complete, /cancel."""
+    values = {"status": target}
+    if target == DealStatus.CONFIRMED:
+        values["deal_date"] = func.coalesce(table.c.deal_date, date.today())
+    elif target == DealStatus.COMPLETED:
+        values["completed_at"] = datetime.utcnow()
+    elif target == DealStatus.CANCELLED and reason:
+        note = f"Důvod zrušení: {reason}"
+        values["internal_notes"] = case(
+            (func.coalesce(table.c.internal_notes, "") == "", note),
+            else_=table.c.internal_notes + "\n\n" + note
+        )
+    return values
+
+
+def transition_deals(
+    db: Session,
+    user_id: str,
+    deal_ids: list[int],
+    target: DealStatus,
+    reason: Optional[str] = None
+) -> dict:
+    """
+    Převede dealy do stavu `target` jedním UPDATE.
+
+    Povolené výchozí stavy (DEAL_TRANSITIONS) hlídá podmínka WHERE, takže
+    souběžná změna stavu mezi kontrolou a zápisem nic nerozbije. Necommituje.
+
+    Returns:
+        {"updated": [id, ...], "rejected": [{"id", "reason"}, ...]}
+
+    Raises:
+        ValueError: Do cílového stavu nelze hromadně přejít
+    """
+    sources = DEAL_TRANSITIONS.get(target)
+    if sources is None:
+        raise ValueError(f"Do stavu {target.value} nelze hromadně přejít")
+
+    ids = list(dict.fromkeys(deal_ids))
+    table = Deal.__table__
+    where = (table.c.id.in_(ids), table.c.user_id == user_id, table.c.status.in_(sources))
+    statement = update(table).where(*where).values(_transition_values(table, target, reason))
+
+    conn = db.connection()
+    updated = _returning_ids(conn, statement, table, where)
+
+    rest = [deal_id for deal_id in ids if deal_id not in updated]
+    current = dict(conn.execute(
+        select(table.c.id, table.c.status).where(table.c.id.in_(rest), table.c.user_id == user_id)
+    ).all()) if rest else {}
+
+    rejected = []
+    for deal_id in rest:
+        status = current.get(deal_id)
+        if status is None:
+            message = "Deal nenalezen"
+        elif status == target:
+            message = f"Deal už je ve stavu {target.value}"
+        else:
+            message = f"Přechod {status.value} -> {target.value} není povolen"
+        rejected.append({"id": deal_id, "reason": message})
+
+    if updated:
+        # Status je hlavičkový údaj indexu položek a klíč souhrnu statistik
+        document_items.update_header(conn, Deal, updated, status=target)
+        refresh_deal_stats(conn, [user_id])
+
+    return {"updated": [deal_id for deal_id in ids if deal_id in updated], "rejected": rejected}
+
+
+# =====================================================
+# MAZÁNÍ
+# =====================================================
+def _bulk_delete(
+    conn,
+    model,
+    ids: list[int],
+    permanent: bool,
+    not_found: str,
+    scope: tuple = (),
+    guard=None,
+    guard_reason: str = ""
+) -> tuple[list[int], list[dict]]:
+    """
+    Smaže (DELETE) nebo deaktivuje (is_active=false) řádky jedním příkazem.
+
+    Args:
+        scope: Podmínky viditelnosti (např. vlastník) - mimo ně "nenalezeno"
+        guard: Podmínka, která musí platit pro trvalé smazání (např. NOT EXISTS)
+        guard_reason: Důvod přeskočení řádků, které guard nesplnily
+
+    Returns:
+        (zasažená id v pořadí požadavku, přeskočené [{"id", "reason"}])
+    """
+    table = model.__table__
+    ids = list(dict.fromkeys(ids))
+    where = (table.c.id.in_(ids), *scope, *((guard,) if permanent and guard is not None else ()))
+    if permanent:
+        statement = delete(table).where(*where)
+    else:
+        statement = update(table).where(*where).values(is_active=False)
+    affected = _returning_ids(conn, statement, table, where)
+
+    rest = [row_id for row_id in ids if row_id not in affected]
+    existing = set(conn.execute(
+        select(table.c.id).where(table.c.id.in_(rest), *scope)
+    ).scalars()) if rest else set()
+    skipped = [{"id": row_id, "reason": guard_reason if row_id in existing else not_found} for row_id in rest]
+    return [row_id for row_id in ids if row_id in affected], skipped
+
+
+def _deleted(conn, model, ids: list[int], permanent: bool) -> None:
+    """Promítne smazání / deaktivaci do indexů (Core obchází ORM eventy)."""
+    if not ids:
+        return
+    if permanent:
+        if getattr(model, "__fulltext__", None):
+            fulltext.remove_rows(conn, model, ids)
+        if entity_index.is_indexed(model):
+            entity_index.remove_rows(conn, model, ids)
+        if getattr(model, "__document_items__", None):
+            document_items.remove_rows(conn, model, ids)
+    elif getattr(model, "__document_items__", None):
+        document_items.update_header(conn, model, ids, is_active=False)
+
+
+def _result_of_delete(affected: list[int], skipped: list[dict]) -> dict:
+    return {"affected": len(affected), "ids": affected, "skipped": skipped}
+
+
+def delete_deals(db: Session, user_id: str, deal_ids: list[int], permanent: bool = False) -> dict:
+    """
+    Hromadně smaže dealy uživatele. Necommituje.
+
+    Trvale lze smazat jen deal bez aktivních faktur (NOT EXISTS v podmínce
+    DELETE), neaktivní faktury a konvertované leady na něj přestanou odkazovat.
+
+    Returns:
+        {"affected", "ids", "skipped": [{"id", "reason"}]}
+    """
+    conn = db.connection()
+    table = Deal.__table__
+    invoices = Invoice.__table__
+    has_active_invoices = exists().where(invoices.c.deal_id == table.c.id, invoices.c.is_active == True)
+
+    affected, skipped = _bulk_delete(
+        conn, Deal, deal_ids, permanent, "Deal nenalezen",
+        scope=(table.c.user_id == user_id,),
+        guard=~has_active_invoices, guard_reason="Nelze smazat deal s aktivními fakturami"
+    )
+    if affected and permanent:
+        # ON DELETE SET NULL i tam, kde databáze cizí klíče nevynucuje (SQLite)
+        conn.execute(update(invoices).where(invoices.c.deal_id.in_(affected)).values(deal_id=None))
+        leads = Lead.__table__
+        conn.execute(update(leads).where(leads.c.converted_to_deal_id.in_(affected)).values(converted_to_deal_id=None))
+    _deleted(conn, Deal, affected, permanent)
+    if affected:
+        refresh_deal_stats(conn, [user_id])
+    return _result_of_delete(affected, skipped)
+
+
+def delete_invoices(db: Session, invoice_ids: list[int], permanent: bool = True) -> dict:
+    """Hromadně smaže faktury. Necommituje."""
+    conn = db.connection()
+    invoices = Invoice.__table__
+    deal_ids = list(conn.execute(
+        select(invoices.c.deal_id).where(invoices.c.id.in_(invoice_ids), invoices.c.deal_id.isnot(None)).distinct()
+    ).scalars())
+
+    affected, skipped = _bulk_delete(conn, Invoice, invoice_ids, permanent, "Invoice not found")
+    if affected and permanent:
+        conn.execute(update(invoices).where(invoices.c.proforma_id.in_(affected)).values(proforma_id=None))
+    _deleted(conn, Invoice, affected, permanent)
+    if affected:
+        refresh_deal_payments(conn, deal_ids)
+    return _result_of_delete(affected, skipped)
+
+
+def delete_leads(db: Session, lead_ids: list[int], permanent: bool = True) -> dict:
+    """Hromadně smaže leady. Necommituje."""
+    conn = db.connection()
+    leads = Lead.__table__
+    user_ids = list(conn.execute(select(leads.c.user_id).where(leads.c.id.in_(lead_ids)).distinct()).scalars())
+
+    affected, skipped = _bulk_delete(conn, Lead, lead_ids, permanent, "Lead not found")
+    if affected and permanent:
+        deals = Deal.__table__
+        conn.execute(update(deals).where(deals.c.lead_id.in_(affected)).values(lead_id=None))
+        trigram.remove_rows(db, Lead, affected)
+    _deleted(conn, Lead, affected, permanent)
+    if affected:
+        refresh_lead_stats(conn, user_ids)
+    return _result_of_delete(affected, skipped)
+
+
+def delete_products(db: Session, product_ids: list[int], permanent: bool = False) -> dict:
+    """Hromadně smaže produkty (výchozí soft delete jako DELETE /products/{id}). Necommituje."""
+    conn = db.connection()
+    affected, skipped = _bulk_delete(conn, Product, product_ids, permanent, "Produkt nenalezen")
+    _deleted(conn, Product, affected, permanent)
+    return _result_of_delete(affected, skipped)
+
+
+# =====================================================
+# FAKTURACE
+# =====================================================
+def invoice_deals(
+    db: Session,
+    user_id: str,
+    deal_ids: list[int],
+    supplier,
+    invoice_type: InvoiceType,
+    invoice_kwargs: dict,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> dict:
+    """
+    Vystaví faktury k více dealům uživatele. Necommituje.
+
+    Dealy (i s firmami) se načtou jedním dotazem, faktury se sestaví přes
+    Invoice.create_from_deal v paměti, dostanou souvislý blok čísel
+    (gapless - celá dávka je jedna transakce) a ukládají se po `chunk_size`.
+
+    Args:
+        supplier: Company dodavatele
+        invoice_kwargs: Společné parametry pro create_from_deal
+
+    Returns:
+        {"created", "failed", "results": [{"deal_id", "deal_number", "success", "invoice_id", ...}]}
+    """
+    ids = list(dict.fromkeys(deal_ids))
+    deals = {
+        deal.id: deal for deal in
+        db.query(Deal).options(selectinload(Deal.company))
+        .filter(Deal.id.in_(ids), Deal.user_id == user_id).all()
+    }
+
+    results, invoices = [], []
+    for deal_id in ids:
+        deal = deals.get(deal_id)
+        result = {"deal_id": deal_id, "deal_number": deal.deal_number if deal else None, "success": False}
+        results.append(result)
+        if deal is None:
+            result["error"] = "Deal nenalezen"
+            continue
+        # Faktura potřebuje odběratele jako firmu (customer_id je povinné)
+        if deal.company is None:
+            result["error"] = "Deal nemá přiřazenou firmu - nelze vystavit fakturu"
+            continue
+
+        invoice = Invoice.create_from_deal(deal=deal, supplier=supplier, invoice_type=invoice_type, **invoice_kwargs)
+        invoices.append((result, invoice))
+
+    numbers = next_invoice_numbers(db, invoice_type, len(invoices)) if invoices else []
+    for (_, invoice), number in zip(invoices, numbers):
+        invoice.invoice_number = number
+        if not invoice.variable_symbol:
+            invoice.variable_symbol = variable_symbol_for(number)
+
+    for _, chunk in _chunks(invoices, chunk_size):
+        db.add_all([invoice for _, invoice in chunk])
+        db.flush()
+        for result, invoice in chunk:
+            result.update(
+                success=True, invoice_id=invoice.id, invoice_number=invoice.invoice_number,
+                total=invoice.total, currency=invoice.currency
+            )
+
+    created = len(invoices)
+    return {"created": created, "failed": len(results) - created, "results": results}
@@ -0,0 +1,273 @@
+# backend/core/services/limiter.py
+import asyncio
+import logging
+import math
+import time
+from typing import Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBucket:
+    """Lokální zásoba tokenů jednoho identifikátoru v rámci jednoho okna."""
+
+    __slots__ = ("window_start", "tokens", "exhausted", "pending")
+
+    def __init__(self, window_start: int):
+        self.window_start = window_start
+        self.tokens = 0
+        self.exhausted = False  # Redis už v tomto okně nic dalšího nepřidělí
+        self.pending: Optional[asyncio.Task] = None  # Běžící pronájem z Redisu
+
+
+class QuotaLeaser:
+    """
+    Dvouúrovňový limiter - lokální token bucket + pronájem kvóty z Redisu.
+
+    Každý worker si z Redisu pronajímá kvótu po dávkách (lease_ratio z limitu)
+    a jednotlivé requesty obsluhuje z paměti. Redis se volá jen jednou za dávku,
+    doplnění probíhá na pozadí, jakmile zásoba klesne pod polovinu dávky.
+
+    Redis počítadlo okna nikdy nepřidělí víc než limit, takže globální limit
+    napříč workery platí přibližně (nevyužité tokeny na konci okna propadnou).
+
+    Výsledek každého pronájmu (i na pozadí) se hlásí circuit breakeru -
+    requesty obsloužené z lokální zásoby Redis nevolají a nepočítají se.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        limit: int,
+        window: int,
+        prefix: str,
+        lease_ratio: float = 0.1,
+        max_buckets: int = 10000,
+        breaker: Optional["CircuitBreaker"] = None
+    ):
+        """
+        Args:
+            client: Redis klient
+            limit: Maximální počet requestů v okně (globálně)
+            window: Časové okno v sekundách
+            prefix: Prefix pro Redis klíče
+            lease_ratio: Jakou část limitu si worker pronajme najednou
+            max_buckets: Max počet lokálních bucketů před úklidem
+            breaker: Circuit breaker, kterému se hlásí výsledky volání Redisu
+        """
+        self.client = client
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+        self.chunk = max(1, math.ceil(limit * lease_ratio))
+        self.max_buckets = max_buckets
+        self.breaker = breaker
+        self._buckets: dict[str, LocalBucket] = {}
+
+    def _window_start(self) -> int:
+        return int(time.time() / self.window) * self.window
+
+    def _get_redis_key(self, identifier: str, window_start: int) -> str:
+        return f"{self.prefix}:{identifier}:{window_start}"
+
+    def _get_bucket(self, identifier: str) -> LocalBucket:
+        """Vrátí bucket pro aktuální okno (starý bucket se zahodí)."""
+        window_start = self._window_start()
+        bucket = self._buckets.get(identifier)
+
+        if bucket is None or bucket.window_start != window_start:
+            if len(self._buckets) >= self.max_buckets:
+                self._evict(window_start)
+            bucket = LocalBucket(window_start)
+            self._buckets[identifier] = bucket
+
+        return bucket
+
+    def _evict(self, window_start: int) -> None:
+        """Zahodí buckety z minulých oken."""
+        stale = [k for k, b in self._buckets.items() if b.window_start != window_start]
+        for key in stale:
+            del self._buckets[key]
+
+    def _lease(self, identifier: str, window_start: int) -> int:
+        """
+        Pronajme dávku tokenů z Redisu (blokující volání).
+
+        Returns:
+            Počet skutečně přidělených tokenů (0 až chunk)
+        """
+        key = self._get_redis_key(identifier, window_start)
+
+        pipe = self.client.pipeline()
+        pipe.incrby(key, self.chunk)
+        pipe.expire(key, self.window)
+        used, _ = pipe.execute()
+
+        # Kolik z dávky se ještě vešlo pod limit
+        granted = min(self.chunk, self.limit - (used - self.chunk))
+        return max(0, granted)
+
+    async def _refill(self, identifier: str, bucket: LocalBucket) -> None:
+        """Doplní bucket z Redisu, souběžné requesty čekají na stejný lease."""
+        try:
+            granted = await asyncio.to_thread(self._lease, identifier, bucket.window_start)
+        except redis.RedisError:
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+        finally:
+            bucket.pending = None
+
+        if self.breaker is not None:
+            self.breaker.record_success()
+        bucket.tokens += granted
+        if granted < self.chunk:
+            bucket.exhausted = True
+
+    async def _background_refill(self, identifier: str, bucket: LocalBucket) -> None:
+        """Asynchronní doplnění - chyby se jen logují, request na něj nečeká."""
+        try:
+            await self._refill(identifier, bucket)
+        except redis.RedisError as e:
+            logger.warning(f"Background quota lease failed for {identifier}: {e}")
+
+    async def acquire(self, identifier: str, cost: int = 1) -> bool:
+        """
+        Spotřebuje `cost` tokenů z lokálního bucketu.
+
+        Returns:
+            True pokud je request povolen, False pokud je kvóta vyčerpána
+
+        Raises:
+            redis.RedisError: Pokud se nepodaří pronajmout kvótu
+        """
+        bucket = self._get_bucket(identifier)
+
+        while bucket.tokens < cost and not bucket.exhausted:
+            if bucket.pending is None:
+                bucket.pending = asyncio.ensure_future(self._refill(identifier, bucket))
+            await bucket.pending
+
+        if bucket.tokens < cost:
+            return False
+
+        bucket.tokens -= cost
+
+        # Předčasné doplnění na pozadí, aby další requesty nečekaly na Redis
+        if (
+            bucket.tokens < self.chunk / 2
+            and not bucket.exhausted
+            and bucket.pending is None
+        ):
+            bucket.pending = asyncio.ensure_future(self._background_refill(identifier, bucket))
+
+        return True
+
+
+class CircuitBreaker:
+    """
+    Jednoduchý circuit breaker pro volání Redisu.
+
+    - closed: volání probíhají normálně
+    - open: po `failure_threshold` chybách v řadě se Redis nevolá
+    - half-open: po `reset_timeout` se pustí jedno zkušební volání,
+      při úspěchu se breaker zavře, při chybě znovu otevře
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 10.0):
+        """
+        Args:
+            failure_threshold: Počet chyb v řadě, po kterých se breaker otevře
+            reset_timeout: Jak dlouho zůstane breaker otevřený (s)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Vrátí True, pokud se má Redis zavolat."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_progress:
+            self._trial_in_progress = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """Uvolní zkušební volání, které se k Redisu nedostalo (request obsloužený lokálně)."""
+        self._trial_in_progress = False
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("Redis recovered, circuit breaker closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_progress = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(
+                    f"Redis failed {self.failures}x in a row, "
+                    f"circuit breaker open for {self.reset_timeout}s"
+                )
+            self.opened_at = time.monotonic()
+
+
+class LocalWindowLimiter:
+    """
+    Fixed window limiter v paměti workeru.
+
+    Slouží jako náhrada při výpadku Redisu - každý worker počítá sám,
+    proto se limit dělí počtem workerů (globální limit platí přibližně).
+    """
+
+    def __init__(self, limit: int, window: int, workers: int = 1, max_keys: int = 10000):
+        """
+        Args:
+            limit: Maximální počet requestů v okně (globálně)
+            window: Časové okno v sekundách
+            workers: Počet workerů, mezi které se limit dělí
+            max_keys: Max počet počítadel před úklidem
+        """
+        self.limit = max(1, math.ceil(limit / max(1, workers)))
+        self.window = window
+        self.max_keys = max_keys
+        self._counters: dict[str, tuple[int, int]] = {}  # identifier -> (window_start, count)
+
+    def acquire(self, identifier: str, cost: int = 1) -> bool:
+        """
+        Returns:
+            True pokud je request povolen
+        """
+        window_start = int(time.time() / self.window) * self.window
+        start, count = self._counters.get(identifier, (window_start, 0))
+
+        if start != window_start:
+            count = 0
+        elif identifier not in self._counters and len(self._counters) >= self.max_keys:
+            self._counters = {
+                k: v for k, v in self._counters.items() if v[0] == window_start
+            }
+
+        if count + cost > self.limit:
+            self._counters[identifier] = (window_start, count)
+            return False
+
+        self._counters[identifier] = (window_start, count + cost)
+        return True
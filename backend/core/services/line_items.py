@@ -0,0 +1,102 @@
+# backend/core/services/line_items.py
+"""
+Úpravy jednotlivých položek dokladu (Deal, Invoice).
+
+Položky jsou JSON seznam ve sloupci `items`. Součty se při úpravě jedné
+položky nepřepočítávají ze všech řádků - odečte se stará a přičte nová
+položka v průběžných agregacích po sazbách DPH (RunningTotals uložené v
+`pricing_state`) a doklad se dopočítá z agregací.
+
+Validaci položky dělá router (DealItem / InvoiceItem), funkce tady
+dostávají hotové dicty. Neplatný index hlásí IndexError, neplatné pořadí
+ValueError.
+"""
+from typing import Optional
+
+from backend.core.services.pricing import RunningTotals, recalculate_document
+
+
+def _running(document) -> RunningTotals:
+    # Načíst před změnou items - stav se kontroluje proti počtu položek
+    return RunningTotals.load(document.pricing_state, document.items)
+
+
+def _check_index(items: list, index: int) -> None:
+    if not 0 <= index < len(items):
+        raise IndexError(f"Item {index} not found")
+
+
+def add_item(document, item: dict, position: Optional[int] = None) -> int:
+    """
+    Přidá položku.
+
+    Args:
+        position: Index nové položky (None = na konec)
+
+    Returns:
+        Index přidané položky
+    """
+    running = _running(document)
+    items = list(document.items or [])
+    position = len(items) if position is None else max(0, min(position, len(items)))
+
+    items.insert(position, item)
+    running.add(item)
+
+    document.items = items
+    recalculate_document(document, running)
+    return position
+
+
+def replace_item(document, index: int, item: dict) -> None:
+    """Nahradí položku na indexu."""
+    running = _running(document)
+    items = list(document.items or [])
+    _check_index(items, index)
+
+    running.remove(items[index])
+    running.add(item)
+    items[index] = item
+
+    document.items = items
+    recalculate_document(document, running)
+
+
+def remove_item(document, index: int) -> dict:
+    """
+    Odebere položku.
+
+    Returns:
+        Odebraná položka
+    """
+    running = _running(document)
+    items = list(document.items or [])
+    _check_index(items, index)
+
+    removed = items.pop(index)
+    running.remove(removed)
+
+    document.items = items
+    recalculate_document(document, running)
+    return removed
+
+
+def reorder_items(document, order: list[int]) -> None:
+    """
+    Přeřadí položky. Součty se nemění, sort_order položek se přečísluje.
+
+    Args:
+        order: Původní indexy v novém pořadí (permutace 0..n-1)
+    """
+    items = list(document.items or [])
+    if sorted(order) != list(range(len(items))):
+        raise ValueError("Order must list every item index exactly once")
+
+    reordered = []
+    for sort_order, index in enumerate(order):
+        item = items[index]
+        if "sort_order" in item:
+            item = {**item, "sort_order": sort_order}
+        reordered.append(item)
+
+    document.items = reordered
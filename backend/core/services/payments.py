@@ -0,0 +1,192 @@
+# backend/core/services/payments.py
+"""
+Stav plateb dealů z faktur.
+
+`paid_amount` a `payment_status` dealu se odvozují z uhrazených částek jeho
+aktivních faktur. Přepočet je jeden UPDATE s agregačním poddotazem nad
+idx_invoice_deal - pro jeden deal stejně jako pro tisíce:
+
+- po flushi, který změní platbu faktury (paid_amount, is_active, deal_id)
+  nebo celkovou částku dealu - Session after_flush, stejná transakce,
+- hromadné operace přes Core volají `refresh_deal_payments` samy,
+- úplné přepočítání všech dealů (reconciliation):
+    python -m backend.core.services.payments
+"""
+import logging
+from typing import Iterable
+
+from sqlalchemy import Numeric, case, cast, event, func, inspect, literal, or_, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from backend.core.models.deal import Deal, PaymentStatus
+from backend.core.models.invocie import Invoice
+from backend.core.services.stats import refresh_deal_stats, shift_deal_stats
+
+logger = logging.getLogger(__name__)
+
+# Sloupce faktury, které mění zaplacenou částku dealu
+INVOICE_PAYMENT_ATTRIBUTES = ("deal_id", "paid_amount", "is_active")
+
+# Id dealů přepočítaných ve flushi (pro expiraci načtených objektů)
+_REFRESHED_KEY = "payments_refreshed_deals"
+
+
+def _payment_values(deals) -> dict:
+    """Hodnoty UPDATE - stejná pravidla jako Deal.recalculate_payment_status."""
+    invoices = Invoice.__table__
+    paid_sum = (
+        select(func.coalesce(func.sum(invoices.c.paid_amount), 0.0))
+        .where(invoices.c.deal_id == deals.c.id, invoices.c.is_active == True)
+        .scalar_subquery()
+    )
+    paid = func.round(cast(paid_sum, Numeric(14, 2)), 2)
+    total = func.coalesce(deals.c.total, 0.0)
+
+    def status(value: PaymentStatus):
+        # Enum sloupec ukládá názvy - literál musí projít typem sloupce
+        return literal(value, deals.c.payment_status.type)
+
+    return {
+        "paid_amount": paid,
+        "payment_status": case(
+            (paid <= 0, status(PaymentStatus.UNPAID)),
+            (paid < total, status(PaymentStatus.PARTIAL)),
+            (paid == total, status(PaymentStatus.PAID)),
+            else_=status(PaymentStatus.OVERPAID)
+        ),
+    }
+
+
+def _stats_deltas(before: dict, after: dict) -> dict:
+    """Rozdíly zaplacených částek po klíčích souhrnu statistik."""
+    deltas = {}
+    for deal_id, row in before.items():
+        change = (after.get(deal_id) or 0) - (row["paid_amount"] or 0)
+        if not row["is_active"] or not change:
+            continue
+        key = (row["user_id"], row["status"], row["currency"])
+        count, total, paid = deltas.get(key, (0, 0, 0))
+        deltas[key] = (count, total, paid + change)
+    return deltas
+
+
+def refresh_deal_payments(conn: Connection, deal_ids: Iterable[int]) -> list[int]:
+    """
+    Přepočítá zaplacenou částku a stav platby vybraných dealů. Necommituje.
+
+    Změnu paid_amount promítne i do souhrnu statistik.
+
+    Returns:
+        Id dealů, kterým se stav platby změnil
+    """
+    ids = sorted({deal_id for deal_id in deal_ids if deal_id is not None})
+    if not ids:
+        return []
+
+    deals = Deal.__table__
+    columns = (deals.c.id, deals.c.user_id, deals.c.status, deals.c.currency,
+               deals.c.is_active, deals.c.paid_amount, deals.c.payment_status)
+    before = {row["id"]: row for row in conn.execute(select(*columns).where(deals.c.id.in_(ids))).mappings()}
+
+    conn.execute(
+        update(deals)
+        .where(deals.c.id.in_(ids))
+        .values(_payment_values(deals))
+        .execution_options(synchronize_session=False)
+    )
+
+    after = {
+        row.id: row for row in conn.execute(
+            select(deals.c.id, deals.c.paid_amount, deals.c.payment_status).where(deals.c.id.in_(ids))
+        )
+    }
+    shift_deal_stats(conn, _stats_deltas(before, {deal_id: row.paid_amount for deal_id, row in after.items()}))
+
+    return [
+        deal_id for deal_id, row in before.items()
+        if (row["paid_amount"], row["payment_status"]) != (after[deal_id].paid_amount, after[deal_id].payment_status)
+    ]
+
+
+def reconcile_payments(engine: Engine) -> int:
+    """
+    Přepočítá stav plateb všech dealů jedním UPDATE (jen zastaralé řádky).
+
+    Returns:
+        Počet opravených dealů
+    """
+    deals = Deal.__table__
+    values = _payment_values(deals)
+    stale = or_(*(deals.c[column].is_distinct_from(value) for column, value in values.items()))
+    with engine.begin() as conn:
+        changed = conn.execute(update(deals).where(stale).values(values)).rowcount
+        if changed:
+            refresh_deal_stats(conn, conn.execute(select(deals.c.user_id).distinct()).scalars())
+    if changed:
+        logger.warning(f"Deal payments: {changed} deals corrected")
+    return changed
+
+
+# =====================================================
+# AUTOMATICKÁ PROPAGACE (Session after_flush)
+# =====================================================
+def _values(obj, attribute: str) -> list:
+    """Všechny hodnoty atributu ve flushi (původní i nová)."""
+    state = inspect(obj)
+    if attribute not in state.dict and attribute not in state.committed_state:
+        return []
+    history = state.attrs[attribute].history
+    return [*history.added, *history.unchanged, *history.deleted]
+
+
+def _touched_deals(session: Session) -> set[int]:
+    deal_ids = set()
+    for obj in session.new:
+        if isinstance(obj, Invoice) and obj.paid_amount:
+            deal_ids.add(obj.deal_id)
+
+    for obj in session.deleted:
+        if isinstance(obj, Invoice):
+            deal_ids.update(_values(obj, "deal_id"))
+
+    for obj in session.dirty:
+        state = inspect(obj)
+        if isinstance(obj, Invoice):
+            if any(state.attrs[a].history.has_changes() for a in INVOICE_PAYMENT_ATTRIBUTES):
+                deal_ids.update(_values(obj, "deal_id"))
+        elif isinstance(obj, Deal) and state.attrs.total.history.has_changes():
+            deal_ids.add(obj.id)
+
+    deal_ids.discard(None)
+    return deal_ids
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    """Přepočítá stav plateb dealů, kterých se flush týkal (stejná transakce)."""
+    deal_ids = _touched_deals(session)
+    if deal_ids:
+        refresh_deal_payments(session.connection(), deal_ids)
+        session.info.setdefault(_REFRESHED_KEY, set()).update(deal_ids)
+
+
+def _after_flush_postexec(session: Session, flush_context) -> None:
+    """Načtené dealy mají po UPDATE zastaralé hodnoty - načtou se znovu při přístupu."""
+    for deal_id in session.info.pop(_REFRESHED_KEY, ()):
+        deal = session.identity_map.get(session.identity_key(Deal, deal_id))
+        if deal is not None:
+            session.expire(deal, ["paid_amount", "payment_status"])
+
+
+def register_payment_events() -> None:
+    """Zaregistruje přepočet stavu plateb po flushi. Volá se při startu aplikace."""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+        event.listen(Session, "after_flush_postexec", _after_flush_postexec)
+
+
+if __name__ == "__main__":
+    # Reconciliation stavu plateb: python -m backend.core.services.payments
+    from backend.core.db import engine
+
+    print(f"deals: {reconcile_payments(engine)} corrected")
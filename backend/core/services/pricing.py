@@ -0,0 +1,489 @@
+# backend/core/services/pricing.py
+"""
+Výpočet součtů dokladů (objednávky, faktury) z položek.
+
+Jeden výpočet pro Deal.recalculate_totals, Invoice.recalculate_totals i
+routery. Počítá se v Decimal (hodnoty z JSON se převádí přes str, 0.1 je
+tedy přesně 0.1) a zaokrouhluje se na haléře ROUND_HALF_UP až na konci,
+stejně jako v původních float výpočtech.
+
+Postup má dvě fáze:
+1. agregace položek po přesné sazbě DPH: základ před slevou, sleva položek
+   a základ po slevě (_aggregate),
+2. dopočet dokladu - sleva na doklad, rozpad DPH, zaokrouhlení
+   (_finalize_deal, _finalize_invoice).
+
+Dávkový režim (calculate_batch) přepočítá tisíce dokladů najednou v NumPy,
+celočíselně ve fixní řádové čárce, takže výsledek je shodný se skalárním
+výpočtem. NumPy je volitelné - bez něj se dávka počítá po dokladech.
+"""
+import logging
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy je volitelné
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DEAL = "deal"
+INVOICE = "invoice"
+
+CENT = Decimal("0.01")
+ZERO = Decimal(0)
+HUNDRED = Decimal(100)
+
+
+def to_decimal(value) -> Decimal:
+    """Převede číslo z položky na Decimal (None a "" jsou 0)."""
+    if value is None or value == "":
+        return ZERO
+    if isinstance(value, Decimal):
+        return value
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"Invalid number: {value!r}")
+
+
+def quantize(value: Decimal) -> Decimal:
+    """Zaokrouhlí na haléře."""
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def rate_key(rate: Decimal) -> str:
+    """Klíč sazby ve vat_breakdown ("21", "12", "0")."""
+    return str(int(rate))
+
+
+# =====================================================
+# AGREGACE POLOŽEK
+# =====================================================
+def line_amounts(item: dict) -> tuple[Decimal, Decimal, Decimal]:
+    """Sazba DPH, základ před slevou a sleva jedné položky (nezaokrouhleně)."""
+    quantity = to_decimal(item.get('quantity'))
+    unit_price = to_decimal(item.get('unit_price'))
+    discount_percent = to_decimal(item.get('discount_percent'))
+    vat_rate = to_decimal(item.get('vat_rate'))
+
+    item_subtotal = quantity * unit_price
+    return vat_rate, item_subtotal, item_subtotal * discount_percent / HUNDRED
+
+
+def _add_line(groups: dict[Decimal, list], item: dict, sign: int = 1) -> None:
+    """Přičte (sign=-1 odečte) položku ke skupinám. Prázdná skupina zanikne."""
+    vat_rate, item_subtotal, item_discount = line_amounts(item)
+    group = groups.setdefault(vat_rate, [ZERO, ZERO, ZERO, 0])
+    group[0] += sign * item_subtotal
+    group[1] += sign * item_discount
+    group[2] += sign * (item_subtotal - item_discount)
+    group[3] += sign
+    if group[3] <= 0:
+        del groups[vat_rate]
+
+
+def _aggregate(items: Optional[Iterable[dict]]) -> dict[Decimal, list]:
+    """
+    Sečte položky po sazbě DPH.
+
+    Returns:
+        {sazba: [základ před slevou, sleva položek, základ po slevě, počet položek]}
+        v pořadí prvního výskytu sazby
+    """
+    groups: dict[Decimal, list] = {}
+    for item in (items or []):
+        _add_line(groups, item)
+    return groups
+
+
+def _vat_breakdown(groups: dict[Decimal, list]) -> dict[str, list[Decimal]]:
+    """Nezaokrouhlený rozpad DPH {klíč sazby: [základ, DPH]}."""
+    breakdown: dict[str, list[Decimal]] = {}
+    for vat_rate, group in groups.items():
+        base = group[2]
+        entry = breakdown.setdefault(rate_key(vat_rate), [ZERO, ZERO])
+        entry[0] += base
+        entry[1] += base * vat_rate / HUNDRED
+    return breakdown
+
+
+# =====================================================
+# DOPOČET DOKLADU
+# =====================================================
+def _finalize_deal(
+    groups: dict[Decimal, list],
+    discount=0,
+    discount_percent: bool = False,
+    rounding=0
+) -> dict:
+    """
+    Součty objednávky.
+
+    Subtotal je součet po slevách položek, sleva na objednávku (procentem
+    nebo částkou) se do rozpadu DPH promítne poměrně.
+    """
+    subtotal = sum((group[2] for group in groups.values()), ZERO)
+    breakdown = _vat_breakdown(groups)
+
+    discount = to_decimal(discount)
+    if discount_percent:
+        discount_amount = quantize(subtotal * discount / HUNDRED)
+    else:
+        discount_amount = quantize(discount)
+
+    subtotal_after_discount = quantize(subtotal - discount_amount)
+
+    # Přepočet DPH po slevě (proporcionálně)
+    if subtotal > 0:
+        for entry in breakdown.values():
+            entry[0] = entry[0] * subtotal_after_discount / subtotal
+            entry[1] = entry[1] * subtotal_after_discount / subtotal
+
+    vat_breakdown = {key: [quantize(base), quantize(vat)] for key, (base, vat) in breakdown.items()}
+    total_vat = quantize(sum((vat for _, vat in vat_breakdown.values()), ZERO))
+    total = quantize(subtotal_after_discount + total_vat + to_decimal(rounding))
+
+    return _as_floats(subtotal, discount_amount, subtotal_after_discount, vat_breakdown, total_vat, total)
+
+
+def _finalize_invoice(groups: dict[Decimal, list], with_vat: bool = True, rounding=0) -> dict:
+    """
+    Součty faktury.
+
+    Subtotal je před slevami položek, discount_amount je součet slev
+    položek. Bez DPH (VatMode.WITHOUT_VAT) je rozpad prázdný.
+    """
+    subtotal = sum((group[0] for group in groups.values()), ZERO)
+    discount_total = sum((group[1] for group in groups.values()), ZERO)
+    breakdown = _vat_breakdown(groups) if with_vat else {}
+
+    subtotal_after_discount = quantize(subtotal - discount_total)
+    vat_breakdown = {key: [quantize(base), quantize(vat)] for key, (base, vat) in breakdown.items()}
+    total_vat = quantize(sum((vat for _, vat in breakdown.values()), ZERO))
+    total = quantize(subtotal_after_discount + total_vat + to_decimal(rounding))
+
+    return _as_floats(subtotal, discount_total, subtotal_after_discount, vat_breakdown, total_vat, total)
+
+
+def _as_floats(subtotal, discount_amount, subtotal_after_discount, vat_breakdown, total_vat, total) -> dict:
+    """Výsledek ve tvaru sloupců modelu (Float + JSON vat_breakdown)."""
+    return {
+        'subtotal': float(quantize(subtotal)),
+        'discount_amount': float(quantize(discount_amount)),
+        'subtotal_after_discount': float(subtotal_after_discount),
+        'vat_breakdown': {key: {'base': float(base), 'vat': float(vat)} for key, (base, vat) in vat_breakdown.items()},
+        'total_vat': float(total_vat),
+        'total': float(total),
+    }
+
+
+# =====================================================
+# API
+# =====================================================
+def calculate_deal_totals(items: Optional[list], discount=0, discount_percent: bool = False, rounding=0) -> dict:
+    """
+    Vypočítá součty objednávky z položek.
+
+    Args:
+        items: Položky (quantity, unit_price, discount_percent, vat_rate)
+        discount: Sleva na celou objednávku
+        discount_percent: Sleva je v procentech (DiscountType.PERCENT), jinak částka
+        rounding: Zaokrouhlení přičtené k total
+
+    Returns:
+        dict se subtotal, discount_amount, subtotal_after_discount,
+        vat_breakdown, total_vat a total
+    """
+    return _finalize_deal(_aggregate(items), discount, discount_percent, rounding)
+
+
+def calculate_invoice_totals(items: Optional[list], with_vat: bool = True, rounding=0) -> dict:
+    """
+    Vypočítá součty faktury z položek.
+
+    Args:
+        items: Položky (quantity, unit_price, discount_percent, vat_rate)
+        with_vat: Faktura s DPH (VatMode.WITH_VAT)
+        rounding: Zaokrouhlení přičtené k total
+
+    Returns:
+        dict se subtotal, discount_amount, subtotal_after_discount,
+        vat_breakdown, total_vat a total
+    """
+    return _finalize_invoice(_aggregate(items), with_vat, rounding)
+
+
+_CALCULATORS = {DEAL: calculate_deal_totals, INVOICE: calculate_invoice_totals}
+_FINALIZERS = {DEAL: _finalize_deal, INVOICE: _finalize_invoice}
+
+
+def calculate_batch(documents: Sequence[dict], kind: str = DEAL) -> list[dict]:
+    """
+    Vypočítá součty mnoha dokladů najednou (importy, přecenění).
+
+    Args:
+        documents: Doklady jako dict s klíčem "items" a parametry odpovídající
+            funkce (deal: discount, discount_percent, rounding;
+            invoice: with_vat, rounding)
+        kind: DEAL nebo INVOICE
+
+    Returns:
+        Součty ve stejném pořadí jako documents, shodné s
+        calculate_deal_totals / calculate_invoice_totals
+    """
+    calculate = _CALCULATORS[kind]
+    results = _calculate_batch_numpy(documents, kind) if np is not None and documents else [None] * len(documents)
+    return [
+        result if result is not None else calculate(**document)
+        for document, result in zip(documents, results)
+    ]
+
+
+# =====================================================
+# PRŮBĚŽNÉ SOUČTY (úpravy jednotlivých položek)
+# =====================================================
+class RunningTotals:
+    """
+    Agregace dokladu po sazbách DPH, udržované při úpravách položek.
+
+    Přidání nebo odebrání položky je O(1), dopočet dokladu O(počet sazeb).
+    Součty jsou v Decimal přesné, takže se výsledek neodchyluje od výpočtu
+    ze všech položek. Stav se ukládá do JSON sloupce pricing_state:
+    {"lines": počet položek, "groups": {sazba: [základ, sleva, po slevě, počet]}}
+    """
+
+    def __init__(self, groups: Optional[dict[Decimal, list]] = None, lines: int = 0):
+        self.groups = groups if groups is not None else {}
+        self.lines = lines
+
+    @classmethod
+    def from_items(cls, items: Optional[list]) -> "RunningTotals":
+        return cls(_aggregate(items), len(items or []))
+
+    @classmethod
+    def load(cls, state: Optional[dict], items: Optional[list]) -> "RunningTotals":
+        """
+        Načte uložený stav. Chybějící nebo nesedící stav (doklady z doby před
+        pricing_state, položky změněné mimo recalculate_totals) se přepočítá z položek.
+        """
+        if not state or state.get("lines") != len(items or []):
+            return cls.from_items(items)
+        try:
+            groups = {
+                Decimal(rate): [Decimal(gross), Decimal(discount), Decimal(net), int(count)]
+                for rate, (gross, discount, net, count) in state["groups"].items()
+            }
+        except (KeyError, TypeError, ValueError, InvalidOperation):
+            logger.warning("Invalid pricing_state, recalculating from items")
+            return cls.from_items(items)
+        return cls(groups, state["lines"])
+
+    def dump(self) -> dict:
+        return {
+            "lines": self.lines,
+            "groups": {
+                str(rate): [str(gross), str(discount), str(net), count]
+                for rate, (gross, discount, net, count) in self.groups.items()
+            },
+        }
+
+    def add(self, item: dict) -> None:
+        _add_line(self.groups, item)
+        self.lines += 1
+
+    def remove(self, item: dict) -> None:
+        _add_line(self.groups, item, sign=-1)
+        self.lines -= 1
+
+    def totals(self, kind: str, **params) -> dict:
+        """Součty dokladu - params jako u calculate_deal_totals / calculate_invoice_totals."""
+        return _FINALIZERS[kind](self.groups, **params)
+
+
+def recalculate_document(document, running: Optional[RunningTotals] = None) -> None:
+    """
+    Nastaví součty dokladu (model s __pricing__ a pricing_input()) a uloží
+    průběžný stav do pricing_state.
+
+    Args:
+        document: Deal nebo Invoice
+        running: Průběžné součty po úpravě položek, jinak se spočítají ze všech položek
+    """
+    params = document.pricing_input()
+    items = params.pop("items")
+    running = running or RunningTotals.from_items(items)
+
+    for field, value in running.totals(document.__pricing__, **params).items():
+        setattr(document, field, value)
+    document.pricing_state = running.dump()
+
+
+# =====================================================
+# DÁVKOVÝ VÝPOČET (NumPy)
+# =====================================================
+# Celý výpočet běží v celých číslech (fixní řádová čárka, výsledky v haléřích):
+# množství na 3, cena na 4, procenta položek na 2, sleva dokladu a
+# zaokrouhlení na 4 desetinná místa. Řádky jsou v int64, součty skupin v
+# Python int (object pole), aby násobení při rozpadu DPH nepřeteklo.
+# Doklady s jinou přesností nebo příliš velkými částkami se spočítají
+# skalárně v Decimal.
+QUANTITY_EXP = 3
+PRICE_EXP = 4
+PERCENT_EXP = 2
+PARAM_EXP = 4
+
+_INT64_LIMIT = 2.0 ** 60
+
+
+def _scaled(values, exp: int):
+    """Hodnoty * 10^exp jako int64 a maska hodnot, které se tak dají vyjádřit přesně."""
+    scaled = np.asarray(values, dtype=np.float64) * 10.0 ** exp
+    rounded = np.rint(scaled)
+    exact = (np.abs(scaled - rounded) <= 1e-12 * np.maximum(1.0, np.abs(rounded))) & (np.abs(rounded) < _INT64_LIMIT)
+    return np.where(exact, rounded, 0).astype(np.int64), exact
+
+
+def _round_div(numerator, denominator):
+    """numerator / denominator zaokrouhlené ROUND_HALF_UP (od nuly), celočíselně po prvcích."""
+    magnitude = (np.abs(numerator) * 2 + denominator) // (denominator * 2)
+    return np.where(numerator < 0, -magnitude, magnitude)
+
+
+def _segment_sums(values, starts, size: int, positions):
+    """Součty souvislých úseků values zapsané na pozice positions pole délky size."""
+    sums = np.zeros(size, dtype=object)
+    sums[positions] = np.add.reduceat(values, starts).astype(object)
+    return sums
+
+
+def _calculate_batch_numpy(documents: Sequence[dict], kind: str) -> list[Optional[dict]]:
+    """
+    Součty dokladů vektorově.
+
+    Returns:
+        Výsledek pro každý doklad, None pro doklady ke skalárnímu výpočtu
+    """
+    count = len(documents)
+    lines = [
+        (position, item.get('quantity') or 0, item.get('unit_price') or 0,
+         item.get('discount_percent') or 0, item.get('vat_rate') or 0)
+        for position, document in enumerate(documents)
+        for item in (document.get("items") or [])
+    ]
+    lines = np.array(lines, dtype=np.float64).reshape(-1, 5)
+
+    doc_index = lines[:, 0].astype(np.int64)
+    quantity, quantity_ok = _scaled(lines[:, 1], QUANTITY_EXP)
+    price, price_ok = _scaled(lines[:, 2], PRICE_EXP)
+    discount, discount_ok = _scaled(lines[:, 3], PERCENT_EXP)
+    rate, rate_ok = _scaled(lines[:, 4], PERCENT_EXP)
+
+    rounding, params_ok = _scaled([document.get("rounding") or 0 for document in documents], PARAM_EXP)
+    if kind == DEAL:
+        doc_discount, doc_discount_ok = _scaled([document.get("discount") or 0 for document in documents], PARAM_EXP)
+        params_ok &= doc_discount_ok
+        discount_percent = np.array([bool(document.get("discount_percent")) for document in documents])
+    else:
+        with_vat = np.array([bool(document.get("with_vat", True)) for document in documents])
+
+    # Odhad velikosti ve floatu - doklady, které by v int64 přetekly, jdou do Decimal
+    magnitude = np.abs(lines[:, 1] * lines[:, 2]) * np.maximum(100.0, np.abs(lines[:, 3])) * 10.0 ** 9
+    doc_magnitude = np.bincount(doc_index, weights=magnitude, minlength=count)
+
+    fallback = ~params_ok | (doc_magnitude >= _INT64_LIMIT)
+    fallback[doc_index[~(quantity_ok & price_ok & discount_ok & rate_ok)]] = True
+    keep = ~fallback[doc_index]
+    doc_index, quantity, price, discount, rate = (array[keep] for array in (doc_index, quantity, price, discount, rate))
+    if not len(doc_index):
+        return [None] * count  # Nic k vektorovému výpočtu (doklady bez položek, fallback)
+
+    # Řádky: základ před slevou 10^-7, sleva a základ po slevě 10^-11,
+    # DPH 10^-15 (základ po slevě * sazba v setinách procenta / 100)
+    gross = quantity * price
+    line_discount = gross * discount
+    net = gross * (100 * 10 ** PERCENT_EXP - discount)
+    vat = net.astype(object) * rate.astype(object)
+
+    # Skupiny (doklad, klíč sazby) - klíč jako str(int(sazba)), tj. oříznutí k nule
+    keys = np.sign(rate) * (np.abs(rate) // 10 ** PERCENT_EXP)
+    key_values, key_ids = np.unique(keys, return_inverse=True)
+    group_key = doc_index * len(key_values) + key_ids.reshape(-1)
+    order = np.argsort(group_key, kind="stable")
+    sorted_keys = group_key[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+
+    group_doc = sorted_keys[starts] // len(key_values)
+    group_rate_key = key_values[sorted_keys[starts] % len(key_values)]
+    first_seen = order[starts]  # stabilní třídění => první řádek skupiny
+    group_net = np.add.reduceat(net[order], starts).astype(object)
+    group_vat = np.add.reduceat(vat[order], starts)
+
+    doc_starts = np.flatnonzero(np.r_[True, group_doc[1:] != group_doc[:-1]])
+    docs = group_doc[doc_starts]
+
+    doc_gross = _segment_sums(np.add.reduceat(gross[order], starts), doc_starts, count, docs)
+    doc_discount_sum = _segment_sums(np.add.reduceat(line_discount[order], starts), doc_starts, count, docs)
+    doc_net = _segment_sums(group_net, doc_starts, count, docs)
+    doc_vat = _segment_sums(group_vat, doc_starts, count, docs)
+    rounding = rounding.astype(object)
+
+    # Doklady (haléře)
+    if kind == DEAL:
+        subtotal = _round_div(doc_net, 10 ** 9)
+        doc_discount = doc_discount.astype(object)
+        discount_amount = np.where(
+            discount_percent,
+            _round_div(doc_net * doc_discount, 10 ** 15),
+            _round_div(doc_discount, 10 ** (PARAM_EXP - 2))
+        )
+        subtotal_after_discount = _round_div(doc_net - discount_amount * 10 ** 9, 10 ** 9)
+
+        # Sleva dokladu se do rozpadu promítne poměrně (jen při kladném subtotal)
+        positive = (doc_net > 0)[group_doc]
+        denominator = np.where(positive, doc_net[group_doc], 1)
+        group_after_discount = subtotal_after_discount[group_doc]
+        base = np.where(positive, _round_div(group_net * group_after_discount, denominator), _round_div(group_net, 10 ** 9))
+        group_vat_cents = np.where(
+            positive,
+            _round_div(group_vat * group_after_discount, denominator * 10 ** 4),
+            _round_div(group_vat, 10 ** 13)
+        )
+        total_vat = _segment_sums(group_vat_cents, doc_starts, count, docs)
+        breakdown_docs = np.ones(count, dtype=bool)
+    else:
+        subtotal = _round_div(doc_gross, 10 ** 5)
+        discount_amount = _round_div(doc_discount_sum, 10 ** 9)
+        subtotal_after_discount = _round_div(doc_net, 10 ** 9)
+        base = _round_div(group_net, 10 ** 9)
+        group_vat_cents = _round_div(group_vat, 10 ** 13)
+        total_vat = np.where(with_vat, _round_div(doc_vat, 10 ** 13), 0)
+        breakdown_docs = with_vat
+
+    total = _round_div(subtotal_after_discount * 100 + total_vat * 100 + rounding, 100)
+
+    # Výstup ve tvaru _as_floats, rozpad v pořadí prvního výskytu sazby
+    breakdowns = [{} for _ in range(count)]
+    group_doc_list, rate_key_list = group_doc.tolist(), group_rate_key.tolist()
+    base_list, vat_list = base.tolist(), group_vat_cents.tolist()
+    for group in np.lexsort((first_seen, group_doc)).tolist():
+        position = group_doc_list[group]
+        if breakdown_docs[position]:
+            breakdowns[position][str(rate_key_list[group])] = {'base': base_list[group] / 100, 'vat': vat_list[group] / 100}
+
+    columns = zip(
+        subtotal.tolist(), discount_amount.tolist(), subtotal_after_discount.tolist(),
+        total_vat.tolist(), total.tolist(), breakdowns, fallback.tolist()
+    )
+    return [
+        None if skip else {
+            'subtotal': values[0] / 100,
+            'discount_amount': values[1] / 100,
+            'subtotal_after_discount': values[2] / 100,
+            'vat_breakdown': breakdown,
+            'total_vat': values[3] / 100,
+            'total': values[4] / 100,
+        }
+        for *values, breakdown, skip in columns
+    ]
@@ -0,0 +1,229 @@
+# backend/core/services/sequences.py
+"""
+Přidělování čísel z číselných řad (DealSequence, InvoiceSequence).
+
+Číslo se přiděluje atomicky jedním `UPDATE ... SET last_number = last_number + n
+RETURNING ...` (databáze bez RETURNING: `SELECT ... FOR UPDATE` + UPDATE),
+takže souběžné requesty nikdy nedostanou stejné číslo. Chybějící řada se
+založí přes INSERT ... ON CONFLICT DO NOTHING.
+
+Dva režimy:
+- gapless (faktury): číslo se přidělí v transakci požadavku - při rollbacku
+  se vrátí i řada, čísla jdou bez mezer. Řádek řady zůstává zamčený do
+  commitu, vystavení faktur stejného typu se tedy řadí za sebou (zákonná
+  číselná řada to vyžaduje).
+- blokový (objednávky): worker si v samostatné krátké transakci rezervuje
+  blok čísel (settings.deal_number_block_size) a přiděluje z paměti.
+  Vytvoření objednávky na řádku řady nečeká, nevyužitá čísla bloku
+  (restart workeru, rollback) zůstanou jako mezery.
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update, insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.core.config import get_settings
+from backend.core.models.deal import DealSequence
+from backend.core.models.invocie import InvoiceSequence, InvoiceType
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DEAL_PREFIX = "OBJ"
+DEAL_FORMAT = "{prefix}{year}-{number:04d}"
+
+INVOICE_PREFIXES = {
+    InvoiceType.INVOICE: "FV",
+    InvoiceType.PROFORMA: "PF",
+    InvoiceType.CREDIT_NOTE: "D",
+    InvoiceType.DEBIT_NOTE: "V",
+    InvoiceType.RECEIPT: "P",
+}
+INVOICE_FORMAT = "{prefix}{year}{number:04d}"
+
+
+def format_number(format_pattern: str, prefix: str, year: int, number: int) -> str:
+    return format_pattern.format(prefix=prefix, year=year, number=number)
+
+
+# =====================================================
+# ATOMICKÉ PŘIDĚLENÍ
+# =====================================================
+def _ensure_sequence(conn: Connection, table, key: dict, defaults: dict) -> None:
+    """Založí řadu, pokud neexistuje (souběžné založení nevadí)."""
+    values = {**key, **defaults, "last_number": 0}
+    dialect = conn.dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        conn.execute(upsert(table).values(values).on_conflict_do_nothing())
+        return
+
+    try:
+        with conn.begin_nested():
+            conn.execute(insert(table).values(values))
+    except IntegrityError:
+        pass  # Řadu mezitím založil jiný request
+
+
+def _increment(conn: Connection, table, key: dict, count: int):
+    """
+    Posune řadu o `count` čísel.
+
+    Returns:
+        Řádek (last_number, prefix, year, format_pattern) po posunu nebo None
+    """
+    where = [table.c[column] == value for column, value in key.items()]
+    columns = (table.c.last_number, table.c.prefix, table.c.year, table.c.format_pattern)
+    statement = (
+        update(table)
+        .where(*where)
+        .values(last_number=table.c.last_number + count, updated_at=datetime.utcnow())
+    )
+
+    if conn.dialect.update_returning:
+        return conn.execute(statement.returning(*columns)).first()
+
+    # Bez RETURNING - zamkni řádek, posuň a dopočítej
+    row = conn.execute(select(*columns).where(*where).with_for_update()).first()
+    if row is None:
+        return None
+    conn.execute(statement)
+    return (row.last_number + count, row.prefix, row.year, row.format_pattern)
+
+
+def allocate(conn: Connection, model, key: dict, defaults: dict, count: int = 1) -> list[str]:
+    """
+    Přidělí `count` po sobě jdoucích čísel z řady v rámci transakce `conn`.
+
+    Args:
+        conn: Connection - čísla platí, až když se transakce commitne
+        model: DealSequence nebo InvoiceSequence
+        key: Identifikace řady (např. {"user_id": ..., "year": ...})
+        defaults: Hodnoty pro založení nové řady (prefix, format_pattern)
+        count: Počet čísel
+
+    Returns:
+        Naformátovaná čísla ve vzestupném pořadí
+    """
+    table = model.__table__
+    row = _increment(conn, table, key, count)
+    if row is None:
+        _ensure_sequence(conn, table, key, defaults)
+        row = _increment(conn, table, key, count)
+
+    last_number, prefix, year, format_pattern = row
+    format_pattern = format_pattern or defaults["format_pattern"]
+    first = last_number - count + 1
+    return [format_number(format_pattern, prefix, year, n) for n in range(first, last_number + 1)]
+
+
+# =====================================================
+# BLOKOVÁ REZERVACE
+# =====================================================
+class BlockAllocator:
+    """Bloky čísel rezervované tímto workerem, podle řady."""
+
+    def __init__(self):
+        self._blocks: dict[tuple, list[str]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, engine: Engine, model, key: dict, defaults: dict, count: int, block_size: int) -> list[str]:
+        """Vydá `count` čísel z bloku, chybějící dorezervuje v samostatné transakci."""
+        block_key = (model.__tablename__, tuple(sorted(key.items())))
+        with self._lock:
+            block = self._blocks.setdefault(block_key, [])
+            if len(block) < count:
+                with engine.begin() as conn:
+                    block.extend(allocate(conn, model, key, defaults, max(block_size, count - len(block))))
+            numbers, block[:count] = block[:count], []
+            return numbers
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+
+
+_deal_blocks = BlockAllocator()
+
+
+def _own_transaction_engine(db: Session) -> Optional[Engine]:
+    """
+    Engine pro rezervaci bloku v samostatné transakci, nebo None.
+
+    SQLite má jediného zapisovatele - pokud už transakce požadavku zapisovala,
+    druhé spojení by čekalo na její commit. Pak se přiděluje v transakci
+    požadavku (bez bloku).
+    """
+    bind = db.get_bind()
+    if not isinstance(bind, Engine):
+        return None
+    if bind.dialect.name == "sqlite":
+        driver_connection = db.connection().connection.driver_connection
+        if getattr(driver_connection, "in_transaction", False):
+            return None
+    return bind
+
+
+# =====================================================
+# API PRO ROUTERY
+# =====================================================
+def next_deal_numbers(db: Session, user_id: str, count: int = 1) -> list[str]:
+    """
+    Přidělí čísla objednávek uživatele (blokový režim, mezery jsou přípustné).
+    """
+    key = {"user_id": user_id, "year": datetime.utcnow().year}
+    defaults = {"prefix": DEAL_PREFIX, "format_pattern": DEAL_FORMAT}
+
+    block_size = settings.deal_number_block_size
+    engine = _own_transaction_engine(db) if block_size > 1 else None
+    if engine is None:
+        return allocate(db.connection(), DealSequence, key, defaults, count)
+    return _deal_blocks.take(engine, DealSequence, key, defaults, count, block_size)
+
+
+def next_deal_number(db: Session, user_id: str) -> str:
+    """Přidělí další číslo objednávky."""
+    return next_deal_numbers(db, user_id)[0]
+
+
+def next_invoice_numbers(db: Session, invoice_type: InvoiceType, count: int = 1) -> list[str]:
+    """
+    Přidělí souvislý blok čísel faktur (gapless - v transakci požadavku).
+    """
+    key = {"invoice_type": invoice_type, "year": datetime.utcnow().year}
+    defaults = {"prefix": INVOICE_PREFIXES.get(invoice_type, "FV"), "format_pattern": INVOICE_FORMAT}
+    return allocate(db.connection(), InvoiceSequence, key, defaults, count)
+
+
+def next_invoice_number(db: Session, invoice_type: InvoiceType) -> str:
+    """Přidělí další číslo faktury."""
+    return next_invoice_numbers(db, invoice_type)[0]
+
+
+def variable_symbol_for(invoice_number: str) -> str:
+    """Výchozí variabilní symbol - číslo faktury bez oddělovačů (max 10 číslic)."""
+    return invoice_number.replace("-", "").replace("/", "")[-10:]
+
+
+def preview_invoice_number(db: Session, invoice_type: InvoiceType) -> str:
+    """Číslo, které dostane příští faktura (jen náhled, nic nerezervuje)."""
+    year = datetime.utcnow().year
+    sequence = db.query(InvoiceSequence).filter(
+        InvoiceSequence.invoice_type == invoice_type,
+        InvoiceSequence.year == year
+    ).first()
+
+    if not sequence:
+        return format_number(INVOICE_FORMAT, INVOICE_PREFIXES.get(invoice_type, "FV"), year, 1)
+    return format_number(
+        sequence.format_pattern or INVOICE_FORMAT, sequence.prefix, sequence.year, sequence.last_number + 1
+    )
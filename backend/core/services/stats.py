@@ -0,0 +1,505 @@
+# backend/core/services/stats.py
+"""
+Agregované statistiky dealů a leadů.
+
+- Souhrnné tabulky `deal_stats` / `lead_stats` po (uživatel, stav, měna)
+  se udržují průběžně ve stejné transakci jako zápis (Session after_flush),
+  dashboard pak čte jen pár řádků bez ohledu na objem dat.
+- Dotazy, které ze souhrnu spočítat nejdou (filtr podle data, seskupení
+  podle měsíce / přiřazeného uživatele), se počítají jedním GROUP BY
+  dotazem nad indexy idx_deal_stats / idx_lead_stats.
+
+Hromadné operace přes Core ORM eventy obchází, proto musí zavolat
+`refresh_deal_stats` / `refresh_lead_stats` samy. Úplné přepočítání
+(reconciliation) dělá `reconcile_stats`:
+    python -m backend.core.services.stats
+"""
+import logging
+from datetime import date
+from typing import Iterable, Optional
+
+from sqlalchemy import event, func, inspect, select, delete, insert, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from backend.core.models.deal import Deal
+from backend.core.models.lead import Lead, LeadStatus
+from backend.core.models.stats import DealStatsSummary, LeadStatsSummary
+from backend.core.schemas.utils import StatsGroupBy
+
+logger = logging.getLogger(__name__)
+
+# Souhrnné tabulky jsou připravené a synchronizované (init_stats)
+_materialized = False
+
+
+def month_key(db: Session, column):
+    """Výraz 'YYYY-MM' pro sloupec s datem podle dialektu databáze."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    if dialect in ("mysql", "mariadb"):
+        return func.date_format(column, "%Y-%m")
+    return func.strftime("%Y-%m", column)
+
+
+def _group_column(db: Session, model, group_by: Optional[StatsGroupBy], month_column):
+    if group_by is None:
+        return None
+    if group_by == StatsGroupBy.MONTH:
+        return month_key(db, month_column)
+    if group_by == StatsGroupBy.CURRENCY:
+        return model.currency
+    return model.assigned_to
+
+
+def _grouped(rows, grouped: bool) -> tuple[list, dict]:
+    """Rozdělí agregované řádky na celkové a po skupinách (klíč skupiny je první sloupec)."""
+    if not grouped:
+        return rows, {}
+
+    groups: dict = {}
+    for row in rows:
+        groups.setdefault(row[0], []).append(row[1:])
+    return [row[1:] for row in rows], groups
+
+
+def _sorted_groups(groups: dict, summarize) -> list[dict]:
+    # Skupina bez hodnoty (např. nepřiřazené) na konec
+    keys = sorted(groups, key=lambda key: (key is None, str(key)))
+    return [{"key": key, **summarize(groups[key])} for key in keys]
+
+
+# =====================================================
+# SOUHRNNÉ TABULKY - SYNCHRONIZACE
+# =====================================================
+class _Summary:
+    """Popis souhrnu jednoho modelu."""
+
+    def __init__(self, model, table, attributes, contribution, aggregates):
+        self.model = model
+        self.table = table.__table__
+        self.attributes = attributes      # Sloupce, které ovlivňují souhrn
+        self.contribution = contribution  # hodnoty -> (klíč, příspěvek) nebo None
+        self.aggregates = aggregates      # Výrazy pro přepočet z tabulky (stejné pořadí jako příspěvek)
+
+
+def _deal_contribution(values: dict):
+    if not values["is_active"]:
+        return None
+    key = (values["user_id"], values["status"], values["currency"])
+    return key, (1, values["total"] or 0, values["paid_amount"] or 0)
+
+
+def _lead_contribution(values: dict):
+    if not values["is_active"]:
+        return None
+    value = values["value"] or 0
+    probability = values["probability"] or 0
+    key = (values["user_id"], values["status"], values["currency"] or "")
+    return key, (1, value, value * probability / 100, probability)
+
+
+_SUMMARIES = {
+    Deal: _Summary(
+        Deal, DealStatsSummary,
+        ("user_id", "status", "currency", "is_active", "total", "paid_amount"),
+        _deal_contribution,
+        (func.count(), func.coalesce(func.sum(Deal.total), 0.0), func.coalesce(func.sum(Deal.paid_amount), 0.0)),
+    ),
+    Lead: _Summary(
+        Lead, LeadStatsSummary,
+        ("user_id", "status", "currency", "is_active", "value", "probability"),
+        _lead_contribution,
+        (
+            func.count(),
+            func.coalesce(func.sum(Lead.value), 0.0),
+            func.coalesce(func.sum(func.coalesce(Lead.value, 0.0) * func.coalesce(Lead.probability, 0)), 0.0) / 100.0,
+            func.coalesce(func.sum(Lead.probability), 0),
+        ),
+    ),
+}
+
+_KEY_COLUMNS = ("user_id", "status", "currency")
+
+
+def _values_columns(summary: _Summary) -> list[str]:
+    return [c.name for c in summary.table.columns if c.name not in _KEY_COLUMNS]
+
+
+def _old_values(obj, attributes) -> dict:
+    """Hodnoty sloupců před flushem (z historie atributů)."""
+    state = inspect(obj)
+    values = {}
+    for attribute in attributes:
+        history = state.attrs[attribute].history
+        if history.deleted:
+            values[attribute] = history.deleted[0]
+        elif history.added:
+            values[attribute] = None  # Předchozí hodnota byla None
+        else:
+            values[attribute] = getattr(obj, attribute)
+    return values
+
+
+def _apply_deltas(conn: Connection, summary: _Summary, deltas: dict) -> None:
+    """Přičte rozdíly do souhrnné tabulky (upsert)."""
+    columns = _values_columns(summary)
+    table = summary.table
+    rows = [
+        {**dict(zip(_KEY_COLUMNS, key)), **dict(zip(columns, delta))}
+        for key, delta in deltas.items()
+        if any(delta)
+    ]
+    if not rows:
+        return
+
+    dialect = conn.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        statement = upsert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(_KEY_COLUMNS),
+            set_={column: table.c[column] + statement.excluded[column] for column in columns}
+        )
+        conn.execute(statement, rows)
+        return
+
+    # Ostatní databáze - UPDATE, a pokud řádek neexistuje, INSERT
+    for row in rows:
+        result = conn.execute(
+            update(table)
+            .where(*[table.c[k] == row[k] for k in _KEY_COLUMNS])
+            .values({column: table.c[column] + row[column] for column in columns})
+        )
+        if result.rowcount == 0:
+            conn.execute(insert(table).values(row))
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    """Promítne změny dealů a leadů do souhrnných tabulek (stejná transakce)."""
+    deltas: dict = {}
+
+    def add(summary, contribution, sign):
+        if contribution is None:
+            return
+        key, values = contribution
+        per_model = deltas.setdefault(summary, {})
+        current = per_model.get(key, (0,) * len(values))
+        per_model[key] = tuple(c + sign * v for c, v in zip(current, values))
+
+    for obj in session.new:
+        summary = _SUMMARIES.get(type(obj))
+        if summary:
+            add(summary, summary.contribution({a: getattr(obj, a) for a in summary.attributes}), 1)
+
+    for obj in session.dirty:
+        summary = _SUMMARIES.get(type(obj))
+        if not summary:
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[a].history.has_changes() for a in summary.attributes):
+            continue
+        add(summary, summary.contribution(_old_values(obj, summary.attributes)), -1)
+        add(summary, summary.contribution({a: getattr(obj, a) for a in summary.attributes}), 1)
+
+    for obj in session.deleted:
+        summary = _SUMMARIES.get(type(obj))
+        if summary:
+            add(summary, summary.contribution(_old_values(obj, summary.attributes)), -1)
+
+    if deltas:
+        conn = session.connection()
+        for summary, per_model in deltas.items():
+            _apply_deltas(conn, summary, per_model)
+
+
+def _track_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+def register_stats_events() -> None:
+    """Zaregistruje eventy pro průběžnou aktualizaci souhrnů."""
+    if event.contains(Session, "after_flush", _after_flush):
+        return
+    for summary in _SUMMARIES.values():
+        for attribute in summary.attributes:
+            # active_history - při změně se načte i původní hodnota (pro odečtení ze souhrnu)
+            event.listen(
+                getattr(summary.model, attribute), "set", _track_old_value,
+                active_history=True, retval=True
+            )
+    event.listen(Session, "after_flush", _after_flush)
+
+
+# =====================================================
+# SOUHRNNÉ TABULKY - PŘEPOČET
+# =====================================================
+def _rebuild(conn: Connection, summary: _Summary, user_ids: Optional[Iterable[str]] = None) -> None:
+    model = summary.model
+    table = summary.table
+    currency = func.coalesce(model.currency, "") if model is Lead else model.currency
+
+    clear = delete(table)
+    source = (
+        select(model.user_id, model.status, currency, *summary.aggregates)
+        .where(model.is_active == True)
+        .group_by(model.user_id, model.status, currency)
+    )
+    if user_ids is not None:
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return
+        clear = clear.where(table.c.user_id.in_(user_ids))
+        source = source.where(model.user_id.in_(user_ids))
+
+    conn.execute(clear)
+    conn.execute(insert(table).from_select([c.name for c in table.columns], source))
+
+
+def refresh_deal_stats(conn: Connection, user_ids: Iterable[str]) -> None:
+    """Přepočítá souhrn dealů vybraných uživatelů (po hromadných operacích přes Core)."""
+    _rebuild(conn, _SUMMARIES[Deal], user_ids)
+
+
+def refresh_lead_stats(conn: Connection, user_ids: Iterable[str]) -> None:
+    """Přepočítá souhrn leadů vybraných uživatelů (po hromadných operacích přes Core)."""
+    _rebuild(conn, _SUMMARIES[Lead], user_ids)
+
+
+def shift_deal_stats(conn: Connection, deltas: dict) -> None:
+    """
+    Přičte rozdíly do souhrnu dealů - pro změny přes Core, které znají
+    původní hodnoty (levnější než refresh_deal_stats celého uživatele).
+
+    Args:
+        deltas: (user_id, status, currency) -> (počet, total, paid_amount)
+    """
+    _apply_deltas(conn, _SUMMARIES[Deal], deltas)
+
+
+def _snapshot(conn: Connection, summary: _Summary) -> dict:
+    table = summary.table
+    columns = _values_columns(summary)
+    return {
+        tuple(row[k] for k in _KEY_COLUMNS): tuple(round(row[c], 2) for c in columns)
+        for row in conn.execute(select(table).where(table.c.count != 0)).mappings()
+    }
+
+
+def reconcile_stats(engine: Engine) -> dict[str, int]:
+    """
+    Přepočítá souhrnné tabulky z dealů a leadů.
+
+    Returns:
+        Počet řádků souhrnu, které se lišily, pro každou tabulku
+    """
+    drift = {}
+    with engine.begin() as conn:
+        for summary in _SUMMARIES.values():
+            before = _snapshot(conn, summary)
+            _rebuild(conn, summary)
+            after = _snapshot(conn, summary)
+            changed = sum(1 for key in before.keys() | after.keys() if before.get(key) != after.get(key))
+            drift[summary.table.name] = changed
+            if changed:
+                logger.warning(f"Stats table {summary.table.name}: {changed} rows corrected")
+    return drift
+
+
+def init_stats(engine: Engine) -> None:
+    """
+    Zaregistruje eventy a naplní prázdné souhrnné tabulky.
+    Volá se při startu aplikace.
+    """
+    global _materialized
+
+    register_stats_events()
+
+    with engine.begin() as conn:
+        for summary in _SUMMARIES.values():
+            has_summary = conn.execute(select(summary.table.c.user_id).limit(1)).first()
+            has_rows = conn.execute(select(summary.model.id).limit(1)).first()
+            if has_rows and not has_summary:
+                logger.info(f"Building stats table {summary.table.name}")
+                _rebuild(conn, summary)
+
+    _materialized = True
+
+
+def _summary_rows(db: Session, summary: _Summary, by_currency: bool, user_id: Optional[str] = None) -> list:
+    """Řádky souhrnu ve tvaru živého GROUP BY dotazu ((měna,) stav, agregace...)."""
+    table = summary.table
+    columns = [table.c[c] for c in _values_columns(summary)]
+    query = select(table.c.currency, table.c.status, *columns) if by_currency else select(table.c.status, *columns)
+    query = query.where(table.c.count != 0)
+    if user_id is not None:
+        query = query.where(table.c.user_id == user_id)
+
+    rows = db.execute(query).all()
+    if by_currency:
+        # Leady bez měny mají v souhrnu "" - navenek None
+        return [(row[0] or None, *row[1:]) for row in rows]
+    return rows
+
+
+# =====================================================
+# DEALY
+# =====================================================
+def _summarize_deals(rows) -> dict:
+    by_status = {}
+    total_count = 0
+    total_value = 0.0
+    paid_value = 0.0
+
+    for deal_status, count, total, paid in rows:
+        status_key = deal_status.value if deal_status else "unknown"
+        by_status[status_key] = by_status.get(status_key, 0) + count
+        total_count += count
+        total_value += total or 0
+        paid_value += paid or 0
+
+    return {
+        "total_count": total_count,
+        "by_status": by_status,
+        "total_value": round(total_value, 2),
+        "paid_value": round(paid_value, 2),
+        "unpaid_value": round(total_value - paid_value, 2),
+        "avg_deal_value": round(total_value / total_count, 2) if total_count else 0,
+    }
+
+
+def deal_stats(
+    db: Session,
+    user_id: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    group_by: Optional[StatsGroupBy] = None
+) -> dict:
+    """
+    Statistiky aktivních dealů uživatele.
+
+    Args:
+        db: Databázová session
+        user_id: Vlastník dealů
+        date_from, date_to: Filtr podle data uzavření
+        group_by: Volitelné seskupení (měsíc uzavření / měna / přiřazený uživatel)
+
+    Returns:
+        Data pro DealStats
+    """
+    if _materialized and not (date_from or date_to) and group_by in (None, StatsGroupBy.CURRENCY):
+        by_currency = group_by == StatsGroupBy.CURRENCY
+        rows, groups = _grouped(_summary_rows(db, _SUMMARIES[Deal], by_currency, user_id), by_currency)
+        result = _summarize_deals(rows)
+        if by_currency:
+            result["groups"] = _sorted_groups(groups, _summarize_deals)
+        return result
+
+    group = _group_column(db, Deal, group_by, func.coalesce(Deal.deal_date, Deal.created_at))
+    columns = [Deal.status, func.count(), func.sum(Deal.total), func.sum(Deal.paid_amount)]
+    group_columns = [Deal.status]
+    if group is not None:
+        columns.insert(0, group.label("group_key"))
+        group_columns.insert(0, group)
+
+    query = db.query(*columns).filter(
+        Deal.user_id == user_id,
+        Deal.is_active == True
+    )
+    if date_from:
+        query = query.filter(Deal.deal_date >= date_from)
+    if date_to:
+        query = query.filter(Deal.deal_date <= date_to)
+
+    rows, groups = _grouped(query.group_by(*group_columns).all(), group is not None)
+    result = _summarize_deals(rows)
+    if group is not None:
+        result["groups"] = _sorted_groups(groups, _summarize_deals)
+    return result
+
+
+# =====================================================
+# LEADY
+# =====================================================
+def _summarize_leads(rows) -> dict:
+    by_status = {}
+    total = 0
+    total_value = 0.0
+    weighted_value = 0.0
+    total_prob = 0
+    won_count = 0
+
+    for lead_status, count, value, weighted, probability in rows:
+        status_key = lead_status.value if hasattr(lead_status, "value") else str(lead_status)
+        by_status[status_key] = by_status.get(status_key, 0) + count
+        total += count
+        total_value += value or 0
+        weighted_value += weighted or 0
+        total_prob += probability or 0
+        if lead_status == LeadStatus.WON:
+            won_count += count
+
+    return {
+        "total": total,
+        "by_status": by_status,
+        "total_value": round(total_value, 2),
+        "weighted_value": round(weighted_value, 2),
+        "avg_probability": round(total_prob / total, 2) if total > 0 else 0,
+        "conversion_rate": round((won_count / total) * 100, 2) if total > 0 else 0,
+    }
+
+
+def lead_stats(db: Session, group_by: Optional[StatsGroupBy] = None) -> dict:
+    """
+    Statistiky aktivních leadů.
+
+    Args:
+        db: Databázová session
+        group_by: Volitelné seskupení (měsíc vytvoření / měna / přiřazený uživatel)
+
+    Returns:
+        Data pro LeadStats
+    """
+    if _materialized and group_by in (None, StatsGroupBy.CURRENCY):
+        by_currency = group_by == StatsGroupBy.CURRENCY
+        rows, groups = _grouped(_summary_rows(db, _SUMMARIES[Lead], by_currency), by_currency)
+        result = _summarize_leads(rows)
+        if by_currency:
+            result["groups"] = _sorted_groups(groups, _summarize_leads)
+        return result
+
+    value = func.coalesce(Lead.value, 0.0)
+    probability = func.coalesce(Lead.probability, 0)
+
+    group = _group_column(db, Lead, group_by, Lead.created_at)
+    columns = [
+        Lead.status,
+        func.count(),
+        func.sum(value),
+        func.sum(value * probability) / 100.0,
+        func.sum(probability),
+    ]
+    group_columns = [Lead.status]
+    if group is not None:
+        columns.insert(0, group.label("group_key"))
+        group_columns.insert(0, group)
+
+    query = db.query(*columns).filter(Lead.is_active == True)
+
+    rows, groups = _grouped(query.group_by(*group_columns).all(), group is not None)
+    result = _summarize_leads(rows)
+    if group is not None:
+        result["groups"] = _sorted_groups(groups, _summarize_leads)
+    return result
+
+
+if __name__ == "__main__":
+    # Reconciliation souhrnných tabulek: python -m backend.core.services.stats
+    from backend.core.db import engine
+
+    for table, changed in reconcile_stats(engine).items():
+        print(f"{table}: {changed} rows corrected")
@@ -0,0 +1,238 @@
+# backend/core/utils/document_items.py
+"""
+Řádkový index položek dokladů (tabulka `document_items`).
+
+Položky objednávek a faktur jsou JSON sloupec `items` - dotaz typu "kolik
+jsme prodali produktu X za kvartál" by musel načíst a projít všechny
+doklady. Proto se položky při zápisu rozloží do tabulky `document_items`
+(ORM eventy after_insert/update/delete) a reporty jsou indexované GROUP BY
+(viz backend/core/services/analytics.py).
+
+Model se do indexu přihlásí atributem `__document_items__` - mapováním
+hlavičkových údajů na své sloupce:
+
+    __document_items__ = {
+        "document_date": "issue_date",
+        "owner_id": "created_by",
+        "company_id": "customer_id",
+    }
+
+Dobropisy (document_subtype v NEGATIVE_SUBTYPES) mají v dokladu kladné
+množství i ceny - do indexu se zapisují se záporným množstvím, základem
+a DPH, aby je reporty od prodejů odečetly.
+
+Hromadné operace přes Core ORM eventy obchází, proto musí zavolat
+`sync_rows` / `remove_rows` / `update_header` samy.
+"""
+import logging
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import event, inspect, select, delete, insert, update
+from sqlalchemy.engine import Connection, Engine
+
+from backend.core.models.document_item import DocumentItem
+from backend.core.models.utils import VatMode
+from backend.core.services.pricing import DEAL, HUNDRED, line_amounts, quantize, to_decimal
+
+logger = logging.getLogger(__name__)
+
+# Sloupce, které mají všechny indexované doklady
+COMMON_COLUMNS = ("id", "items", "status", "currency", "is_active", "created_at", "subtotal", "subtotal_after_discount")
+
+# Typy dokladů, jejichž položky snižují prodeje (dobropis)
+NEGATIVE_SUBTYPES = ("credit_note",)
+
+
+def get_indexed_models(base) -> list[type]:
+    """Vrátí modely s `__document_items__`."""
+    return [
+        mapper.class_ for mapper in base.registry.mappers
+        if getattr(mapper.class_, "__document_items__", None)
+    ]
+
+
+def source_columns(model) -> list[str]:
+    """Sloupce dokladu, ze kterých se řádky indexu počítají."""
+    return list(COMMON_COLUMNS) + [c for c in model.__document_items__.values() if c not in COMMON_COLUMNS]
+
+
+def _value(value):
+    """Enum -> hodnota (sloupce indexu jsou obyčejné stringy)."""
+    return getattr(value, "value", value)
+
+
+# =====================================================
+# SYNCHRONIZACE
+# =====================================================
+def _rows_for(model, get) -> list[dict]:
+    mapping = model.__document_items__
+    header = {field: get(column) for field, column in mapping.items()}
+
+    document_date = header.get("document_date")
+    if document_date is None and get("created_at") is not None:
+        document_date = get("created_at").date()
+
+    with_vat = "vat_mode" not in header or header["vat_mode"] == VatMode.WITH_VAT
+    sign = -1 if _value(header.get("document_subtype")) in NEGATIVE_SUBTYPES else 1
+
+    # Sleva na celou objednávku se do řádků promítne poměrně (stejně jako do rozpadu DPH)
+    ratio = Decimal(1)
+    if getattr(model, "__pricing__", None) == DEAL and get("subtotal"):
+        subtotal = to_decimal(get("subtotal"))
+        if subtotal > 0:
+            ratio = to_decimal(get("subtotal_after_discount")) / subtotal
+
+    base = {
+        "document_type": model.__tablename__,
+        "document_id": get("id"),
+        "document_subtype": _value(header.get("document_subtype")),
+        "status": _value(get("status")),
+        "owner_id": header.get("owner_id"),
+        "company_id": header.get("company_id"),
+        "document_date": document_date,
+        "currency": get("currency"),
+        "is_active": bool(get("is_active")),
+    }
+
+    rows = []
+    for position, item in enumerate(get("items") or []):
+        try:
+            vat_rate, item_subtotal, item_discount = line_amounts(item)
+            quantity = to_decimal(item.get("quantity"))
+            unit_price = to_decimal(item.get("unit_price"))
+        except (AttributeError, ValueError):
+            logger.warning(f"Skipping invalid item {position} of {model.__tablename__}:{get('id')}")
+            continue
+
+        net = (item_subtotal - item_discount) * ratio * sign
+        rows.append({
+            **base,
+            "position": position,
+            "product_id": item.get("product_id"),
+            "code": (item.get("code") or item.get("sku") or None),
+            "name": (item.get("name") or "")[:255],
+            "quantity": float(quantity * sign),
+            "unit": item.get("unit"),
+            "unit_price": float(unit_price),
+            "net_amount": float(quantize(net)),
+            "vat_rate": float(vat_rate),
+            "vat_amount": float(quantize(net * vat_rate / HUNDRED)) if with_vat else 0.0,
+        })
+    return rows
+
+
+def remove_rows(conn: Connection, model, ids: Iterable[int]) -> None:
+    """Odstraní položky dokladů z indexu."""
+    ids = list(ids)
+    if not ids:
+        return
+    conn.execute(delete(DocumentItem).where(
+        DocumentItem.document_type == model.__tablename__,
+        DocumentItem.document_id.in_(ids)
+    ))
+
+
+def update_header(conn: Connection, model, ids: Iterable[int], **values) -> None:
+    """
+    Přepíše hlavičkové údaje (status, is_active, ...) u položek dokladů.
+    Pro hromadné změny stavu - položky se nemusí počítat znovu.
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    conn.execute(
+        update(DocumentItem)
+        .where(DocumentItem.document_type == model.__tablename__, DocumentItem.document_id.in_(ids))
+        .values({column: _value(value) for column, value in values.items()})
+        .execution_options(synchronize_session=False)
+    )
+
+
+def sync_rows(conn: Connection, model, rows: Iterable, replace: bool = True) -> None:
+    """
+    Zapíše položky dokladů do indexu.
+
+    Args:
+        conn: Connection v rámci probíhající transakce
+        model: Model s `__document_items__`
+        rows: ORM objekty nebo mapování se sloupci podle source_columns(model)
+        replace: Nejdřív smazat stávající řádky (False pro nové doklady)
+    """
+    item_rows, ids = [], []
+    for row in rows:
+        get = row.get if hasattr(row, "get") else lambda key, r=row: getattr(r, key)
+        ids.append(get("id"))
+        item_rows.extend(_rows_for(model, get))
+
+    if replace:
+        remove_rows(conn, model, ids)
+    if item_rows:
+        conn.execute(insert(DocumentItem), item_rows)
+
+
+def _after_insert(mapper, connection, target):
+    sync_rows(connection, type(target), [target], replace=False)
+
+
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[column].history.has_changes() for column in source_columns(type(target))):
+        sync_rows(connection, type(target), [target])
+
+
+def _after_delete(mapper, connection, target):
+    remove_rows(connection, type(target), [target.id])
+
+
+def register_document_items_events(base) -> None:
+    """Zaregistruje ORM eventy pro všechny modely s `__document_items__`."""
+    for model in get_indexed_models(base):
+        if not event.contains(model, "after_insert", _after_insert):
+            event.listen(model, "after_insert", _after_insert)
+            event.listen(model, "after_update", _after_update)
+            event.listen(model, "after_delete", _after_delete)
+
+
+def rebuild(conn: Connection, model) -> None:
+    """Přestaví index pro všechny doklady modelu."""
+    conn.execute(delete(DocumentItem).where(DocumentItem.document_type == model.__tablename__))
+    table = model.__table__
+    result = conn.execution_options(yield_per=1000).execute(
+        select(*(table.c[column] for column in source_columns(model)))
+    )
+    for partition in result.mappings().partitions():
+        sync_rows(conn, model, partition, replace=False)
+
+
+def _has_positive_credit_notes(conn: Connection, model) -> bool:
+    """Index z doby, kdy se dobropisy zapisovaly kladně - nutný přepočet."""
+    return conn.execute(
+        select(DocumentItem.id).where(
+            DocumentItem.document_type == model.__tablename__,
+            DocumentItem.document_subtype.in_(NEGATIVE_SUBTYPES),
+            DocumentItem.quantity > 0
+        ).limit(1)
+    ).first() is not None
+
+
+def init_document_items(engine: Engine, base) -> None:
+    """
+    Zaregistruje eventy a při prvním nasazení naplní index z existujících dokladů.
+    Volá se při startu aplikace.
+    """
+    register_document_items_events(base)
+
+    with engine.begin() as conn:
+        for model in get_indexed_models(base):
+            indexed = conn.execute(
+                select(DocumentItem.id).where(DocumentItem.document_type == model.__tablename__).limit(1)
+            ).first()
+            has_documents = conn.execute(select(model.__table__.c.id).limit(1)).first()
+            if indexed and not _has_positive_credit_notes(conn, model):
+                continue
+            if not has_documents:
+                continue
+
+            logger.info(f"Building document items index for {model.__tablename__}")
+            rebuild(conn, model)
@@ -0,0 +1,269 @@
+# backend/core/utils/entity_index.py
+"""
+Index štítků (`tags`) a deklarovaných custom fields.
+
+JSON sloupce `tags` a `custom_fields` nejdou rozumně indexovat, proto se
+jejich obsah při zápisu rozloží do tabulek `entity_tags` a
+`entity_field_values` (ORM eventy after_insert/update/delete).
+Filtr `?tag=a&tag=b` je pak jen index lookup.
+
+Model se do indexu přihlásí atributem `__entity_index__ = True`.
+Filtrovatelné custom fields se deklarují v settings.indexed_custom_fields.
+
+Hromadné operace přes Core ORM eventy obchází, proto musí zavolat
+`sync_rows` / `remove_rows` samy.
+"""
+import logging
+from typing import Any, Iterable, Type, TypeVar, Union, List
+
+from sqlalchemy import event, inspect, select, delete, insert, func
+from sqlalchemy.engine import Connection, Engine
+
+from backend.core.config import get_settings
+from backend.core.models.entity_index import EntityTag, EntityFieldValue
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TAG_PARAM = "tag"
+TAG_MODE_PARAM = "tag_mode"
+CUSTOM_FIELD_PREFIX = "cf_"
+
+
+def get_indexed_models(base) -> list[type]:
+    """Vrátí modely s `__entity_index__ = True`."""
+    return [
+        mapper.class_ for mapper in base.registry.mappers
+        if getattr(mapper.class_, "__entity_index__", False)
+    ]
+
+
+def is_indexed(model) -> bool:
+    return getattr(model, "__entity_index__", False)
+
+
+def indexed_fields(model) -> list[str]:
+    """Custom fields modelu, podle kterých jde filtrovat."""
+    return settings.indexed_custom_fields.get(model.__tablename__, [])
+
+
+def normalize_tag(tag) -> str:
+    return str(tag).strip().lower()[:100]
+
+
+def normalize_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)[:255]
+
+
+# =====================================================
+# SYNCHRONIZACE
+# =====================================================
+def _rows_for(model, entity_id: int, tags, custom_fields) -> tuple[list[dict], list[dict]]:
+    entity_type = model.__tablename__
+
+    tag_rows = [
+        {"entity_type": entity_type, "entity_id": entity_id, "tag": tag}
+        for tag in {normalize_tag(t) for t in (tags or []) if t is not None and str(t).strip()}
+    ]
+
+    field_rows = []
+    for field in indexed_fields(model):
+        value = (custom_fields or {}).get(field)
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            if item is not None and item != "":
+                field_rows.append({
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "field": field,
+                    "value": normalize_value(item),
+                })
+
+    return tag_rows, field_rows
+
+
+def remove_rows(conn: Connection, model, ids: Iterable[int]) -> None:
+    """Odstraní záznamy entit z indexu."""
+    ids = list(ids)
+    if not ids:
+        return
+    entity_type = model.__tablename__
+    conn.execute(delete(EntityTag).where(
+        EntityTag.entity_type == entity_type, EntityTag.entity_id.in_(ids)
+    ))
+    conn.execute(delete(EntityFieldValue).where(
+        EntityFieldValue.entity_type == entity_type, EntityFieldValue.entity_id.in_(ids)
+    ))
+
+
+def sync_rows(conn: Connection, model, rows: Iterable, replace: bool = True) -> None:
+    """
+    Zapíše štítky a custom fields entit do indexu.
+
+    Args:
+        conn: Connection v rámci probíhající transakce
+        model: Model s `__entity_index__`
+        rows: ORM objekty nebo mapování s klíči `id`, `tags`, `custom_fields`
+        replace: Nejdřív smazat stávající záznamy (False pro nové entity)
+    """
+    tag_rows, field_rows, ids = [], [], []
+    for row in rows:
+        get = row.get if isinstance(row, dict) else lambda key, r=row: getattr(r, key)
+        ids.append(get("id"))
+        tags, fields = _rows_for(model, get("id"), get("tags"), get("custom_fields"))
+        tag_rows.extend(tags)
+        field_rows.extend(fields)
+
+    if replace:
+        remove_rows(conn, model, ids)
+    if tag_rows:
+        conn.execute(insert(EntityTag), tag_rows)
+    if field_rows:
+        conn.execute(insert(EntityFieldValue), field_rows)
+
+
+def _after_insert(mapper, connection, target):
+    sync_rows(connection, type(target), [target], replace=False)
+
+
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.tags.history.has_changes() or state.attrs.custom_fields.history.has_changes():
+        sync_rows(connection, type(target), [target])
+
+
+def _after_delete(mapper, connection, target):
+    remove_rows(connection, type(target), [target.id])
+
+
+def register_entity_index_events(base) -> None:
+    """Zaregistruje ORM eventy pro všechny modely s `__entity_index__`."""
+    for model in get_indexed_models(base):
+        if not event.contains(model, "after_insert", _after_insert):
+            event.listen(model, "after_insert", _after_insert)
+            event.listen(model, "after_update", _after_update)
+            event.listen(model, "after_delete", _after_delete)
+
+
+def init_entity_index(engine: Engine, base) -> None:
+    """
+    Zaregistruje eventy a doplní index pro existující data.
+    Volá se při startu aplikace.
+
+    Index se přestaví, pokud je pro danou tabulku prázdný (první nasazení)
+    nebo pokud pro nově deklarované custom field ještě nemá žádné hodnoty.
+    """
+    register_entity_index_events(base)
+
+    with engine.begin() as conn:
+        for model in get_indexed_models(base):
+            entity_type = model.__tablename__
+            has_tags = conn.execute(
+                select(EntityTag.entity_id).where(EntityTag.entity_type == entity_type).limit(1)
+            ).first()
+            indexed = set(conn.execute(
+                select(EntityFieldValue.field)
+                .where(EntityFieldValue.entity_type == entity_type)
+                .distinct()
+            ).scalars())
+
+            if has_tags and set(indexed_fields(model)) <= indexed:
+                continue
+
+            logger.info(f"Rebuilding tag/custom field index for {entity_type}")
+            conn.execute(delete(EntityTag).where(EntityTag.entity_type == entity_type))
+            conn.execute(delete(EntityFieldValue).where(EntityFieldValue.entity_type == entity_type))
+
+            table = model.__table__
+            result = conn.execution_options(yield_per=1000).execute(
+                select(table.c.id, table.c.tags, table.c.custom_fields)
+            )
+            for partition in result.mappings().partitions():
+                sync_rows(conn, model, partition, replace=False)
+
+
+# =====================================================
+# FILTRY
+# =====================================================
+def _as_list(value: Union[str, List[str]]) -> list[str]:
+    return value if isinstance(value, list) else [value]
+
+
+def apply_tag_filter(query, model: Type[T], tags: Union[str, List[str]], mode: str = "any"):
+    """
+    Filtr podle štítků.
+
+    - mode="any": entita má alespoň jeden ze štítků
+    - mode="all": entita má všechny štítky
+    """
+    tags = {normalize_tag(tag) for tag in _as_list(tags) if tag}
+    if not tags:
+        return query
+
+    matches = select(EntityTag.entity_id).where(
+        EntityTag.entity_type == model.__tablename__,
+        EntityTag.tag.in_(tags)
+    )
+    if mode == "all" and len(tags) > 1:
+        matches = matches.group_by(EntityTag.entity_id).having(
+            func.count(EntityTag.tag) == len(tags)
+        )
+
+    return query.filter(model.id.in_(matches))
+
+
+def apply_custom_field_filter(query, model: Type[T], field: str, value: Union[str, List[str]]):
+    """Filtr podle hodnoty deklarovaného custom field (list = IN)."""
+    values = [normalize_value(v) for v in _as_list(value) if v]
+    if not values:
+        return query
+
+    matches = select(EntityFieldValue.entity_id).where(
+        EntityFieldValue.entity_type == model.__tablename__,
+        EntityFieldValue.field == field,
+        EntityFieldValue.value.in_(values)
+    )
+    return query.filter(model.id.in_(matches))
+
+
+def has_index_filters(model: Type[T], params: dict[str, Any]) -> bool:
+    """Vrátí True, pokud parametry obsahují filtr na štítky / custom fields."""
+    if not is_indexed(model):
+        return False
+    fields = indexed_fields(model)
+    return any(
+        value and (
+            field == TAG_PARAM
+            or (field.startswith(CUSTOM_FIELD_PREFIX) and field[len(CUSTOM_FIELD_PREFIX):] in fields)
+        )
+        for field, value in params.items()
+    )
+
+
+def apply_index_filters(query, model: Type[T], params: dict[str, Any]):
+    """
+    Aplikuje filtry na štítky a custom fields z query parametrů.
+
+    - ?tag=a&tag=b            -> má štítek a NEBO b
+    - ?tag=a&tag=b&tag_mode=all -> má štítek a I b
+    - ?cf_region=Praha        -> custom_fields["region"] == "Praha" (jen deklarovaná pole)
+    """
+    if not is_indexed(model):
+        return query
+
+    if params.get(TAG_PARAM):
+        mode = params.get(TAG_MODE_PARAM) or "any"
+        query = apply_tag_filter(query, model, params[TAG_PARAM], mode if isinstance(mode, str) else mode[0])
+
+    fields = indexed_fields(model)
+    for key, value in params.items():
+        if value and key.startswith(CUSTOM_FIELD_PREFIX):
+            field = key[len(CUSTOM_FIELD_PREFIX):]
+            if field in fields:
+                query = apply_custom_field_filter(query, model, field, value)
+
+    return query
@@ -0,0 +1,168 @@
+# backend/core/utils/export.py
+"""
+Streamovaný export seznamů (CSV / NDJSON).
+
+Export nestránkuje přes API - jeden dotaz se čte po dávkách
+(`yield_per` - na PostgreSQL server-side cursor) a každá dávka se hned
+zakóduje a odešle. Paměť workeru je tak konstantní bez ohledu na počet
+řádků a první bajty odchází okamžitě.
+
+Dotaz se skládá stejnými filtry jako list endpoint (ORM query), pro export
+se jen zúží na vybrané sloupce (bez ORM objektů). Čte se ve vlastní session
+nad stejným enginem - session požadavku se uzavírá dřív, než stream doběhne.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Iterator, Optional, Sequence
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from backend.core.schemas.utils import ExportFormat
+from backend.core.utils.pagination import SortKey, order_by_keys
+
+EXPORT_BATCH_SIZE = 1000
+
+# Parametry exportu, které nejsou dynamické filtry (get_filter_params)
+EXPORT_PARAMS = {"skip", "limit", "format", "columns"}
+
+# Interní sloupce, které se neexportují
+EXPORT_EXCLUDED = ("pricing_state",)
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def default_columns(model) -> list[str]:
+    """Všechny sloupce modelu kromě interních."""
+    return [column.name for column in model.__table__.columns if column.name not in EXPORT_EXCLUDED]
+
+
+def resolve_columns(allowed: Sequence[str], requested: Optional[str]) -> list[str]:
+    """
+    Sloupce exportu z parametru `columns` (čárkami oddělený seznam).
+
+    Raises:
+        HTTPException 400: Neznámý sloupec
+    """
+    if not requested:
+        return list(allowed)
+
+    columns = [column.strip() for column in requested.split(",") if column.strip()]
+    unknown = [column for column in columns if column not in allowed]
+    if unknown or not columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown export columns: {', '.join(unknown)}" if unknown else "No export columns"
+        )
+    return columns
+
+
+# =====================================================
+# KÓDOVÁNÍ
+# =====================================================
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    return value
+
+
+def _encode_csv(rows, writer, buffer: io.StringIO) -> str:
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    chunk = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+
+def _encode_ndjson(rows, columns: Sequence[str]) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default) + "\n"
+        for row in rows
+    )
+
+
+def export_statement(query, model, columns: Sequence[str], order: Optional[SortKey] = None):
+    """Vyfiltrovanou ORM query zúží na exportované sloupce (bez ORM objektů)."""
+    if order:
+        query = order_by_keys(query, order)
+    return query.with_entities(*(model.__table__.c[column] for column in columns)).statement
+
+
+def iter_export(
+    bind,
+    statement,
+    columns: Sequence[str],
+    export_format: ExportFormat,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    Generátor částí exportu (pro StreamingResponse).
+
+    Args:
+        bind: Engine - čte se ve vlastní session
+        statement: SELECT exportovaných sloupců (export_statement)
+        columns: Názvy sloupců ve stejném pořadí
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == ExportFormat.CSV:
+        # BOM - Excel pak správně načte diakritiku
+        writer.writerow(columns)
+        yield "\ufeff" + _encode_csv([], writer, buffer)
+
+    with Session(bind=bind) as db:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            if export_format == ExportFormat.CSV:
+                yield _encode_csv(rows, writer, buffer)
+            else:
+                yield _encode_ndjson(rows, columns)
+
+
+def export_response(
+    db: Session,
+    query,
+    model,
+    columns: Sequence[str],
+    export_format: ExportFormat,
+    filename: str,
+    order: Optional[SortKey] = None
+) -> StreamingResponse:
+    """
+    StreamingResponse s exportem jako přílohou `{filename}-YYYYMMDD.csv|ndjson`.
+
+    Args:
+        db: Session požadavku - použije se jen její engine
+        query: Vyfiltrovaná ORM query nad modelem (stejné filtry jako list)
+        columns: Exportované sloupce (resolve_columns)
+        order: Řadicí klíč (stejný jako u list endpointu)
+    """
+    statement = export_statement(query, model, columns, order)
+    name = f"{filename}-{date.today():%Y%m%d}.{export_format.value}"
+    return StreamingResponse(
+        iter_export(db.get_bind(), statement, columns, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}"'}
+    )
@@ -0,0 +1,237 @@
+# backend/core/utils/fulltext.py
+"""
+Fulltextový index pro list endpointy.
+
+- SQLite: FTS5 virtuální tabulka `<tabulka>_fts` (rowid = id záznamu),
+  synchronizovaná přes ORM eventy (after_insert/update/delete).
+- PostgreSQL: generovaný sloupec `search_vector` (tsvector) + GIN index,
+  synchronizaci řeší databáze sama.
+
+Model se do indexu přihlásí atributem `__fulltext__` se seznamem sloupců.
+Pokud index není k dispozici, hledá se postaru přes ILIKE.
+
+Hromadné operace přes Core (query.update, insert().values) ORM eventy obchází,
+proto musí zavolat `reindex_rows` / `remove_rows` samy.
+"""
+import logging
+import re
+from typing import Optional, Type, TypeVar, Iterable
+
+from sqlalchemy import event, inspect, select, func, literal_column, or_, text
+from sqlalchemy.engine import Connection, Engine
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# Aktivní backend indexu: "fts5", "tsvector" nebo None (ILIKE fallback)
+_backend: Optional[str] = None
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def get_fulltext_models(base) -> list[type]:
+    """Vrátí modely, které mají definovaný `__fulltext__`."""
+    return [
+        mapper.class_ for mapper in base.registry.mappers
+        if getattr(mapper.class_, "__fulltext__", None)
+    ]
+
+
+def _fts_table(model) -> str:
+    return f"{model.__tablename__}_fts"
+
+
+def _tokens(term: str) -> list[str]:
+    return _TOKEN_RE.findall(term or "")
+
+
+# =====================================================
+# INICIALIZACE
+# =====================================================
+def init_fulltext(engine: Engine, base) -> Optional[str]:
+    """
+    Vytvoří fulltextové indexy a doplní chybějící data.
+    Volá se při startu aplikace.
+
+    Returns:
+        Název aktivního backendu nebo None
+    """
+    global _backend
+
+    dialect = engine.dialect.name
+    models = get_fulltext_models(base)
+
+    try:
+        with engine.begin() as conn:
+            if dialect == "sqlite":
+                for model in models:
+                    _init_sqlite(conn, model)
+                _backend = "fts5"
+            elif dialect == "postgresql":
+                for model in models:
+                    _init_postgres(conn, model)
+                _backend = "tsvector"
+            else:
+                _backend = None
+    except Exception as e:
+        logger.warning(f"Fulltext index unavailable, falling back to ILIKE: {e}")
+        _backend = None
+
+    if _backend == "fts5":
+        register_fulltext_events(base)
+
+    logger.info(f"Fulltext backend: {_backend or 'ILIKE'} ({len(models)} models)")
+    return _backend
+
+
+def _init_sqlite(conn: Connection, model) -> None:
+    fts = _fts_table(model)
+    table = model.__tablename__
+    fields = model.__fulltext__
+
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{', '.join(fields)}, tokenize='unicode61 remove_diacritics 2')"
+    ))
+
+    # Backfill - pokud počet řádků nesedí, index se přestaví celý
+    indexed = conn.execute(text(f"SELECT count(*) FROM {fts}")).scalar()
+    total = conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+    if indexed != total:
+        logger.info(f"Rebuilding fulltext index {fts} ({indexed} -> {total} rows)")
+        conn.execute(text(f"DELETE FROM {fts}"))
+        conn.execute(text(
+            f"INSERT INTO {fts} (rowid, {', '.join(fields)}) "
+            f"SELECT id, {', '.join(fields)} FROM {table}"
+        ))
+
+
+def _init_postgres(conn: Connection, model) -> None:
+    table = model.__tablename__
+    document = " || ' ' || ".join(f"coalesce({field}, '')" for field in model.__fulltext__)
+
+    conn.execute(text(
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, {document})) STORED"
+    ))
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)"
+    ))
+
+
+# =====================================================
+# SYNCHRONIZACE (SQLite)
+# =====================================================
+def reindex_rows(conn: Connection, model, rows: Iterable) -> None:
+    """
+    Zapíše řádky do FTS indexu.
+
+    Args:
+        conn: Connection v rámci probíhající transakce
+        model: Model s `__fulltext__`
+        rows: ORM objekty nebo mapování s klíči `id` + sloupce indexu
+    """
+    if _backend != "fts5":
+        return
+
+    fields = model.__fulltext__
+    params = []
+    for row in rows:
+        get = row.get if isinstance(row, dict) else lambda key, r=row: getattr(r, key)
+        params.append({"rowid": get("id"), **{field: get(field) for field in fields}})
+
+    if not params:
+        return
+
+    conn.execute(
+        text(
+            f"INSERT OR REPLACE INTO {_fts_table(model)} (rowid, {', '.join(fields)}) "
+            f"VALUES (:rowid, {', '.join(':' + field for field in fields)})"
+        ),
+        params
+    )
+
+
+def remove_rows(conn: Connection, model, ids: Iterable[int]) -> None:
+    """Odstraní řádky z FTS indexu."""
+    if _backend != "fts5":
+        return
+
+    params = [{"rowid": id_} for id_ in ids]
+    if params:
+        conn.execute(text(f"DELETE FROM {_fts_table(model)} WHERE rowid = :rowid"), params)
+
+
+def _after_insert(mapper, connection, target):
+    reindex_rows(connection, type(target), [target])
+
+
+def _after_update(mapper, connection, target):
+    # Přeindexuj jen pokud se změnil některý z indexovaných sloupců
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in type(target).__fulltext__):
+        reindex_rows(connection, type(target), [target])
+
+
+def _after_delete(mapper, connection, target):
+    remove_rows(connection, type(target), [target.id])
+
+
+def register_fulltext_events(base) -> None:
+    """Zaregistruje ORM eventy pro všechny modely s `__fulltext__`."""
+    for model in get_fulltext_models(base):
+        if not event.contains(model, "after_insert", _after_insert):
+            event.listen(model, "after_insert", _after_insert)
+            event.listen(model, "after_update", _after_update)
+            event.listen(model, "after_delete", _after_delete)
+
+
+# =====================================================
+# VYHLEDÁVÁNÍ
+# =====================================================
+def apply_fulltext_search(query, model: Type[T], term: str, rank: bool = True):
+    """
+    Aplikuje fulltextové hledání na query.
+
+    Každé slovo se hledá jako prefix (`fakt` najde `faktura`), všechna slova
+    musí být nalezena. S `rank=True` se výsledky řadí podle relevance
+    (další order_by se použijí jako sekundární řazení).
+
+    Args:
+        query: SQLAlchemy query
+        model: Model s `__fulltext__`
+        term: Hledaný výraz
+        rank: Řadit podle relevance
+    """
+    tokens = _tokens(term)
+    if not tokens:
+        return query
+
+    if _backend == "fts5":
+        fts = _fts_table(model)
+        fts_table = literal_column(fts)
+        match = " ".join(f'"{token}"*' for token in tokens)
+        matches = (
+            select(
+                literal_column("rowid").label("id"),
+                func.bm25(fts_table).label("rank")
+            )
+            .select_from(text(fts))
+            .where(fts_table.op("MATCH")(match))
+            .subquery()
+        )
+        query = query.join(matches, matches.c.id == model.id)
+        return query.order_by(matches.c.rank) if rank else query
+
+    if _backend == "tsvector":
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        ts_query = func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+        query = query.filter(vector.op("@@")(ts_query))
+        return query.order_by(func.ts_rank(vector, ts_query).desc()) if rank else query
+
+    # Fallback - ILIKE přes indexované sloupce
+    search_term = f"%{term}%"
+    return query.filter(or_(*[
+        getattr(model, field).ilike(search_term) for field in model.__fulltext__
+    ]))
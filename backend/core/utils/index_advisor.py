@@ -0,0 +1,196 @@
+# backend/core/utils/index_advisor.py
+"""
+Index advisor pro dynamické filtry list endpointů.
+
+Projde API logy, najde nejčastější kombinace filtrů na list endpointech,
+pro každou sestaví stejný dotaz jako endpoint (apply_dynamic_filters),
+spustí EXPLAIN a nahlásí kombinace, které končí full scanem tabulky.
+
+Spuštění (dev/admin nástroj):
+    python -m backend.core.utils.index_advisor --days 7 --top 20
+"""
+import argparse
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from backend.core.models.auth import ApiLog
+from backend.core.models.deal import Deal
+from backend.core.models.invocie import Invoice
+from backend.core.models.lead import Lead
+from backend.core.models.company import Company
+from backend.core.models.product import Product
+from backend.core.utils.search import (
+    apply_dynamic_filters, get_filter_meta,
+    KIND_STRING, KIND_RANGE_FROM, KIND_RANGE_TO,
+)
+
+logger = logging.getLogger(__name__)
+
+# List endpointy s dynamickými filtry
+LIST_ENDPOINTS = {
+    "/api/v1/deals/": Deal,
+    "/api/v1/invoices/": Invoice,
+    "/api/v1/leads/": Lead,
+    "/api/v1/companies/": Company,
+    "/api/v1/products/": Product,
+}
+
+
+@dataclass
+class FilterShape:
+    """Jedna kombinace filtrů na jednom endpointu."""
+    path: str
+    model: type
+    fields: tuple[str, ...]
+    count: int = 0
+    sample: dict = field(default_factory=dict)
+    plan: list[str] = field(default_factory=list)
+    full_scan: bool = False
+    suggestion: Optional[str] = None
+
+
+def collect_filter_shapes(db: Session, days: int = 7, limit: int = 50000) -> list[FilterShape]:
+    """
+    Seskupí logované requesty na list endpointy podle kombinace filtrů.
+
+    Returns:
+        Kombinace seřazené podle četnosti
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    logs = (
+        db.query(ApiLog.path, ApiLog.query_params)
+        .filter(
+            ApiLog.method == "GET",
+            ApiLog.path.in_(list(LIST_ENDPOINTS)),
+            ApiLog.created_at >= since,
+            ApiLog.query_params.isnot(None)
+        )
+        .order_by(ApiLog.created_at.desc())
+        .limit(limit)
+    )
+
+    shapes: dict[tuple[str, tuple[str, ...]], FilterShape] = {}
+    counts = Counter()
+
+    for path, params in logs:
+        model = LIST_ENDPOINTS[path]
+        meta = get_filter_meta(model)
+        fields = tuple(sorted(k for k, v in (params or {}).items() if v and k in meta))
+        if not fields:
+            continue
+
+        key = (path, fields)
+        counts[key] += 1
+        if key not in shapes:
+            # Nejnovější hodnoty jako vzorek pro EXPLAIN
+            shapes[key] = FilterShape(path, model, fields, sample={f: params[f] for f in fields})
+
+    for key, count in counts.items():
+        shapes[key].count = count
+
+    return sorted(shapes.values(), key=lambda s: s.count, reverse=True)
+
+
+def explain(db: Session, shape: FilterShape) -> list[str]:
+    """Spustí EXPLAIN pro dotaz se vzorkovými hodnotami."""
+    query = apply_dynamic_filters(db.query(shape.model), shape.model, shape.sample)
+    bind = db.get_bind()
+    sql = str(query.statement.compile(bind, compile_kwargs={"literal_binds": True}))
+
+    if bind.dialect.name == "sqlite":
+        rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in rows]
+
+    rows = db.connection().exec_driver_sql(f"EXPLAIN {sql}")
+    return [row[0] for row in rows]
+
+
+def _is_full_scan(plan: list[str], table: str) -> bool:
+    for line in plan:
+        # SQLite: "SCAN deals" (bez indexu), PostgreSQL: "Seq Scan on deals"
+        if line.startswith(f"SCAN {table}") and "INDEX" not in line:
+            return True
+        if f"Seq Scan on {table}" in line:
+            return True
+    return False
+
+
+def suggest_index(shape: FilterShape) -> Optional[str]:
+    """
+    Navrhne index pro kombinaci filtrů.
+
+    Rovnost/prefix sloupce jdou na začátek indexu, range sloupce na konec.
+    Contains (ILIKE '%v%') B-tree index nevyužije - tam pomůže jen fulltext.
+    """
+    meta = get_filter_meta(shape.model)
+    leading, trailing, contains = [], [], []
+
+    for name in shape.fields:
+        kind, column = meta[name]
+        if kind == KIND_STRING:
+            contains.append(column.key)
+        elif kind in (KIND_RANGE_FROM, KIND_RANGE_TO):
+            if column.key not in trailing:
+                trailing.append(column.key)
+        else:
+            leading.append(column.key)
+
+    columns = leading + [c for c in trailing if c not in leading]
+    if not columns:
+        return f"contains filter on {', '.join(contains)} - use search= (fulltext) instead" if contains else None
+
+    table = shape.model.__tablename__
+    return f"CREATE INDEX idx_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)})"
+
+
+def analyze(db: Session, days: int = 7, top: int = 20) -> list[FilterShape]:
+    """Najde nejčastější kombinace filtrů a vyhodnotí jejich plány."""
+    shapes = collect_filter_shapes(db, days=days)[:top]
+
+    for shape in shapes:
+        try:
+            shape.plan = explain(db, shape)
+        except Exception as e:
+            logger.warning(f"EXPLAIN failed for {shape.path} {shape.fields}: {e}")
+            db.rollback()
+            continue
+
+        shape.full_scan = _is_full_scan(shape.plan, shape.model.__tablename__)
+        if shape.full_scan:
+            shape.suggestion = suggest_index(shape)
+
+    return shapes
+
+
+def print_report(shapes: list[FilterShape]) -> None:
+    if not shapes:
+        print("No filtered list requests found in API logs.")
+        return
+
+    for shape in shapes:
+        status = "FULL SCAN" if shape.full_scan else "ok"
+        print(f"[{status:9}] {shape.count:6}x  GET {shape.path}  filters: {', '.join(shape.fields)}")
+        for line in shape.plan:
+            print(f"             {line}")
+        if shape.suggestion:
+            print(f"             -> {shape.suggestion}")
+
+
+if __name__ == "__main__":
+    from backend.core.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Index advisor for list endpoint filters")
+    parser.add_argument("--days", type=int, default=7, help="How many days of API logs to analyze")
+    parser.add_argument("--top", type=int, default=20, help="How many most frequent filter combinations to explain")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print_report(analyze(db, days=args.days, top=args.top))
+    finally:
+        db.close()
@@ -1,4 +1,5 @@
 # init_db.py
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
 from datetime import datetime
 import logging
@@ -88,7 +89,8 @@ def create_base_modules(db: Session) -> list[Module]:
         {"name": "leads", "description": ""},
         {"name": "deals", "description": ""},
         {"name": "invoices", "description": ""},
-        {"name": "documents", "description": ""}
+        {"name": "documents", "description": ""},
+        {"name": "analytics", "description": "Sales analytics"}
     ]
 
     created_modules = []
@@ -187,6 +189,109 @@ def assign_admin_role_to_user(db: Session, admin_user: User, admin_role: Role) -
     logger.info("Admin role assigned to admin user")
 
 
+def create_missing_columns() -> int:
+    """
+    Doplní nové nullable sloupce do už existujících tabulek.
+    (create_all existující tabulky nemění; sloupce NOT NULL je nutné migrovat ručně)
+
+    Returns:
+        Počet přidaných sloupců
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    count = 0
+
+    with engine.begin() as conn:
+        for table in Base.metadata.tables.values():
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    logger.warning(f"Column {table.name}.{column.name} is NOT NULL, add it manually")
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                logger.info(f"Added column {table.name}.{column.name}")
+                count += 1
+    return count
+
+
+# Sloupce změněné na NOT NULL - existující NULL se doplní výchozí hodnotou
+COLUMN_BACKFILLS = {
+    ("products", "is_featured"): False,
+}
+
+# Indexy nahrazené jinými (změna sloupců / směru řazení)
+OBSOLETE_INDEXES = {
+    "products": ("idx_product_listing",),
+}
+
+
+def backfill_columns() -> int:
+    """
+    Doplní výchozí hodnoty do sloupců, které se změnily na NOT NULL.
+    (NULL řádky by jinak vypadly z keyset podmínek stránkování)
+
+    Returns:
+        Počet opravených řádků
+    """
+    existing_tables = set(inspect(engine).get_table_names())
+    count = 0
+    with engine.begin() as conn:
+        for (table, column), value in COLUMN_BACKFILLS.items():
+            if table not in existing_tables:
+                continue
+            result = conn.execute(
+                text(f"UPDATE {table} SET {column} = :value WHERE {column} IS NULL"), {"value": value}
+            )
+            if result.rowcount:
+                logger.info(f"Backfilled {result.rowcount} NULL values in {table}.{column}")
+                count += result.rowcount
+    return count
+
+
+def drop_obsolete_indexes() -> int:
+    """
+    Odstraní nahrazené indexy.
+
+    Returns:
+        Počet odstraněných indexů
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    count = 0
+    with engine.begin() as conn:
+        for table, names in OBSOLETE_INDEXES.items():
+            if table not in existing_tables:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table)}
+            for name in names:
+                if name in existing:
+                    conn.exec_driver_sql(f"DROP INDEX {name}")
+                    logger.info(f"Dropped obsolete index {table}.{name}")
+                    count += 1
+    return count
+
+
+def create_missing_indexes() -> int:
+    """
+    Doplní indexy, které chybí u už existujících tabulek.
+    (create_all vytváří indexy jen spolu s novou tabulkou)
+
+    Returns:
+        Počet zkontrolovaných indexů
+    """
+    count = 0
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+            count += 1
+    return count
+
+
 def init_database() -> None:
     """
     Inicializuje databázi a vytvoří základní admin uživatele.
@@ -198,6 +303,12 @@ def init_database() -> None:
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created")
 
+    create_missing_columns()
+    backfill_columns()
+    drop_obsolete_indexes()
+    create_missing_indexes()
+    logger.info("Database columns and indexes checked")
+
     # Vytvoř session
     db = SessionLocal()
 
@@ -0,0 +1,248 @@
+# backend/core/utils/pagination.py
+"""
+Keyset (cursor) stránkování pro list endpointy.
+
+Místo OFFSET se další stránka načítá podmínkou na řadicí klíč posledního
+záznamu (např. `(created_at, id) < (:created_at, :id)`), takže stránka N
+stojí stejně jako první stránka - pokud existuje index odpovídající řazení.
+
+Kurzor je neprůhledný base64 řetězec s hodnotami řadicího klíče.
+Následující kurzor se vrací v hlavičce `X-Next-Cursor` (response modely
+list endpointů zůstávají beze změny).
+
+Volitelný celkový počet záznamů (`include_total`) se počítá ve stejném
+dotazu přes `COUNT(*) OVER()`, u velkých nefiltrovaných tabulek se bere
+odhad ze statistik plánovače. Vrací se v hlavičkách `X-Total-Count`
+a `X-Total-Exact` (true/false).
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_, tuple_, literal, func, text
+from sqlalchemy.orm import Session
+
+from backend.core.config import get_settings
+
+settings = get_settings()
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_EXACT_HEADER = "X-Total-Exact"
+PAGINATION_HEADERS = [NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_EXACT_HEADER]
+
+# Řadicí klíč: (sloupec, sestupně?) - poslední prvek musí být unikátní (id)
+SortKey = Sequence[tuple[Any, bool]]
+
+
+def order_by_keys(query, keys: SortKey):
+    """Aplikuje řazení podle řadicího klíče."""
+    return query.order_by(*[
+        column.desc() if descending else column.asc()
+        for column, descending in keys
+    ])
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_value(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+
+def encode_cursor(item, keys: SortKey) -> str:
+    """Vytvoří kurzor z posledního záznamu stránky."""
+    values = [_encode_value(getattr(item, column.key)) for column, _ in keys]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: SortKey) -> list:
+    """
+    Dekóduje kurzor na hodnoty řadicího klíče.
+
+    Raises:
+        HTTPException: Pokud kurzor není platný pro dané řazení
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("cursor does not match sort key")
+        return [_decode_value(column, value) for (column, _), value in zip(keys, values)]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {e}"
+        )
+
+
+def keyset_condition(keys: SortKey, values: list):
+    """
+    Podmínka "za kurzorem".
+
+    Pro jednotný směr řazení se použije porovnání řádkových hodnot
+    `(a, b) < (:a, :b)`, které databáze umí obsloužit složeným indexem.
+    Pro smíšené směry se podmínka rozepíše na OR řetězec.
+    """
+    directions = {descending for _, descending in keys}
+    columns = [column for column, _ in keys]
+    # Hodnoty jako typované parametry (i pro boolean sloupce)
+    values = [literal(value, type_=column.type) for column, value in zip(columns, values)]
+
+    if len(directions) == 1:
+        left, right = tuple_(*columns), tuple_(*values)
+        return left < right if directions.pop() else left > right
+
+    conditions = []
+    for i, (column, descending) in enumerate(keys):
+        equal = [columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        conditions.append(and_(*equal, step))
+    return or_(*conditions)
+
+
+def estimate_row_count(db: Session, table_name: str) -> Optional[int]:
+    """
+    Odhad počtu řádků tabulky ze statistik plánovače.
+
+    - PostgreSQL: pg_class.reltuples (aktualizuje ANALYZE / autovacuum)
+    - SQLite: sqlite_stat1 (aktualizuje ANALYZE / PRAGMA optimize)
+
+    Returns:
+        Odhad nebo None, pokud statistiky nejsou k dispozici
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table_name}
+        ).scalar()
+        # -1 = tabulka ještě nebyla analyzována
+        return estimate if estimate is not None and estimate >= 0 else None
+
+    if dialect == "sqlite":
+        has_stats = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        ).scalar()
+        if not has_stats:
+            return None
+        stat = db.execute(
+            text("SELECT stat FROM sqlite_stat1 WHERE tbl = :table LIMIT 1"),
+            {"table": table_name}
+        ).scalar()
+        # První číslo ve stat je počet řádků
+        return int(stat.split()[0]) if stat else None
+
+    return None
+
+
+def paginate(
+    query,
+    keys: SortKey,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    response: Optional[Response] = None,
+    ranked: bool = False,
+    include_total: bool = False,
+    unfiltered: bool = False
+) -> list:
+    """
+    Načte jednu stránku výsledků.
+
+    - s `cursor` se použije keyset podmínka (skip se ignoruje)
+    - bez kurzoru se použije `skip` (zpětná kompatibilita)
+
+    Args:
+        query: SQLAlchemy query (bez order_by/offset/limit) - entita
+            nebo projekce sloupců (řádky s názvy sloupců řadicího klíče)
+        keys: Řadicí klíč, poslední sloupec musí být unikátní
+        limit: Velikost stránky
+        skip: Offset pro stránkování bez kurzoru
+        cursor: Kurzor z hlavičky X-Next-Cursor předchozí stránky
+        response: Response, do které se zapíšou hlavičky stránkování
+        ranked: Query už má vlastní řazení (např. podle relevance) - řadicí
+            klíč se použije jako sekundární, stránkuje se jen přes skip
+            a kurzor se nevrací
+        include_total: Vrátit celkový počet záznamů (jen bez kurzoru,
+            kurzorové stránky total nepočítají - klient ho má z první stránky)
+        unfiltered: Query nemá žádné filtry - total se u velké tabulky
+            může vzít z odhadu místo počítání
+
+    Returns:
+        Seznam záznamů stránky
+    """
+    model = keys[-1][0].class_
+    total, exact = None, True
+    projection = any(column["expr"] is not column["entity"] for column in query.column_descriptions)
+
+    if include_total and cursor:
+        include_total = False
+
+    if include_total and unfiltered:
+        estimate = estimate_row_count(query.session, model.__tablename__)
+        if estimate is not None and estimate >= settings.total_count_estimate_threshold:
+            total, exact = estimate, False
+
+    base_query = query
+    with_window = include_total and total is None
+    if with_window:
+        # Total ve stejném dotazu - počítá se před LIMIT/OFFSET
+        query = query.add_columns(func.count().over().label("total_count"))
+
+    if ranked:
+        # Řadicí klíč jen jako sekundární řazení
+        rows = order_by_keys(query, keys).offset(skip).limit(limit).all()
+        has_more = False
+    else:
+        if cursor:
+            query = query.filter(keyset_condition(keys, decode_cursor(cursor, keys)))
+        query = order_by_keys(query, keys)
+        if skip and not cursor:
+            query = query.offset(skip)
+
+        # O jeden záznam víc - zjistíme, jestli existuje další stránka
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+    if with_window:
+        # Projekce sloupců - total_count navíc v řádku nevadí
+        items = rows if projection else [row[0] for row in rows]
+        if rows:
+            total = rows[0].total_count
+        elif not skip:
+            total = 0
+        else:
+            # Stránka za koncem - window funkce nemá z čeho číst
+            total = base_query.order_by(None).count()
+    else:
+        items = rows
+
+    if response is not None:
+        if has_more and items:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1], keys)
+        if total is not None:
+            response.headers[TOTAL_COUNT_HEADER] = str(total)
+            response.headers[TOTAL_EXACT_HEADER] = "true" if exact else "false"
+
+    return items
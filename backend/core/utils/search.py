@@ -1,10 +1,272 @@
+import logging
+from functools import lru_cache
+from typing import Type, TypeVar, Any, List, Union, Callable, Optional
+
 from fastapi import Request
-from sqlalchemy import inspect, cast, String, Integer
-from sqlalchemy.types import Enum as SQLAlchemyEnum
-from typing import Type, TypeVar, Any, List, Union
+from sqlalchemy import inspect, cast, String, Integer, Boolean, or_, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import Enum as SQLAlchemyEnum, NullType
+
+from backend.core.utils.entity_index import apply_index_filters, has_index_filters
 
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
+
+# Druhy filtrů podle typu sloupce
+KIND_ENUM = "enum"
+KIND_INTEGER = "integer"
+KIND_BOOLEAN = "boolean"
+KIND_STRING = "string"
+KIND_EXACT = "exact"
+KIND_PREFIX = "prefix"
+KIND_RANGE_FROM = "range_from"
+KIND_RANGE_TO = "range_to"
+
+# Schopnosti filtru deklarované na modelu (__filter_capabilities__)
+FILTER_EXACT = "exact"        # = / IN, bez castu - použije index
+FILTER_PREFIX = "prefix"      # LIKE 'v%' - použije index
+FILTER_CONTAINS = "contains"  # ILIKE '%v%' - vždy full scan
+FILTER_RANGE = "range"        # = / IN + _from/_to
+FILTER_NONE = "none"          # sloupec nejde filtrovat
+
+TRUE_VALUES = ('true', '1', 'yes')
+
+# Metadata filtrů per model: název parametru -> (druh filtru, atribut modelu)
+_filter_meta: dict[type, dict[str, tuple[str, Any]]] = {}
+
+
+def _column_kind(column_type) -> str:
+    if isinstance(column_type, SQLAlchemyEnum):
+        return KIND_ENUM
+    if isinstance(column_type, Integer):
+        return KIND_INTEGER
+    if isinstance(column_type, Boolean):
+        return KIND_BOOLEAN
+    return KIND_STRING
+
+
+def _declared_kind(capability: str, column_type) -> Optional[str]:
+    if capability == FILTER_NONE:
+        return None
+    if capability == FILTER_PREFIX:
+        return KIND_PREFIX
+    if capability == FILTER_CONTAINS:
+        return KIND_STRING
+    # exact / range - přesná shoda podle typu, string bez castu
+    kind = _column_kind(column_type)
+    return KIND_EXACT if kind == KIND_STRING else kind
+
+
+def get_filter_meta(model: Type[T]) -> dict[str, tuple[str, Any]]:
+    """
+    Vrátí (a při prvním volání spočítá) metadata filtrů pro model.
+
+    Pro každý sloupec `x` obsahuje parametry `x`, `x_from` a `x_to`.
+    Range parametr má přednost před sloupcem se stejným názvem.
+
+    Sloupce uvedené v `__filter_capabilities__` modelu se filtrují podle
+    deklarace (range parametry jen u FILTER_RANGE), ostatní sloupce
+    podle typu jako dřív.
+    """
+    meta = _filter_meta.get(model)
+    if meta is not None:
+        return meta
+
+    meta = {}
+    columns = list(inspect(model).columns)
+    capabilities = getattr(model, "__filter_capabilities__", {})
+
+    for col in columns:
+        if col.key in capabilities:
+            kind = _declared_kind(capabilities[col.key], col.type)
+        else:
+            kind = _column_kind(col.type)
+        if kind:
+            meta[col.key] = (kind, getattr(model, col.key))
+
+    for col in columns:
+        if capabilities.get(col.key, FILTER_RANGE) != FILTER_RANGE:
+            continue
+        column = getattr(model, col.key)
+        meta[f"{col.key}_from"] = (KIND_RANGE_FROM, column)
+        meta[f"{col.key}_to"] = (KIND_RANGE_TO, column)
+
+    _filter_meta[model] = meta
+    return meta
+
+
+def warm_filter_cache(base) -> int:
+    """
+    Předpočítá metadata filtrů pro všechny modely registrované v Base.
+    Volá se při startu aplikace.
+
+    Returns:
+        Počet modelů
+    """
+    models = [mapper.class_ for mapper in base.registry.mappers]
+    for model in models:
+        get_filter_meta(model)
+    return len(models)
+
+
+# ===== PREFIX MATCH =====
+class prefix_match(ColumnElement):
+    """
+    Case-sensitive prefix match, který umí použít B-tree index.
+
+    - obecně: `column LIKE 'v%' ESCAPE '\\'`
+    - SQLite: `column GLOB 'v*'` (LIKE je v SQLite case-insensitive
+      a index s BINARY collation nepoužije)
+    """
+    type = NullType()  # Boolean by na SQLite přidal "= 1"
+    inherit_cache = False
+
+    def __init__(self, column, prefix: str):
+        self.column = column
+        self.prefix = prefix
+
+
+@compiles(prefix_match)
+def _compile_prefix_like(element, compiler, **kw):
+    escaped = (
+        element.prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+    pattern = compiler.process(literal(escaped + "%"), **kw)
+    return f"{compiler.process(element.column, **kw)} LIKE {pattern} ESCAPE '\\'"
+
+
+@compiles(prefix_match, "sqlite")
+def _compile_prefix_glob(element, compiler, **kw):
+    escaped = "".join(f"[{ch}]" if ch in "*?[" else ch for ch in element.prefix)
+    pattern = compiler.process(literal(escaped + "*"), **kw)
+    return f"{compiler.process(element.column, **kw)} GLOB {pattern}"
+
+
+# ===== OPERÁTORY =====
+# Každý operátor dostane atribut modelu a vrací funkci (query, value) -> query.
+
+def _first(value):
+    # Pro list hodnot použij první
+    return value[0] if isinstance(value, list) else value
+
+
+def _op_range_from(column):
+    return lambda query, value: query.filter(column >= _first(value))
+
+
+def _op_range_to(column):
+    return lambda query, value: query.filter(column <= _first(value))
+
+
+def _op_in(column):
+    return lambda query, value: query.filter(column.in_(value))
+
+
+def _op_in_int(column):
+    def apply(query, value):
+        int_values = [int(v) for v in value if v]
+        return query.filter(column.in_(int_values)) if int_values else query
+    return apply
+
+
+def _op_in_bool(column):
+    return lambda query, value: query.filter(
+        column.in_([v.lower() in TRUE_VALUES for v in value])
+    )
+
+
+def _op_any_ilike(column):
+    text_column = cast(column, String)
+
+    def apply(query, value):
+        conditions = [text_column.ilike(f"%{v}%") for v in value if v]
+        return query.filter(or_(*conditions)) if conditions else query
+    return apply
+
+
+def _op_eq(column):
+    return lambda query, value: query.filter(column == value)
+
+
+def _op_eq_bool(column):
+    return lambda query, value: query.filter(column == (value.lower() in TRUE_VALUES))
+
+
+def _op_eq_int(column):
+    return lambda query, value: query.filter(column == int(value))
+
+
+def _op_in_exact(column):
+    return lambda query, value: query.filter(column.in_([v for v in value if v]))
+
+
+def _op_prefix(column):
+    return lambda query, value: query.filter(prefix_match(column, value))
+
+
+def _op_any_prefix(column):
+    def apply(query, value):
+        conditions = [prefix_match(column, v) for v in value if v]
+        return query.filter(or_(*conditions)) if conditions else query
+    return apply
+
+
+def _op_ilike(column):
+    text_column = cast(column, String)
+    return lambda query, value: query.filter(text_column.ilike(f"%{value}%"))
+
+
+# (druh filtru, je hodnota list) -> továrna operátoru
+_OPERATORS: dict[tuple[str, bool], Callable] = {
+    (KIND_RANGE_FROM, False): _op_range_from,
+    (KIND_RANGE_FROM, True): _op_range_from,
+    (KIND_RANGE_TO, False): _op_range_to,
+    (KIND_RANGE_TO, True): _op_range_to,
+    (KIND_ENUM, True): _op_in,
+    (KIND_ENUM, False): _op_eq,
+    (KIND_INTEGER, True): _op_in_int,
+    (KIND_INTEGER, False): _op_eq_int,
+    (KIND_BOOLEAN, True): _op_in_bool,
+    (KIND_BOOLEAN, False): _op_eq_bool,
+    (KIND_STRING, True): _op_any_ilike,
+    (KIND_STRING, False): _op_ilike,
+    (KIND_EXACT, True): _op_in_exact,
+    (KIND_EXACT, False): _op_eq,
+    (KIND_PREFIX, True): _op_any_prefix,
+    (KIND_PREFIX, False): _op_prefix,
+}
+
+
+@lru_cache(maxsize=1024)
+def compile_filter_plan(model: Type[T], signature: tuple[tuple[str, bool], ...]) -> tuple:
+    """
+    Zkompiluje plán filtrů pro danou sadu parametrů.
+
+    Args:
+        model: SQLAlchemy model
+        signature: Dvojice (název parametru, je hodnota list) ve známých parametrech
+
+    Returns:
+        Tuple (název parametru, operátor)
+    """
+    meta = get_filter_meta(model)
+    plan = []
+    for field, is_list in signature:
+        kind, column = meta[field]
+        plan.append((field, _OPERATORS[(kind, is_list)](column)))
+    return tuple(plan)
+
+
+def has_dynamic_filters(model: Type[T], params: dict[str, Any]) -> bool:
+    """Vrátí True, pokud by apply_dynamic_filters aplikoval nějaký filtr."""
+    meta = get_filter_meta(model)
+    return (
+        any(value and field in meta for field, value in params.items())
+        or has_index_filters(model, params)
+    )
+
 
 def apply_dynamic_filters(query, model: Type[T], params: dict[str, Any]):
     """
@@ -15,7 +277,11 @@ def apply_dynamic_filters(query, model: Type[T], params: dict[str, Any]):
     - ILIKE pro string sloupce
     - IN operátor pro listy hodnot
     - Range filtry (_from, _to suffixes)
-    
+    - Štítky a deklarované custom fields přes index (viz entity_index)
+
+    Metadata sloupců se počítají jednou per model a plán filtrů
+    se cachuje podle modelu a sady parametrů (viz compile_filter_plan).
+
     Příklady:
     - ?name=test          -> WHERE name ILIKE '%test%'
     - ?status=active      -> WHERE status = 'active'
@@ -24,95 +290,26 @@ def apply_dynamic_filters(query, model: Type[T], params: dict[str, Any]):
     - ?status=draft&status=sent  -> WHERE status IN ('draft', 'sent')
     - ?price_from=100     -> WHERE price >= 100
     - ?price_to=500       -> WHERE price <= 500
+    - ?tag=vip&tag=b2b&tag_mode=all -> má oba štítky
+    - ?cf_region=Praha    -> custom_fields["region"] == "Praha"
     """
-    mapper = inspect(model)
-    columns = {col.key: col for col in mapper.columns}
-
-    for field, value in params.items():
-        if not value:
-            continue
-
-        # Handle range filters (_from, _to)
-        if field.endswith('_from'):
-            base_field = field[:-5]  # Remove '_from'
-            if base_field in columns:
-                try:
-                    column = getattr(model, base_field)
-                    # Pro list hodnot použij první
-                    val = value[0] if isinstance(value, list) else value
-                    query = query.filter(column >= val)
-                except Exception as e:
-                    print(f"Filter error for {field}={value}: {e}")
-                continue
-
-        if field.endswith('_to'):
-            base_field = field[:-3]  # Remove '_to'
-            if base_field in columns:
-                try:
-                    column = getattr(model, base_field)
-                    # Pro list hodnot použij první
-                    val = value[0] if isinstance(value, list) else value
-                    query = query.filter(column <= val)
-                except Exception as e:
-                    print(f"Filter error for {field}={value}: {e}")
-                continue
+    query = apply_index_filters(query, model, params)
 
-        # Standard field filtering
-        if field not in columns:
-            continue
+    meta = get_filter_meta(model)
+    signature = tuple(
+        (field, isinstance(value, list))
+        for field, value in params.items()
+        if value and field in meta
+    )
+    if not signature:
+        return query
 
+    for field, operator in compile_filter_plan(model, signature):
+        value = params[field]
         try:
-            column_obj = columns[field]
-            column = getattr(model, field)
-            column_type = column_obj.type
-
-            # VALUE JE LIST -> použij IN operátor
-            if isinstance(value, list) and len(value) > 0:
-                # Pro enum sloupce
-                if isinstance(column_type, SQLAlchemyEnum):
-                    query = query.filter(column.in_(value))
-                
-                # Pro integer sloupce
-                elif isinstance(column_type, Integer):
-                    int_values = [int(v) for v in value if v]
-                    if int_values:
-                        query = query.filter(column.in_(int_values))
-                
-                # Pro boolean
-                elif str(column_type) == 'BOOLEAN':
-                    bool_values = [v.lower() in ('true', '1', 'yes') for v in value]
-                    query = query.filter(column.in_(bool_values))
-                
-                # Pro string - OR kombinace ILIKE
-                else:
-                    from sqlalchemy import or_
-                    conditions = [cast(column, String).ilike(f"%{v}%") for v in value if v]
-                    if conditions:
-                        query = query.filter(or_(*conditions))
-
-            # VALUE NENÍ LIST -> klasické filtrování
-            else:
-                # Pro enum sloupce - přesná shoda
-                if isinstance(column_type, SQLAlchemyEnum):
-                    query = query.filter(column == value)
-
-                # Pro boolean
-                elif str(column_type) == 'BOOLEAN':
-                    bool_value = value.lower() in ('true', '1', 'yes')
-                    query = query.filter(column == bool_value)
-
-                # Pro integer sloupce - přesná shoda
-                elif isinstance(column_type, Integer):
-                    query = query.filter(column == int(value))
-
-                # Pro ostatní (string) - ILIKE
-                else:
-                    query = query.filter(cast(column, String).ilike(f"%{value}%"))
-
+            query = operator(query, value)
         except Exception as e:
-            # Loguj chyby pro debugging
-            print(f"Filter error for {field}={value}: {e}")
-            continue
+            logger.warning(f"Filter error for {field}={value}: {e}")
 
     return query
 
@@ -176,5 +373,3 @@ def parse_list_param(value: Union[str, List[str]]) -> List[str]:
         else:
             return [value]
     return []
-
-
@@ -0,0 +1,399 @@
+# backend/core/utils/trigram.py
+"""
+Trigramové (fuzzy) vyhledávání pro typeahead ve formulářích.
+
+- PostgreSQL: rozšíření pg_trgm + GIN indexy (gin_trgm_ops), řazení
+  podle word_similarity. Práh operátoru `<%` se nastavuje pro transakci
+  dotazu, takže platí stejný `threshold` jako v paměťovém indexu.
+- SQLite: invertovaný trigramový index v paměti workeru. Vlastní zápisy
+  se do indexu promítnou po commitu (ORM eventy), změny z ostatních
+  workerů dotahuje úloha na pozadí každých `REFRESH_INTERVAL` sekund
+  (podle updated_at, při nesouhlasu počtu řádků se index přestaví).
+
+Model se do indexu přihlásí atributem `__trigram__` se seznamem sloupců.
+
+Skóre je podíl trigramů dotazu nalezených v hodnotě (0-1), takže
+i částečné IČO nebo překlep v názvu ("Prha" -> "Praha") najde shodu.
+"""
+import asyncio
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from itertools import islice
+from datetime import datetime
+from typing import Optional, Type, TypeVar
+
+from sqlalchemy import event, func, literal, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# Aktivní backend: "pg_trgm", "memory" nebo None
+_backend: Optional[str] = None
+
+REFRESH_INTERVAL = 5.0  # s - jak často se dotahují změny z ostatních workerů
+DEFAULT_THRESHOLD = 0.4
+MAX_CANDIDATES = 5000  # Max počet kandidátů z nejvzácnějších trigramů
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(value: str) -> str:
+    """Lowercase a bez diakritiky."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def trigrams(value: Optional[str]) -> frozenset[str]:
+    """Trigramy hodnoty - stejně jako pg_trgm (slova doplněná o "  " a " ")."""
+    if not value:
+        return frozenset()
+    result = set()
+    for word in _WORD_RE.findall(normalize(value)):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(result)
+
+
+def get_trigram_models(base) -> list[type]:
+    """Vrátí modely, které mají definovaný `__trigram__`."""
+    return [
+        mapper.class_ for mapper in base.registry.mappers
+        if getattr(mapper.class_, "__trigram__", None)
+    ]
+
+
+# =====================================================
+# IN-MEMORY INDEX (SQLite)
+# =====================================================
+class TrigramIndex:
+    """
+    Invertovaný trigramový index jednoho modelu.
+
+    Klíč hodnoty je int `id * počet_sloupců + pořadí_sloupce` - množinové
+    operace nad inty jsou výrazně rychlejší než nad tuple.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = model.__trigram__
+        self._width = len(self.fields)
+        self._docs: dict[int, frozenset[str]] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._ids: set[int] = set()
+        self._lock = threading.RLock()
+        self.last_sync: Optional[datetime] = None
+        self.last_refresh = 0.0
+
+    def _remove(self, entity_id: int) -> None:
+        for position in range(self._width):
+            key = entity_id * self._width + position
+            for gram in self._docs.pop(key, ()):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(key)
+                    if not posting:
+                        del self._postings[gram]
+        self._ids.discard(entity_id)
+
+    def upsert(self, entity_id: int, values: dict) -> None:
+        with self._lock:
+            self._remove(entity_id)
+            for position, field in enumerate(self.fields):
+                grams = trigrams(values.get(field))
+                if not grams:
+                    continue
+                key = entity_id * self._width + position
+                self._docs[key] = grams
+                for gram in grams:
+                    self._postings.setdefault(gram, set()).add(key)
+            self._ids.add(entity_id)
+
+    def remove(self, entity_id: int) -> None:
+        with self._lock:
+            self._remove(entity_id)
+
+    def _load(self, db: Session, since: Optional[datetime] = None) -> None:
+        model = self.model
+        columns = [model.id, model.updated_at] + [getattr(model, f) for f in self.fields]
+        query = db.query(*columns)
+        if since is not None:
+            query = query.filter(model.updated_at > since)
+
+        for row in query.yield_per(1000):
+            self.upsert(row[0], dict(zip(self.fields, row[2:])))
+            if self.last_sync is None or row[1] > self.last_sync:
+                self.last_sync = row[1]
+
+    def rebuild(self, db: Session) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            self._ids.clear()
+            self.last_sync = None
+            self._load(db)
+            self.last_refresh = time.monotonic()
+
+    def refresh(self, db: Session) -> None:
+        """Dotáhne změny z databáze (zápisy ostatních workerů)."""
+        with self._lock:
+            self._load(db, since=self.last_sync)
+            # Smazané řádky nemají updated_at - pozná se to podle počtu
+            total = db.query(func.count(self.model.id)).scalar()
+            if total != len(self._ids):
+                self.rebuild(db)
+            self.last_refresh = time.monotonic()
+
+    def search(self, query: str, limit: int = 10, threshold: float = DEFAULT_THRESHOLD) -> list[tuple[int, float, str]]:
+        """
+        Returns:
+            Seznam (id, skóre, sloupec) seřazený podle skóre
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        # Hodnota nad prahem musí obsahovat aspoň `required` trigramů dotazu,
+        # takže musí být v některém z (počet - required + 1) nejvzácnějších postingů
+        required = max(1, math.ceil(threshold * len(grams)))
+
+        with self._lock:
+            postings = sorted(
+                (self._postings[g] for g in grams if g in self._postings),
+                key=len
+            )
+            if len(postings) < required:
+                return []
+
+            probes = len(postings) - required + 1
+            candidates = set()
+            budget = MAX_CANDIDATES
+            for i, posting in enumerate(postings[:probes]):
+                # U velmi častých trigramů (např. "s.r.o.") stačí vzorek - rozpočet
+                # se dělí rovnoměrně, aby přispěl každý z postingů
+                share = budget // (probes - i)
+                candidates.update(posting if len(posting) <= share else islice(posting, share))
+                budget -= min(len(posting), share)
+
+            # Vzorek vybírá jen kandidáty - skóre se počítá z celé hodnoty,
+            # jinak by chyběly shody v oříznutých postinzích
+            counts = Counter({key: len(grams & self._docs[key]) for key in candidates})
+
+        results = []
+        seen = set()
+        for key, hits in counts.most_common(limit * self._width):
+            score = hits / len(grams)
+            if score < threshold or len(results) >= limit:
+                break
+            entity_id, position = divmod(key, self._width)
+            if entity_id not in seen:
+                seen.add(entity_id)
+                results.append((entity_id, score, self.fields[position]))
+        return results
+
+
+_indexes: dict[type, TrigramIndex] = {}
+
+
+# =====================================================
+# SYNCHRONIZACE (po commitu)
+# =====================================================
+def _queue(mapper, connection, target, op: str) -> None:
+    index = _indexes.get(type(target))
+    session = Session.object_session(target)
+    if index is None or session is None:
+        return
+    values = {field: getattr(target, field) for field in index.fields} if op == "upsert" else None
+    session.info.setdefault("trigram_pending", []).append((index, target.id, values))
+
+
+def _after_insert(mapper, connection, target):
+    _queue(mapper, connection, target, "upsert")
+
+
+def _after_update(mapper, connection, target):
+    _queue(mapper, connection, target, "upsert")
+
+
+def _after_delete(mapper, connection, target):
+    _queue(mapper, connection, target, "delete")
+
+
+def remove_rows(session: Session, model, ids) -> None:
+    """Odebere entity z indexu po commitu (hromadné mazání přes Core obchází ORM eventy)."""
+    index = _indexes.get(model)
+    if index is None:
+        return
+    session.info.setdefault("trigram_pending", []).extend((index, entity_id, None) for entity_id in ids)
+
+
+def _after_commit(session):
+    for index, entity_id, values in session.info.pop("trigram_pending", []):
+        if values is None:
+            index.remove(entity_id)
+        else:
+            index.upsert(entity_id, values)
+
+
+def _after_rollback(session):
+    session.info.pop("trigram_pending", None)
+
+
+# =====================================================
+# INICIALIZACE
+# =====================================================
+def init_trigram(engine: Engine, base) -> Optional[str]:
+    """
+    Připraví trigramové indexy. Volá se při startu aplikace.
+
+    Returns:
+        Název aktivního backendu nebo None
+    """
+    global _backend
+
+    models = get_trigram_models(base)
+
+    try:
+        if engine.dialect.name == "postgresql":
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                for model in models:
+                    table = model.__tablename__
+                    for field in model.__trigram__:
+                        conn.execute(text(
+                            f"CREATE INDEX IF NOT EXISTS ix_{table}_{field}_trgm "
+                            f"ON {table} USING GIN ({field} gin_trgm_ops)"
+                        ))
+            _backend = "pg_trgm"
+        else:
+            with Session(engine) as db:
+                for model in models:
+                    index = _indexes.setdefault(model, TrigramIndex(model))
+                    index.rebuild(db)
+
+            for model in models:
+                if not event.contains(model, "after_insert", _after_insert):
+                    event.listen(model, "after_insert", _after_insert)
+                    event.listen(model, "after_update", _after_update)
+                    event.listen(model, "after_delete", _after_delete)
+            if not event.contains(Session, "after_commit", _after_commit):
+                event.listen(Session, "after_commit", _after_commit)
+                event.listen(Session, "after_rollback", _after_rollback)
+            _backend = "memory"
+    except Exception as e:
+        logger.warning(f"Trigram index unavailable, falling back to ILIKE: {e}")
+        _backend = None
+
+    logger.info(f"Trigram backend: {_backend or 'ILIKE'} ({len(models)} models)")
+    return _backend
+
+
+def refresh_indexes(engine: Engine) -> None:
+    """Dotáhne do všech in-memory indexů změny ostatních workerů."""
+    with Session(engine) as db:
+        for index in list(_indexes.values()):
+            index.refresh(db)
+
+
+async def refresh_trigram_indexes(engine: Engine, interval: float = REFRESH_INTERVAL) -> None:
+    """
+    Úloha na pozadí - obnovuje in-memory indexy mimo requesty.
+
+    Spouští se z lifespan aplikace, jen pro backend "memory".
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(refresh_indexes, engine)
+        except Exception as e:
+            logger.warning(f"Trigram index refresh failed: {e}")
+
+
+# =====================================================
+# VYHLEDÁVÁNÍ
+# =====================================================
+def trigram_lookup(
+    db: Session,
+    model: Type[T],
+    q: str,
+    limit: int = 10,
+    threshold: float = DEFAULT_THRESHOLD,
+    query=None
+) -> list[tuple[T, float, str]]:
+    """
+    Fuzzy vyhledání záznamů podle `__trigram__` sloupců.
+
+    Args:
+        db: Databázová session
+        model: Model s `__trigram__`
+        q: Hledaný text (část názvu, IČO, e-mailu...)
+        limit: Max počet výsledků
+        threshold: Minimální skóre (0-1)
+        query: Volitelné výchozí query s dalšími filtry (default: db.query(model))
+
+    Returns:
+        Seznam (záznam, skóre, sloupec se shodou) seřazený podle skóre
+    """
+    base_query = query if query is not None else db.query(model)
+    fields = model.__trigram__
+
+    if _backend == "pg_trgm":
+        # `<%` porovnává s pg_trgm.word_similarity_threshold (výchozí 0.6) -
+        # nastaví se jen pro aktuální transakci, GIN index zůstává použitelný
+        db.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+            {"threshold": str(threshold)}
+        )
+        scores = [
+            func.word_similarity(q, func.coalesce(getattr(model, field), "")).label(field)
+            for field in fields
+        ]
+        rows = (
+            base_query
+            .add_columns(*scores)
+            .filter(or_(*[literal(q).op("<%")(getattr(model, field)) for field in fields]))
+            .order_by(func.greatest(*scores).desc())
+            .limit(limit)
+            .all()
+        )
+        results = []
+        for entity, *field_scores in rows:
+            score, field = max(zip(field_scores, fields))
+            if score >= threshold:
+                results.append((entity, float(score), field))
+        return results
+
+    if _backend == "memory" and model in _indexes:
+        index = _indexes[model]
+        # Víc kandidátů - část může vyřadit filtr v query
+        matches = index.search(q, limit=limit * 5, threshold=threshold)
+        if not matches:
+            return []
+        entities = {
+            entity.id: entity
+            for entity in base_query.filter(model.id.in_([m[0] for m in matches])).all()
+        }
+        return [
+            (entities[entity_id], score, field)
+            for entity_id, score, field in matches
+            if entity_id in entities
+        ][:limit]
+
+    # Fallback - ILIKE
+    pattern = f"%{q}%"
+    rows = base_query.filter(or_(*[getattr(model, f).ilike(pattern) for f in fields])).limit(limit).all()
+    results = []
+    for entity in rows:
+        field = next(
+            (f for f in fields if q.lower() in (getattr(entity, f) or "").lower()),
+            fields[0]
+        )
+        results.append((entity, 1.0, field))
+    return results
@@ -1054,7 +1054,7 @@ export const DealsKanbanPage = () => {
         label: '👁️ Zobrazit faktury',
         icon: HiOutlineEye,
         color: 'gray',
-        condition: (deal) => deal.invoices_summary?.length > 0,
+        condition: (deal) => deal.invoices_count > 0,
         onClick: (deal) => {
           navigate(`/invoices?deal_id=${deal.id}`);
         },
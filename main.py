@@ -1,4 +1,5 @@
 # main.py
+import asyncio
 from contextlib import asynccontextmanager
 from typing import Optional
 
@@ -13,8 +14,18 @@ from backend.core.config import get_settings
 from backend.core.db import engine
 from backend.core.models.base import Base
 from backend.core.utils.init_db import init_database
+from backend.core.utils.search import warm_filter_cache
+from backend.core.utils.fulltext import init_fulltext
+from backend.core.utils.entity_index import init_entity_index
+from backend.core.utils.trigram import init_trigram, refresh_trigram_indexes
+from backend.core.utils.document_items import init_document_items
+from backend.core.services.stats import init_stats
+from backend.core.services.payments import register_payment_events
+from backend.core.utils.pagination import PAGINATION_HEADERS
 from backend.apps.admin.admin import setup_admin
 from backend.core.middleware.logging import APILoggingMiddleware
+from backend.core.middleware.rate_limit_policy import RateLimitMiddleware
+from backend.core.middleware.concurrency import AdaptiveConcurrencyMiddleware
 
 
 settings = get_settings()
@@ -47,10 +58,36 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error during database initialization: {e}")
         raise
+
+    # Předpočítej metadata filtrů pro list endpointy
+    logger.info(f"Filter metadata cached for {warm_filter_cache(Base)} models")
+
+    # Fulltextový index (FTS5 / tsvector)
+    init_fulltext(engine, Base)
+
+    # Index štítků a custom fields
+    init_entity_index(engine, Base)
+
+    # Trigramový index pro typeahead (pg_trgm / in-memory)
+    trigram_refresh = None
+    if init_trigram(engine, Base) == "memory":
+        # Změny ostatních workerů se dotahují na pozadí, ne v requestu
+        trigram_refresh = asyncio.create_task(refresh_trigram_indexes(engine))
+
+    # Souhrnné tabulky statistik dealů a leadů
+    init_stats(engine)
+
+    # Stav plateb dealů z faktur (přepočet po flushi)
+    register_payment_events()
+
+    # Řádkový index položek dokladů pro analytiku
+    init_document_items(engine, Base)
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
+    if trigram_refresh is not None:
+        trigram_refresh.cancel()
     engine.dispose()
 
 
@@ -89,16 +126,16 @@ def create_app() -> FastAPI:
 def register_middlewares(app: FastAPI) -> None:
     """Registruje všechny middlewares."""
 
-    # CORS Middleware
     app.add_middleware(
-        CORSMiddleware,
-        allow_origins=settings.allow_origins,  # V produkci specifikuj konkrétní originy
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+        APILoggingMiddleware
     )
+    # Adaptivní limit souběžnosti - při přetížení backendu vrací rovnou 503
+    if settings.adaptive_concurrency_enabled:
+        app.add_middleware(AdaptiveConcurrencyMiddleware)
+    # Rate limit - obaluje logování, odmítnuté requesty nesahají do DB
     app.add_middleware(
-        APILoggingMiddleware
+        RateLimitMiddleware,
+        prefix="/api/v1"
     )
     # Session Middleware - pro JWT v cookies
     app.add_middleware(
@@ -107,7 +144,16 @@ def register_middlewares(app: FastAPI) -> None:
         max_age=settings.access_token_expire_minutes * 60,
         same_site="lax"
     )
-
+    # CORS Middleware - registruje se poslední (nejvnější), aby CORS hlavičky
+    # měly i odpovědi 429 / 503 z rate limitu a limitu souběžnosti
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.allow_origins,  # V produkci specifikuj konkrétní originy
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[*PAGINATION_HEADERS, "Retry-After"],
+    )
 
     logger.info("Middlewares registered")
 
@@ -121,6 +167,7 @@ def register_routers(app: FastAPI,prefix_="api",version='v1') -> None:
     from backend.core.routers.customers import router as custemers_router
     from backend.core.routers.products import router as product_router
     from backend.core.routers.deals import router as deal_router
+    from backend.core.routers.analytics import router as analytics_router
     from backend.apps.doc.api import   router as att_store_router
 
     prefix_arg=f"/{prefix_}/{version}"
@@ -184,6 +231,11 @@ def register_routers(app: FastAPI,prefix_="api",version='v1') -> None:
         prefix=f"{prefix_arg}/documents",
         tags=["documents"]
     )
+    app.include_router(
+        analytics_router,
+        prefix=f"{prefix_arg}/analytics",
+        tags=["analytics"]
+    )
     logger.info("Routers registered")
 
 
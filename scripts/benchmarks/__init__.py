@@ -0,0 +1,52 @@
+# scripts/benchmarks/__init__.py
+"""
+Benchmarky výkonových změn. Spouští se z kořene repozitáře nad dočasnou
+SQLite databází, produkční databázi nepoužívají:
+
+    python -m scripts.benchmarks.deal_list     # list_deals: joinedload vs. selectinload
+    python -m scripts.benchmarks.invoice_list  # GET /invoices/ vs. GET /invoices/list
+    python -m scripts.benchmarks.filters       # cache filtrovacích plánů list endpointů
+    python -m scripts.benchmarks.trigram       # in-memory trigram index
+    python -m scripts.benchmarks.sequences     # souběžné přidělování čísel dokladů
+    python -m scripts.benchmarks.bulk          # hromadný import, úpravy a fakturace
+    python -m scripts.benchmarks.export        # paměť streamovaného exportu
+    python -m scripts.benchmarks.pricing       # výpočet součtů dokladů
+"""
+import os
+import tempfile
+import time
+from typing import Callable, Optional, TypeVar
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from backend.core.models.base import Base
+import backend.core.models  # noqa: F401 - registrace modelů
+
+T = TypeVar("T")
+
+
+def create_benchmark_engine(name: Optional[str] = None, **connect_args) -> Engine:
+    """
+    SQLite se všemi tabulkami.
+
+    Args:
+        name: Název dočasného souboru databáze (None = databáze v paměti,
+              jen pro jedno vlákno)
+        connect_args: Parametry připojení (např. timeout pro souběžné zápisy)
+    """
+    if name is None:
+        engine = create_engine("sqlite://")
+    else:
+        path = os.path.join(tempfile.mkdtemp(), f"{name}.db")
+        engine = create_engine(f"sqlite:///{path}", connect_args=connect_args)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def average_ms(run: Callable[[], T], rounds: int) -> tuple[float, T]:
+    """Průměrná doba jednoho běhu v ms a výsledek posledního běhu."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = run()
+    return (time.perf_counter() - start) / rounds * 1000, result
@@ -0,0 +1,130 @@
+# scripts/benchmarks/bulk.py
+"""Hromadný import, úpravy a fakturace dealů: python -m scripts.benchmarks.bulk"""
+import time
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.models.base import Base
+from backend.core.models.company import Company
+from backend.core.models.deal import Deal, DealStatus
+from backend.core.models.document_item import DocumentItem
+from backend.core.models.invocie import Invoice, InvoiceType
+from backend.core.models.stats import DealStatsSummary
+from backend.core.schemas.deal import DealBulkUpdateItem, DealCreate
+from backend.core.services.bulk import create_deals, invoice_deals, transition_deals, update_deals
+from backend.core.services.sequences import next_deal_number, next_invoice_numbers
+from backend.core.services.stats import init_stats
+from backend.core.utils import document_items, entity_index, fulltext
+from scripts.benchmarks import create_benchmark_engine
+
+
+def payload(n: int) -> DealCreate:
+    return DealCreate(
+        title=f"E-shop objednávka {n}", user_id="bench", company_name=f"Zákazník {n % 500}",
+        email=f"zakaznik{n}@example.com", tags=["eshop", f"batch-{n % 10}"],
+        custom_fields={"channel": "web"}, discount=n % 3 * 5, discount_type="percent",
+        items=[
+            {"name": f"Produkt {n % 97 + j}", "quantity": j + 1, "unit_price": 99.9 + n % 50 + j, "vat_rate": 21}
+            for j in range(3)
+        ],
+    )
+
+
+def main(count: int = 10_000) -> None:
+    engine = create_benchmark_engine("bulk")
+    fulltext.init_fulltext(engine, Base)
+    entity_index.init_entity_index(engine, Base)
+    document_items.init_document_items(engine, Base)
+    init_stats(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    deals = [payload(n) for n in range(count)]
+
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        for deal in deals[:1000]:
+            # Původní POST /deals/ - po jedné objednávce
+            data = deal.model_dump()
+            data.update(user_id="bench", created_by="bench", deal_number=next_deal_number(db, "bench"))
+            obj = Deal(**data)
+            obj.recalculate_totals()
+            db.add(obj)
+            db.commit()
+            db.refresh(obj)
+        legacy = time.perf_counter() - start
+        print(f"one by one      {1000 / legacy:8.0f} deals/s")
+
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        created = create_deals(db, "bench", deals)
+        elapsed = time.perf_counter() - start
+        print(f"bulk create     {count / elapsed:8.0f} deals/s  ({count} in {elapsed:.2f} s, failed {created['failed']})")
+
+        ids = [result["id"] for result in created["results"]]
+        updates = [
+            DealBulkUpdateItem(id=deal_id, discount=10, tags=["eshop", "repriced"])
+            for deal_id in ids
+        ]
+        start = time.perf_counter()
+        updated = update_deals(db, "bench", updates)
+        elapsed = time.perf_counter() - start
+        print(f"bulk update     {count / elapsed:8.0f} deals/s  ({count} in {elapsed:.2f} s, failed {updated['failed']})")
+
+        start = time.perf_counter()
+        confirmed = transition_deals(db, "bench", ids[:count // 2], DealStatus.CONFIRMED)
+        completed = transition_deals(db, "bench", ids, DealStatus.COMPLETED)
+        db.commit()
+        elapsed = time.perf_counter() - start
+        print(f"bulk transition {count * 1.5 / elapsed:8.0f} deals/s  (completed {len(completed['updated'])}, rejected {len(completed['rejected'])})")
+        assert len(confirmed["updated"]) == count // 2 and not completed["rejected"]
+
+        supplier, customer = Company(name="Dodavatel s.r.o."), Company(name="Odběratel a.s.")
+        db.add_all([supplier, customer])
+        db.commit()
+        update_deals(db, "bench", [DealBulkUpdateItem(id=deal_id, company_id=customer.id) for deal_id in ids])
+        start = time.perf_counter()
+        for deal_id in ids[-200:]:
+            # Původní POST /deals/{id}/create-invoice - po jednom dealu
+            deal = db.query(Deal).filter(Deal.id == deal_id).first()
+            legacy_supplier = db.query(Company).filter(Company.id == supplier.id).first()
+            invoice = Invoice.create_from_deal(deal=deal, supplier=legacy_supplier, issue_date=date.today(),
+                                               due_date=date.today(), created_by="bench")
+            invoice.invoice_number = next_invoice_numbers(db, InvoiceType.INVOICE)[0]
+            db.add(invoice)
+            db.commit()
+            db.refresh(invoice)
+        elapsed = time.perf_counter() - start
+        print(f"invoice 1 by 1  {200 / elapsed:8.0f} deals/s")
+
+        start = time.perf_counter()
+        invoiced = invoice_deals(db, "bench", ids[:2000], supplier, InvoiceType.INVOICE, {
+            "issue_date": date.today(), "due_date": date.today(), "created_by": "bench"
+        })
+        db.commit()
+        elapsed = time.perf_counter() - start
+        print(f"bulk invoicing  {2000 / elapsed:8.0f} deals/s  (created {invoiced['created']})")
+        numbers = [result["invoice_number"] for result in invoiced["results"]]
+        assert numbers == sorted(numbers) and len(set(numbers)) == 2000
+
+        # Kontrola indexů a souhrnu
+        item_rows = db.scalar(select(func.count(DocumentItem.id)).where(
+            DocumentItem.owner_id == "bench", DocumentItem.document_type == "deals"
+        ))
+        summary = db.scalar(select(func.sum(DealStatsSummary.count)).where(DealStatsSummary.user_id == "bench"))
+        assert item_rows == 3 * (count + 1000), item_rows
+        assert summary == count + 1000, summary
+        completed_items = db.scalar(select(func.count(DocumentItem.id)).where(DocumentItem.status == "completed"))
+        completed_stats = db.scalar(select(func.sum(DealStatsSummary.count)).where(DealStatsSummary.status == DealStatus.COMPLETED))
+        assert completed_items == 3 * count and completed_stats == count, (completed_items, completed_stats)
+        assert len(set(r["number"] for r in created["results"])) == count
+        sample = db.get(Deal, ids[123])
+        check = Deal(**{**payload(123).model_dump(), "discount": 10})
+        check.recalculate_totals()
+        assert (sample.total, sample.total_vat) == (check.total, check.total_vat)
+        print("indexes, stats and totals consistent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# scripts/benchmarks/deal_list.py
+"""List dealů (100 dealů × 10 faktur): python -m scripts.benchmarks.deal_list"""
+from datetime import date
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, defer, joinedload, selectinload
+
+from backend.core.models.company import Company
+from backend.core.models.deal import Deal
+from backend.core.models.invocie import Invoice
+from backend.core.routers.deals import (
+    DEAL_COMPACT_DEFERRED, DEAL_LIST_ORDER, enrich_deal_response, get_invoice_summaries, serialize_deal,
+)
+from backend.core.utils.pagination import paginate
+from scripts.benchmarks import average_ms, create_benchmark_engine
+
+
+def seed(engine) -> None:
+    with Session(engine) as db:
+        company = Company(name="Benchmark s.r.o.")
+        db.add(company)
+        db.flush()
+        items = [{"name": f"Položka {i}", "quantity": 1, "unit_price": 100, "vat_rate": 21} for i in range(10)]
+        for d in range(100):
+            deal = Deal(
+                user_id="bench", deal_number=f"OBJ-{d:04d}", title=f"Deal {d}",
+                company_id=company.id, items=items, internal_notes="x" * 2000
+            )
+            db.add(deal)
+            db.flush()
+            db.add_all([
+                Invoice(
+                    invoice_number=f"FV-{d:04d}-{i}", deal_id=deal.id, supplier_id=company.id,
+                    supplier_name=company.name, customer_id=company.id, customer_name=company.name,
+                    issue_date=date.today(), due_date=date.today(), items=items, total=1210.0
+                )
+                for i in range(10)
+            ])
+        db.commit()
+
+
+def legacy(db: Session) -> list:
+    """Původní list_deals - joinedload faktur a enrich_deal_response."""
+    deals = db.query(Deal).options(
+        joinedload(Deal.lead), joinedload(Deal.company), joinedload(Deal.invoices)
+    ).filter(Deal.user_id == "bench", Deal.is_active == True).order_by(
+        Deal.created_at.desc(), Deal.id.desc()
+    ).offset(0).limit(100).all()
+    return [enrich_deal_response(deal, db) for deal in deals]
+
+
+def current(db: Session, compact: bool = False) -> list:
+    exclude = DEAL_COMPACT_DEFERRED if compact else ()
+    query = db.query(Deal).options(
+        selectinload(Deal.lead), selectinload(Deal.company),
+        *[defer(getattr(Deal, column)) for column in exclude]
+    ).filter(Deal.user_id == "bench", Deal.is_active == True)
+    deals = paginate(query, DEAL_LIST_ORDER, 100)
+    summaries = get_invoice_summaries(db, [deal.id for deal in deals])
+    return [serialize_deal(deal, summaries.get(deal.id), exclude) for deal in deals]
+
+
+def main() -> None:
+    engine = create_benchmark_engine()
+    seed(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    def in_session(run):
+        def wrapper():
+            with Session(engine) as db:
+                return run(db)
+        return wrapper
+
+    for name, run in [("joinedload", legacy), ("selectinload", current),
+                      ("selectinload compact", lambda db: current(db, compact=True))]:
+        rounds = 20
+        statements.clear()
+        elapsed, result = average_ms(in_session(run), rounds)
+        print(f"{name:22} {elapsed:7.2f} ms  {len(statements) // rounds} SQL  {len(result)} deals")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# scripts/benchmarks/export.py
+"""Paměť exportu vs. načtení celého seznamu: python -m scripts.benchmarks.export"""
+import time
+import tracemalloc
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend.core.models.company import Company
+from backend.core.schemas.utils import ExportFormat
+from backend.core.utils.export import default_columns, export_statement, iter_export
+from backend.core.utils.pagination import order_by_keys
+from scripts.benchmarks import create_benchmark_engine
+
+
+def main(count: int = 100_000) -> None:
+    engine = create_benchmark_engine()
+    with engine.begin() as conn:
+        conn.execute(insert(Company), [
+            {"name": f"Firma {n} s.r.o.", "ico": f"{n:08d}", "email": f"info@firma{n}.cz",
+             "address_city": "Praha", "tags": ["export"], "custom_fields": {"n": n}}
+            for n in range(count)
+        ])
+
+    columns = default_columns(Company)
+    order = [(Company.id, False)]
+
+    for export_format in ExportFormat:
+        with Session(engine) as db:
+            tracemalloc.start()
+            start = time.perf_counter()
+            statement = export_statement(db.query(Company), Company, columns, order)
+            parts = iter_export(engine, statement, columns, export_format)
+            next(parts)
+            first = time.perf_counter() - start
+            size = sum(len(part) for part in parts)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print(
+            f"stream {export_format.value:6} first part {first * 1000:6.1f} ms  "
+            f"peak {peak / 2**20:6.1f} MiB  ({size / 2**20:.0f} MiB exported)"
+        )
+
+    with Session(engine) as db:
+        # Dosavadní cesta - celý seznam v paměti
+        tracemalloc.start()
+        order_by_keys(db.query(Company), order).all()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"load all ORM  peak {peak / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# scripts/benchmarks/invoice_list.py
+"""Seznam faktur (GET / vs. GET /list): python -m scripts.benchmarks.invoice_list"""
+import asyncio
+import json
+from datetime import date
+from types import SimpleNamespace
+from typing import List
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend.core.models.company import Company
+from backend.core.models.invocie import Invoice, InvoiceStatus, InvoiceType
+from backend.core.routers.invoices import list_invoices, list_invoices_compact
+from backend.core.schemas.invoice import InvoiceListItem, InvoicePublic
+from scripts.benchmarks import average_ms, create_benchmark_engine
+
+
+def seed(engine, count: int = 5000) -> None:
+    items = [
+        {"name": f"Položka {i}", "description": "Popis položky " * 5, "quantity": 2,
+         "unit": "ks", "unit_price": 100, "vat_rate": 21}
+        for i in range(10)
+    ]
+    address = {
+        f"{prefix}_{field}": f"{prefix} {field} " * 3
+        for prefix in ("supplier", "customer")
+        for field in ("legal_name", "address_street", "address_city", "email", "phone")
+    }
+    with engine.begin() as conn:
+        conn.execute(insert(Company), [{"id": 1, "name": "Benchmark s.r.o."}])
+        conn.execute(insert(Invoice), [
+            {
+                "invoice_number": f"FV{n:06d}", "invoice_type": InvoiceType.INVOICE, "status": InvoiceStatus.SENT,
+                "supplier_id": 1, "supplier_name": "Benchmark s.r.o.", "customer_id": 1,
+                "customer_name": f"Zákazník {n}", "issue_date": date.today(), "due_date": date.today(),
+                "items": items, "vat_breakdown": {"21": {"base": 2000, "vat": 420}}, "total": 2420.0,
+                "currency": "CZK", "created_by": "bench" if n % 2 else "other",
+                "notes": "Poznámka " * 20, **address,
+            }
+            for n in range(count)
+        ])
+
+
+def main() -> None:
+    engine = create_benchmark_engine()
+    seed(engine)
+
+    user = SimpleNamespace(id="bench")
+    runs = [
+        ("GET /", list_invoices, InvoicePublic),
+        ("GET /list", list_invoices_compact, InvoiceListItem),
+    ]
+    for name, endpoint, schema in runs:
+        adapter = TypeAdapter(List[schema])
+
+        def run():
+            with Session(engine) as db:
+                rows = asyncio.run(endpoint(
+                    Response(), limit=100, invoice_type=None, status=None, cursor=None,
+                    include_total=False, filters={}, db=db, current_user=user
+                ))
+                # Stejná serializace jako FastAPI response_model
+                return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+        elapsed, body = average_ms(run, 20)
+        print(f"{name:10} {elapsed:7.2f} ms  {len(body) / 1024:7.1f} KiB  {len(json.loads(body))} invoices")
+
+
+if __name__ == "__main__":
+    main()
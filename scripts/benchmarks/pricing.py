@@ -0,0 +1,77 @@
+# scripts/benchmarks/pricing.py
+"""
+Výpočet součtů dokladů - původní float smyčka vs. Decimal vs. dávka:
+python -m scripts.benchmarks.pricing
+
+Shodu s původními výpočty ověřuje tests/test_pricing.py.
+"""
+import random
+import time
+
+from backend.core.services.pricing import DEAL, INVOICE, calculate_batch, calculate_invoice_totals, np
+
+
+def legacy_invoice(items, with_vat, rounding):
+    """Původní float výpočet Invoice.recalculate_totals."""
+    subtotal = discount_total = 0.0
+    vat_breakdown = {}
+    for item in items:
+        quantity = float(item.get('quantity', 0) or 0)
+        unit_price = float(item.get('unit_price', 0) or 0)
+        discount_percent = float(item.get('discount_percent', 0) or 0)
+        vat_rate = float(item.get('vat_rate', 0) or 0)
+        item_subtotal = quantity * unit_price
+        item_discount = item_subtotal * (discount_percent / 100)
+        subtotal += item_subtotal
+        discount_total += item_discount
+        if with_vat:
+            entry = vat_breakdown.setdefault(str(int(vat_rate)), {'base': 0.0, 'vat': 0.0})
+            entry['base'] += item_subtotal - item_discount
+            entry['vat'] += (item_subtotal - item_discount) * (vat_rate / 100)
+    subtotal_after_discount = round(subtotal - discount_total, 2)
+    total_vat = round(sum(v['vat'] for v in vat_breakdown.values()), 2)
+    return {
+        'subtotal': round(subtotal, 2),
+        'discount_amount': round(discount_total, 2),
+        'subtotal_after_discount': subtotal_after_discount,
+        'vat_breakdown': {k: {'base': round(v['base'], 2), 'vat': round(v['vat'], 2)} for k, v in vat_breakdown.items()},
+        'total_vat': total_vat,
+        'total': round(subtotal_after_discount + total_vat + (rounding or 0), 2),
+    }
+
+def random_item(rng):
+    return {
+        'quantity': rng.choice([1, 2, 3, 10, 0.5, 1.25, 0.333, -1, rng.randint(1, 500)]),
+        'unit_price': rng.choice([round(rng.uniform(0, 10000), 2), round(rng.uniform(0, 50), 4), 0, 99.99]),
+        'discount_percent': rng.choice([0, 0, 5, 10, 12.5, 33.33, None]),
+        'vat_rate': rng.choice([21, 21, 12, 0, 10.5, 15.0, None]),
+    }
+
+def random_document(rng, kind):
+    document = {'items': [random_item(rng) for _ in range(rng.randint(0, 12))],
+                'rounding': rng.choice([0, 0, 0.4, -0.3, None])}
+    if kind == DEAL:
+        document['discount_percent'] = rng.random() < 0.5
+        document['discount'] = rng.choice([0, 5, 10, 250, 33.3, None])
+    else:
+        document['with_vat'] = rng.random() < 0.8
+    return document
+
+
+def main(count: int = 20000) -> None:
+    rng = random.Random(41)
+    documents = [random_document(rng, INVOICE) for _ in range(count)]
+    items_total = sum(len(d['items']) for d in documents)
+    for name, run in [
+        ("legacy float loop", lambda: [legacy_invoice(**d) for d in documents]),
+        ("Decimal scalar", lambda: [calculate_invoice_totals(**d) for d in documents]),
+        (f"batch ({'NumPy' if np is not None else 'no NumPy'})", lambda: calculate_batch(documents, INVOICE)),
+    ]:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:22} {len(documents) / elapsed:9.0f} documents/s  {items_total / elapsed:9.0f} items/s")
+
+
+if __name__ == "__main__":
+    main()
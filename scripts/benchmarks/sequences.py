@@ -0,0 +1,66 @@
+# scripts/benchmarks/sequences.py
+"""Souběžné přidělování čísel dokladů: python -m scripts.benchmarks.sequences"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.models.deal import DealSequence
+from backend.core.models.invocie import InvoiceSequence, InvoiceType
+from backend.core.services.sequences import DEAL_FORMAT, _deal_blocks, next_deal_number, next_invoice_number
+from scripts.benchmarks import create_benchmark_engine
+
+
+def main(threads: int = 8, requests: int = 400) -> None:
+    engine = create_benchmark_engine("sequences", timeout=30)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def legacy(_):
+        # Původní read-modify-write v Pythonu
+        with SessionLocal() as db:
+            sequence = db.query(DealSequence).filter_by(user_id="bench", year=datetime.utcnow().year).first()
+            if not sequence:
+                sequence = DealSequence(user_id="bench", year=datetime.utcnow().year, prefix="OBJ",
+                                        last_number=0, format_pattern=DEAL_FORMAT)
+                db.add(sequence)
+            number = sequence.get_next_number()
+            try:
+                db.commit()
+            except IntegrityError:
+                return None
+            return number
+
+    def gapless(_):
+        with SessionLocal() as db:
+            number = next_invoice_number(db, InvoiceType.INVOICE)
+            db.commit()
+            return number
+
+    def blocks(_):
+        with SessionLocal() as db:
+            number = next_deal_number(db, "bench")
+            db.commit()
+            return number
+
+    for name, run in [("read-modify-write", legacy), ("gapless UPDATE RETURNING", gapless), ("block reservation", blocks)]:
+        with engine.begin() as conn:
+            conn.execute(DealSequence.__table__.delete())
+            conn.execute(InvoiceSequence.__table__.delete())
+        _deal_blocks.clear()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            numbers = list(pool.map(run, range(requests)))
+        elapsed = time.perf_counter() - start
+
+        issued = [n for n in numbers if n]
+        print(
+            f"{name:26} {requests / elapsed:8.0f} req/s  "
+            f"duplicates: {len(issued) - len(set(issued)):4}  failed: {requests - len(issued)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
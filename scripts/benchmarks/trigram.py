@@ -0,0 +1,36 @@
+# scripts/benchmarks/trigram.py
+"""In-memory trigram index: python -m scripts.benchmarks.trigram"""
+import random
+import string
+import time
+
+from backend.core.utils.trigram import TrigramIndex
+from scripts.benchmarks import average_ms
+
+
+class _Company:
+    __tablename__ = "companies"
+    __trigram__ = ("name", "ico")
+
+
+COMMON = ["Stavby", "Praha", "Brno", "Obchod", "Služby", "Technik", "Servis", "Invest",
+          "Group", "Holding", "Logistika", "Energie", "Software", "Consulting", "Trade"]
+SYLLABLES = ["ka", "ro", "mi", "te", "va", "lo", "sta", "nek", "pra", "dvo", "ri", "chy", "zna", "bel"]
+
+
+def main(count: int = 100000) -> None:
+    words = ["".join(random.choices(SYLLABLES, k=random.randint(2, 4))).capitalize() for _ in range(20000)]
+    index = TrigramIndex(_Company)
+    start = time.perf_counter()
+    for i in range(count):
+        name = f"{random.choice(words)} {random.choice(COMMON)} {random.choice(words)} s.r.o."
+        index.upsert(i, {"name": name, "ico": "".join(random.choices(string.digits, k=8))})
+    print(f"build: {count} rows in {time.perf_counter() - start:.2f}s")
+
+    for q in ["Prha stav", "Softwre", "1234", "holding energ", "s.r.o.", words[0][:-1]]:
+        elapsed, result = average_ms(lambda: index.search(q), 20)
+        print(f"{q!r:18} {elapsed:6.2f} ms  top: {result[:2]}")
+
+
+if __name__ == "__main__":
+    main()
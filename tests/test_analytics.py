@@ -0,0 +1,46 @@
+# tests/test_analytics.py
+from datetime import date
+
+import pytest
+
+from backend.core.models.base import Base
+from backend.core.models.company import Company
+from backend.core.models.invocie import Invoice, InvoiceType
+from backend.core.services.analytics import customer_sales, product_sales, vat_summary
+from backend.core.utils.document_items import init_document_items
+
+
+def _invoice(number: str, invoice_type: InvoiceType) -> Invoice:
+    invoice = Invoice(
+        invoice_number=number, invoice_type=invoice_type, supplier_id=1, supplier_name="Dodavatel",
+        customer_id=2, customer_name="Zákazník", issue_date=date(2026, 1, 15), due_date=date(2026, 1, 29),
+        created_by="u1",
+        items=[{"name": "Produkt A", "sku": "A", "quantity": 6, "unit_price": 100, "vat_rate": 21}],
+    )
+    invoice.recalculate_totals()
+    return invoice
+
+
+@pytest.fixture
+def sales(engine, db):
+    init_document_items(engine, Base)
+    db.add_all([Company(id=1, name="Dodavatel"), Company(id=2, name="Zákazník")])
+    db.add(_invoice("FV1", InvoiceType.INVOICE))
+    db.commit()
+    return db
+
+
+def test_credit_note_cancels_sales(sales):
+    sales.add(_invoice("D1", InvoiceType.CREDIT_NOTE))
+    sales.commit()
+
+    [product] = product_sales(sales, "u1")
+    assert (product["quantity"], product["net_amount"], product["vat_amount"]) == (0, 0, 0)
+    [customer] = customer_sales(sales, "u1")
+    assert customer["net_amount"] == 0
+    assert sum(row["base"] for row in vat_summary(sales, "u1")) == 0
+
+
+def test_invoice_counts_as_sales(sales):
+    [product] = product_sales(sales, "u1")
+    assert (product["quantity"], product["net_amount"], product["vat_amount"]) == (6, 600, 126)
@@ -0,0 +1,27 @@
+# tests/test_bulk.py
+from sqlalchemy.exc import IntegrityError
+
+from backend.core.services.bulk import _result, _run_chunks
+
+
+def _process(failing):
+    def process(db, start, chunk):
+        if any(item in failing for item in chunk):
+            raise IntegrityError("INSERT", {}, Exception(f"duplicate {chunk}"))
+        return [_result(start + i, item) for i, item in enumerate(chunk)]
+    return process
+
+
+def test_failed_item_keeps_request_index_in_later_chunk(db):
+    summary = _run_chunks(db, [10, 11, 12, 13, 14], 2, _process({13}))
+
+    assert [(r["index"], r["id"], r["success"]) for r in summary["results"]] == [
+        (0, 10, True), (1, 11, True), (2, 12, True), (3, None, False), (4, 14, True),
+    ]
+    assert (summary["succeeded"], summary["failed"]) == (4, 1)
+
+
+def test_failed_item_in_first_chunk(db):
+    summary = _run_chunks(db, [10, 11, 12], 2, _process({10}))
+
+    assert [(r["index"], r["success"]) for r in summary["results"]] == [(0, False), (1, True), (2, True)]
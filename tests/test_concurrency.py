@@ -0,0 +1,79 @@
+# tests/test_concurrency.py
+import asyncio
+
+import pytest
+
+from backend.core.middleware.concurrency import AdaptiveConcurrencyLimit, AdaptiveConcurrencyMiddleware
+
+
+@pytest.fixture
+def write_limit():
+    limit = AdaptiveConcurrencyLimit("write", initial_limit=8, target_latency=0.3)
+    limit.in_flight = 8
+    return limit
+
+
+def test_single_slow_request_keeps_limit(write_limit):
+    for _ in range(20):
+        write_limit._update_limit(0.05)
+    limit = write_limit.limit
+    write_limit._update_limit(2.0)
+
+    assert write_limit.limit >= limit
+
+
+def test_sustained_latency_decreases_limit(write_limit):
+    for _ in range(20):
+        write_limit._update_limit(0.05)
+    for _ in range(20):
+        write_limit._last_decrease = 0.0
+        write_limit._update_limit(1.0)
+
+    assert write_limit.limit < 8
+
+
+@pytest.mark.parametrize("method, path, name", [
+    ("POST", "/api/v1/deals/bulk", "bulk"),
+    ("PATCH", "/api/v1/deals/bulk", "bulk"),
+    ("POST", "/api/v1/deals/bulk/create-invoices", "bulk"),
+    ("POST", "/api/v1/products/bulk/delete", "bulk"),
+    ("POST", "/api/v1/deals", "write"),
+    ("POST", "/api/v1/deals/bulky", "write"),
+    ("GET", "/api/v1/deals/export", "read"),
+])
+def test_bulk_routes_have_own_class(method, path, name):
+    middleware = AdaptiveConcurrencyMiddleware(None)
+    assert middleware._classify(method, path).name == name
+
+
+def test_cancel_after_handoff_returns_slot():
+    limit = AdaptiveConcurrencyLimit("write", initial_limit=1, queue_timeout=1.0)
+
+    async def run():
+        assert await limit.acquire()
+        queued = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0)
+        assert len(limit._waiters) == 1
+
+        # Slot předaný čekajícímu requestu, klient se odpojí dřív, než pokračuje
+        limit.release(None)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+    asyncio.run(run())
+    assert limit.in_flight == 0
+    assert not limit._waiters
+
+
+def test_queue_timeout_rejects_without_taking_slot():
+    limit = AdaptiveConcurrencyLimit("write", initial_limit=1, queue_timeout=0.01)
+
+    async def run():
+        assert await limit.acquire()
+        assert not await limit.acquire()
+
+    asyncio.run(run())
+    assert limit.in_flight == 1
+    assert limit.rejected == 1
+    assert not limit._waiters
@@ -0,0 +1,22 @@
+# tests/test_init_db.py
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
+
+from backend.core.utils import init_db
+
+
+def test_products_upgrade_backfills_is_featured_and_replaces_listing_index(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as conn:
+        # Tabulka z doby, kdy byl is_featured nullable a index vzestupný
+        conn.exec_driver_sql("CREATE TABLE products (id INTEGER PRIMARY KEY, name VARCHAR, is_active BOOLEAN, is_featured BOOLEAN)")
+        conn.exec_driver_sql("CREATE INDEX idx_product_listing ON products (is_active, is_featured, name, id)")
+        conn.exec_driver_sql("INSERT INTO products (name, is_active, is_featured) VALUES ('A', 1, NULL), ('B', 1, 1)")
+    monkeypatch.setattr(init_db, "engine", engine)
+
+    assert init_db.backfill_columns() == 1
+    assert init_db.drop_obsolete_indexes() == 1
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT name, is_featured FROM products ORDER BY id")).all() == [("A", 0), ("B", 1)]
+    assert "idx_product_listing" not in {index["name"] for index in inspect(engine).get_indexes("products")}
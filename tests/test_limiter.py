@@ -0,0 +1,85 @@
+# tests/test_limiter.py
+import asyncio
+
+import pytest
+import redis
+
+from backend.core.services.limiter import CircuitBreaker, QuotaLeaser
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def incrby(self, key, amount):
+        self.commands.append((key, amount))
+
+    def expire(self, key, seconds):
+        pass
+
+    def execute(self):
+        self.client.calls += 1
+        if self.client.down:
+            raise redis.ConnectionError("Redis down")
+        key, amount = self.commands[0]
+        self.client.counters[key] = self.client.counters.get(key, 0) + amount
+        return [self.client.counters[key], True]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.counters = {}
+        self.calls = 0
+        self.down = False
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class CountingBreaker(CircuitBreaker):
+    def __init__(self):
+        super().__init__(failure_threshold=1)
+        self.successes = 0
+
+    def record_success(self):
+        self.successes += 1
+        super().record_success()
+
+
+@pytest.fixture
+def client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def breaker():
+    return CountingBreaker()
+
+
+def test_local_tokens_do_not_count_as_redis_success(client, breaker):
+    # Dávka 5 tokenů, doplnění na pozadí až pod 2.5 tokenu
+    leaser = QuotaLeaser(client, limit=100, window=60, prefix="test", lease_ratio=0.05, breaker=breaker)
+
+    async def run():
+        for _ in range(2):
+            assert await leaser.acquire("user:1")
+
+    asyncio.run(run())
+    assert client.calls == 1
+    assert breaker.successes == 1
+
+
+def test_background_refill_failure_opens_breaker(client, breaker):
+    leaser = QuotaLeaser(client, limit=100, window=60, prefix="test", lease_ratio=0.05, breaker=breaker)
+
+    async def run():
+        assert await leaser.acquire("user:1", cost=2)
+        client.down = True
+        # Zásoba klesne pod polovinu dávky - doplnění na pozadí selže
+        assert await leaser.acquire("user:1", cost=1)
+        await leaser._buckets["user:1"].pending
+
+    asyncio.run(run())
+    assert client.calls == 2
+    assert breaker.state == "open"
@@ -0,0 +1,29 @@
+# tests/test_rate_limit_policy.py
+import pytest
+
+from backend.core.middleware.rate_limit_policy import RateLimitMiddleware
+from backend.core.middleware.rate_limiter import strict_limiter
+
+
+@pytest.fixture
+def middleware():
+    return RateLimitMiddleware(None)
+
+
+@pytest.mark.parametrize("method, path, cost", [
+    ("GET", "/deals/export", 25),
+    ("GET", "/invoices/export", 25),
+    ("GET", "/leads/export", 25),
+    ("GET", "/companies/export", 25),
+    ("POST", "/deals/bulk", 25),
+    ("PATCH", "/deals/bulk", 25),
+    ("POST", "/deals/bulk/transition", 10),
+    ("POST", "/products/bulk/delete", 10),
+    ("POST", "/deals/bulk/create-invoices", 25),
+    ("GET", "/analytics/products", 10),
+    ("GET", "/analytics/vat", 10),
+])
+def test_expensive_routes_use_strict_policy(middleware, method, path, cost):
+    policy = middleware._resolve_policy(method, f"/api/v1{path}")
+    assert policy.limiter is strict_limiter
+    assert policy.cost == cost
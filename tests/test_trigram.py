@@ -0,0 +1,45 @@
+# tests/test_trigram.py
+from sqlalchemy import insert
+
+from backend.core.models.base import Base
+from backend.core.models.company import Company
+from backend.core.utils import trigram
+
+
+def test_lookup_does_not_refresh_and_background_refresh_loads_changes(engine, db):
+    assert trigram.init_trigram(engine, Base) == "memory"
+
+    # Zápis jiného workeru - obchází ORM eventy
+    with engine.begin() as conn:
+        conn.execute(insert(Company), [{"name": "Stavby Praha s.r.o."}])
+
+    assert trigram.trigram_lookup(db, Company, "Prha stavby") == []
+
+    trigram.refresh_indexes(engine)
+    [(company, score, field)] = trigram.trigram_lookup(db, Company, "Prha stavby")
+    assert company.name == "Stavby Praha s.r.o."
+    assert field == "name" and score >= trigram.DEFAULT_THRESHOLD
+
+
+def test_refresh_rebuilds_after_delete(engine, db):
+    trigram.init_trigram(engine, Base)
+    company = Company(name="Logistika Brno a.s.")
+    db.add(company)
+    db.commit()
+    assert trigram.trigram_lookup(db, Company, "logistika")
+
+    with engine.begin() as conn:
+        conn.execute(Company.__table__.delete())
+    trigram.refresh_indexes(engine)
+
+    assert trigram._indexes[Company].search("logistika") == []
+
+
+def test_search_scores_candidates_from_truncated_postings_exactly():
+    index = trigram.TrigramIndex(Company)
+    for i in range(12000):
+        index.upsert(i, {"name": f"Alpha Beta Gamma {i}"})
+    index.upsert(99999, {"name": "Alpha Beta Gamma Delta"})
+
+    [(entity_id, score, field), *_] = index.search("Alpha Beta Gamma Delta", limit=5)
+    assert (entity_id, score, field) == (99999, 1.0, "name")